@@ -2,62 +2,50 @@
 # - Resolves Google News redirect links to final publisher URL
 # - Builds HTML deterministically (LLM only writes short text blocks)
 # - Accepts 200/201 as WordPress success
+# - LangChain and the LLM clients load on the first LLM call (get_llm), so fetch-only runs start fast
 
-import os
-from dotenv import load_dotenv
-from typing import List, Tuple
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
+import atexit
+import html
+import json
 import logging
-import requests
-from requests.adapters import HTTPAdapter, Retry
+import os
+import re
+import threading
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse, parse_qs
-import feedparser
-import html
-import re
-
-from langchain.prompts import PromptTemplate
-from langchain_core.language_models import BaseLanguageModel
-from langchain_community.llms import Ollama
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse, parse_qs, quote_plus
 
-import os
-from dotenv import load_dotenv
-from typing import List, Tuple
-import logging
-import time
 import requests
+from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter, Retry
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse
-import feedparser
-
-from langchain.prompts import PromptTemplate
-from langchain.tools import Tool
-from langchain.agents import initialize_agent, AgentType
-from langchain_core.language_models import BaseLanguageModel
-
-# LLMs
-from langchain_community.llms import Ollama
-try:
-    from langchain_community.llms import Cohere as LC_Cohere
-    _HAS_LC_COHERE = True
-except Exception:
-    _HAS_LC_COHERE = False
 
 # Import style guide
-from style_guide import STYLE_GUIDE
+from style_guide import PROMPT_PREFIX
+from prompt_template import PromptTemplate
+from cache_store import SqliteCache, MISS, CACHE_DIR
+from llm_cache import cached_invoke, LLM_CACHE
+from llm_stream import StopRule
+from llm_pool import Backend, LLMPool
+from ollama_client import OLLAMA_MODEL, OLLAMA_NATIVE, OllamaClient
+from pipeline import Stage, run_stages
+from instrumentation import RECORDER
+from state_store import StateStore
+from publish_outbox import Outbox, OutboxDrainer
+from conditional_fetch import ConditionalFetcher
+from items import Item
+from render import ARTICLE_LAYOUT, LAYOUTS, get_layout
+from artifact import ARTIFACT_PATH, STAGES, Issue, read_issue, write_issue
+from aggregator import SourceSpec, fan_out, load_source_specs, select
+from ranking import TOPIC_PROFILE, rank_items
+from themes import THEMES, Theme, extract_themes
+from archive import ARCHIVE_MODE, Archive
 
-# -----------------------------------------------------------------------------
-# HTTP Session with retries
-# -----------------------------------------------------------------------------
-# LangChain-based Agentic AI/ML Newsletter Workflow (solid: no empty/broken posts)
-# - Resolves Google News redirect links to final publisher URL
-# - Builds HTML deterministically (LLM only writes short text blocks)
-# - Accepts 200/201 as WordPress success
-
-import os
-from dotenv import load_dotenv
 load_dotenv()
 
 # Config (set in .env)
@@ -68,38 +56,67 @@ SERPSTACK_API_KEY = os.getenv("SERPSTACK_API_KEY", "")
 WORDPRESS_ACCESS_TOKEN = os.getenv("WORDPRESS_ACCESS_TOKEN", "")
 WORDPRESS_SITE_ID = os.getenv("WORDPRESS_SITE_ID", "")
 PUBLISH = os.getenv("PUBLISH", "false").lower() == "true"  # guardrail
+WORDPRESS_POST_STATUS = os.getenv("WORDPRESS_POST_STATUS", "publish")  # "draft" to review before publishing
+PUBLISH_WAIT = float(os.getenv("PUBLISH_WAIT", "120"))  # seconds to wait for the outbox to send a post
+LLM_BATCH = os.getenv("LLM_BATCH", "false").lower() == "true"  # topic/intro/summary in one JSON call
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "0.5"))  # seconds; warn when module import exceeds it
+
+# Generation budgets: streamed outputs stop at the field's rule, and never run past max tokens
+TOPIC_MAX_TOKENS = int(os.getenv("TOPIC_MAX_TOKENS", "40"))
+INTRO_MAX_TOKENS = int(os.getenv("INTRO_MAX_TOKENS", "160"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "260"))
+DRAFT_MAX_TOKENS = int(os.getenv("DRAFT_MAX_TOKENS", "600"))
+INTRO_SENTENCES = int(os.getenv("INTRO_SENTENCES", "3"))
+SUMMARY_SENTENCES = int(os.getenv("SUMMARY_SENTENCES", "5"))
+
+# Source endpoints (overridable for local replay/benchmarks)
+SERPSTACK_URL = os.getenv("SERPSTACK_URL", "http://api.serpstack.com/search")
+GOOGLE_NEWS_SEARCH_URL = os.getenv(
+    "GOOGLE_NEWS_SEARCH_URL", "https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
+)
+ARXIV_URL = os.getenv("ARXIV_URL", "http://export.arxiv.org/api/query")
+
+# arXiv paging: pages are fetched only until enough in-window papers are found
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "25"))
+ARXIV_MAX_PAGES = int(os.getenv("ARXIV_MAX_PAGES", "8"))
+ARXIV_DELAY = float(os.getenv("ARXIV_DELAY", "3"))  # seconds between API calls (arXiv's polite rate)
+
+# Incremental collection: collector.py fills a rolling pool, the build reads it when NEWS_POOL=true
+NEWS_POOL = os.getenv("NEWS_POOL", "false").lower() == "true"
+COLLECT_SERPSTACK_NUM = int(os.getenv("COLLECT_SERPSTACK_NUM", "30"))
+SEEN_RETENTION_DAYS = int(os.getenv("SEEN_RETENTION_DAYS", "21"))
+
+# Redirect resolution (bounded concurrency)
+RESOLVE_MAX_WORKERS = int(os.getenv("RESOLVE_MAX_WORKERS", "8"))
+RESOLVE_PER_HOST = int(os.getenv("RESOLVE_PER_HOST", "4"))
+RESOLVE_DEADLINE = float(os.getenv("RESOLVE_DEADLINE", "45"))  # seconds, whole batch
+
+# Connections kept per host; several editions (editions.py) share this one session
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+# Concurrent LLM calls across all stages (and all editions in batch mode); 0 = unbounded
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "0"))
+
+# Pipeline stage timeouts (seconds); a stage that overruns uses its fallback
+STAGE_TIMEOUT_FETCH = float(os.getenv("STAGE_TIMEOUT_FETCH", "180"))
+STAGE_TIMEOUT_LLM = float(os.getenv("STAGE_TIMEOUT_LLM", "120"))
+
+# Relevance ranking (ranking.py): candidates fetched per source, then the top `num` are kept
+RANK_ITEMS = os.getenv("RANK_ITEMS", "true").lower() == "true"
+RANK_CANDIDATES = int(os.getenv("RANK_CANDIDATES", "20"))
+
+# Persistent caches (CACHE_DIR lives in cache_store)
+URL_CACHE_TTL = float(os.getenv("URL_CACHE_TTL_DAYS", "14")) * 86400
+URL_CACHE_NEGATIVE_TTL = float(os.getenv("URL_CACHE_NEGATIVE_TTL_HOURS", "6")) * 3600
+URL_CACHE_MAX_ENTRIES = int(os.getenv("URL_CACHE_MAX_ENTRIES", "20000"))
 
 # Logging setup (must be before any use of 'log')
-import logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s | %(levelname)s | %(message)s"
 )
 log = logging.getLogger("aiml-newsletter")
 
-from typing import List, Tuple
-import logging
-import time
-import requests
-from requests.adapters import HTTPAdapter, Retry
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse
-import feedparser
-
-from langchain.prompts import PromptTemplate
-from langchain.tools import Tool
-from langchain.agents import initialize_agent, AgentType
-from langchain_core.language_models import BaseLanguageModel
-
-# LLMs
-from langchain_community.llms import Ollama
-try:
-    from langchain_community.llms import Cohere as LC_Cohere
-    _HAS_LC_COHERE = True
-except Exception:
-    _HAS_LC_COHERE = False
-
 # -----------------------------------------------------------------------------
 # HTTP Session with retries
 # -----------------------------------------------------------------------------
@@ -109,29 +126,82 @@ def make_session() -> requests.Session:
         total=3,
         backoff_factor=0.6,
         status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET", "POST"),
+        allowed_methods=("GET",),  # POSTs (WordPress) go through the outbox, which retries them safely
         raise_on_status=False,
     )
     s.headers.update({"User-Agent": "AIML-Newsletter/1.3 (+https://example.com)"})
-    adapter = HTTPAdapter(max_retries=retries)
+    s.hooks["response"].append(RECORDER.http_hook)
+    adapter = HTTPAdapter(max_retries=retries, pool_maxsize=HTTP_POOL_SIZE)
     s.mount("http://", adapter)
     s.mount("https://", adapter)
     return s
 
 HTTP = make_session()
 UTC = timezone.utc
+FEEDS = ConditionalFetcher(HTTP)
+URL_CACHE = SqliteCache(os.path.join(CACHE_DIR, "urls.sqlite"), table="resolved_urls", max_entries=URL_CACHE_MAX_ENTRIES)
 
 # -----------------------------------------------------------------------------
 # LLM setup
 # -----------------------------------------------------------------------------
-def get_llm() -> BaseLanguageModel:
-    if AGENT_MODE == "cohere" and _HAS_LC_COHERE and COHERE_API_KEY:
-        log.info(f"Using Cohere model: {COHERE_MODEL}")
-        return LC_Cohere(cohere_api_key=COHERE_API_KEY, model=COHERE_MODEL)
-    log.info("Falling back to Ollama: phi3")
-    return Ollama(model="phi3")
-
-llm: BaseLanguageModel = get_llm()
+llm: Optional[LLMPool] = None  # built by get_llm() on first use; assign to override (benchmarks)
+_llm_lock = threading.Lock()
+
+def local_llm():
+    """Local Ollama: the native client (keep-alive, fixed num_ctx, per-call timings) or LangChain's."""
+    if OLLAMA_NATIVE:
+        return OllamaClient()
+    from langchain_community.llms import Ollama
+    return Ollama(model=OLLAMA_MODEL)
+
+def build_llm() -> LLMPool:
+    """Cohere (when configured) as primary with local Ollama as hedge/failover, else Ollama alone."""
+    try:
+        from langchain_community.llms import Cohere as LC_Cohere
+        has_lc_cohere = True
+    except Exception:
+        has_lc_cohere = False
+
+    backends = []
+    if AGENT_MODE == "cohere" and has_lc_cohere and COHERE_API_KEY:
+        log.info(f"Using Cohere model: {COHERE_MODEL} (Ollama {OLLAMA_MODEL} as secondary)")
+        backends.append(Backend("cohere", LC_Cohere(cohere_api_key=COHERE_API_KEY, model=COHERE_MODEL)))
+    else:
+        log.info(f"Falling back to Ollama: {OLLAMA_MODEL}")
+    backends.append(Backend("ollama", local_llm()))
+    return LLMPool(backends)
+
+def ollama_client() -> Optional[OllamaClient]:
+    """The native Ollama backend of the shared LLM, if it has one."""
+    backends = llm.backends if isinstance(llm, LLMPool) else [Backend("llm", llm)] if llm is not None else []
+    return next((b.llm for b in backends if isinstance(b.llm, OllamaClient)), None)
+
+def prewarm_llm() -> Optional[threading.Thread]:
+    """
+    Load the local model and evaluate the shared prompt prefix in the background, so the first
+    LLM stage doesn't pay for either. Only when Ollama answers first (no Cohere primary).
+    """
+    if not OLLAMA_NATIVE or (AGENT_MODE == "cohere" and COHERE_API_KEY):
+        return None
+    def warm():
+        with RECORDER.span("llm_prewarm"):
+            get_llm()
+            client = ollama_client()
+            if client is not None:
+                client.warm(PROMPT_PREFIX)
+    t = threading.Thread(target=warm, name="llm-prewarm", daemon=True)
+    t.start()
+    return t
+
+def get_llm():
+    """The shared LLM, built (and LangChain imported) on the first call."""
+    global llm
+    if llm is None:
+        with _llm_lock:
+            if llm is None:
+                with RECORDER.span("llm_init"):
+                    llm = build_llm()
+    return llm
 
 # -----------------------------------------------------------------------------
 # Helpers
@@ -139,19 +209,18 @@ llm: BaseLanguageModel = get_llm()
 def week_ago() -> datetime:
     return datetime.now(UTC) - timedelta(days=7)
 
-def fmt_rfc822(dt: datetime) -> str:
-    return dt.astimezone(UTC).strftime("%a, %d %b %Y %H:%M:%S GMT")
-
 def domain_of(url: str) -> str:
     try:
         return urlparse(url).netloc.replace("www.", "") or "source"
     except Exception:
         return "source"
 
+@RECORDER.timed()
 def resolve_final_url(link: str) -> str:
     """
     Resolve Google News / other redirects to a clean publisher URL.
     Best-effort: follow redirects; if it fails, return original link.
+    Results (including failures, for a shorter TTL) are kept in URL_CACHE across runs.
     """
     if not link:
         return link
@@ -162,312 +231,735 @@ def resolve_final_url(link: str) -> str:
         for key in ("url", "u", "link"):
             if key in qs and qs[key]:
                 return qs[key][0]
-        # Else follow redirects
-        r = HTTP.get(link, timeout=12, allow_redirects=True)
-        final = r.url or link
+    except Exception:
+        return link
+
+    cached = URL_CACHE.get(link)
+    if cached is not MISS:
+        return cached or link  # None = cached failure
+    try:
+        # Else follow redirects; stream so the publisher page body is never downloaded
+        with HTTP.get(link, timeout=12, allow_redirects=True, stream=True) as r:
+            final = r.url or link
         # guard against news.google.com final
+        URL_CACHE.set(link, final, ttl=URL_CACHE_TTL)
         return final
     except Exception:
+        URL_CACHE.set(link, None, ttl=URL_CACHE_NEGATIVE_TTL)
         return link
 
-def li(title: str, url: str, src: str, published: str) -> str:
-    return f'<li><a href="{html.escape(url, quote=True)}">{html.escape(title)}</a> — <em>{html.escape(src)} • {html.escape(published)}</em></li>'
+@RECORDER.timed()
+def resolve_final_urls(links: List[str], deadline: float = RESOLVE_DEADLINE) -> List[str]:
+    """
+    Resolve a batch of links concurrently; results keep the input order.
+    Concurrency is bounded overall (RESOLVE_MAX_WORKERS) and per host (RESOLVE_PER_HOST).
+    Links still pending when the deadline expires keep their original URL,
+    the same fallback resolve_final_url uses on errors.
+    """
+    unique = list(dict.fromkeys(l for l in links if l))
+    if not unique:
+        return list(links)
+
+    host_slots = {
+        host: threading.BoundedSemaphore(RESOLVE_PER_HOST)
+        for host in {urlparse(l).netloc for l in unique}
+    }
+
+    def work(link: str) -> str:
+        with host_slots[urlparse(link).netloc]:
+            return resolve_final_url(link)
+
+    resolved = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, min(RESOLVE_MAX_WORKERS, len(unique))))
+    futures = {pool.submit(work, link): link for link in unique}
+    try:
+        for fut in as_completed(futures, timeout=max(0.0, deadline)):
+            resolved[futures[fut]] = fut.result()
+    except FuturesTimeout:
+        log.warning(f"Redirect resolution deadline hit: {len(unique) - len(resolved)}/{len(unique)} links left unresolved")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return [resolved.get(l, l) for l in links]
 
 # -----------------------------------------------------------------------------
-# Step 1: Fetch news (Serpstack -> Google News RSS fallback)
+# Step 1: Source fetchers (one per SourceSpec kind, all return in-window Items)
 # -----------------------------------------------------------------------------
-def fetch_news(query: str = "artificial intelligence machine learning", num: int = 6) -> Tuple[str, List[Tuple[str, str, str]]]:
-    items: List[str] = []
-    sources: List[Tuple[str, str, str]] = []
-    seen = set()
-    cutoff = week_ago()
-
-    # Serpstack
-    if SERPSTACK_API_KEY:
-        try:
-            params = {"access_key": SERPSTACK_API_KEY, "query": query, "type": "news", "num": num}
-            resp = HTTP.get("http://api.serpstack.com/search", params=params, timeout=15)
-            data = resp.json() if resp.ok else {}
-            for it in (data.get("news_results") or [])[: num * 3]:
-                title = (it.get("title") or "").strip()
-                raw_url = (it.get("url") or "").strip()
-                if not title or not raw_url:
-                    continue
-                src = (it.get("source_name") or "").strip() or domain_of(raw_url)
-                published = (it.get("published") or "").strip()
+NEWS_OVERFETCH = 3  # news fetchers keep up to limit * this many results (dedupe/screening thin them out)
+
+def fetched_limit(kind: str, limit: int) -> int:
+    """Most candidates SOURCE_FETCHERS[kind] returns when asked for `limit` items."""
+    return limit * NEWS_OVERFETCH if kind in ("serpstack", "google_news", "rss") else limit
+
+def serpstack_items(spec: SourceSpec, cutoff: datetime, limit: int, skip_unchanged: bool = False) -> List[Item]:
+    """Serpstack news results for spec.query, feed order."""
+    if not SERPSTACK_API_KEY:
+        return []
+    with RECORDER.span("serpstack"):
+        params = {"access_key": SERPSTACK_API_KEY, "query": spec.query, "type": "news", "num": limit}
+        fetched = FEEDS.fetch(SERPSTACK_URL, params=params, timeout=15, scope="collect" if skip_unchanged else "")
+        if skip_unchanged and fetched.not_modified:
+            return []
+        with fetched.open() as f:
+            data = json.load(f)
+        items = []
+        for it in (data.get("news_results") or [])[: fetched_limit(spec.kind, limit)]:
+            title = (it.get("title") or "").strip()
+            raw_url = (it.get("url") or "").strip()
+            if not title or not raw_url:
+                continue
+            src = (it.get("source_name") or "").strip() or domain_of(raw_url)
+            published = (it.get("published") or "").strip()
+            try:
+                pub_dt = datetime.fromisoformat(published.replace("Z", "+00:00"))
+            except Exception:
                 try:
-                    pub_dt = datetime.fromisoformat(published.replace("Z", "+00:00"))
+                    pub_dt = datetime.strptime(published[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=UTC)
                 except Exception:
-                    try:
-                        pub_dt = datetime.strptime(published[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=UTC)
-                    except Exception:
-                        pub_dt = None
-                if not pub_dt or pub_dt < cutoff:
-                    continue
-                url = resolve_final_url(raw_url)
-                key = (title, url)
-                if key in seen:
-                    continue
-                seen.add(key)
-                items.append(li(title, url, src, fmt_rfc822(pub_dt)))
-                sources.append((title, url, src))
-                if len(items) >= num:
-                    break
-            if items:
-                return "\n".join(items), sources
-        except Exception as e:
-            log.warning(f"Serpstack failed: {e}")
+                    pub_dt = None
+            if not pub_dt or pub_dt < cutoff:
+                continue
+            items.append(Item(title, raw_url, src, pub_dt, id=raw_url))
+        return items
 
-    # Google News RSS fallback
-    log.info("Falling back to Google News RSS…")
-    feed = feedparser.parse(
-        "https://news.google.com/rss/search?q=artificial+intelligence+machine+learning&hl=en-US&gl=US&ceid=US:en"
-    )
-    for entry in feed.entries:
-        title = getattr(entry, "title", "").strip()
-        raw_link = getattr(entry, "link", "").strip()
-        published = getattr(entry, "published", "").strip()
-        if not title or not raw_link or not published:
-            continue
-        try:
-            pub_dt = datetime(*entry.published_parsed[:6], tzinfo=UTC)  # type: ignore[attr-defined]
-        except Exception:
+def google_news_url(spec: SourceSpec) -> str:
+    return spec.url or GOOGLE_NEWS_SEARCH_URL.format(q=quote_plus(spec.query))
+
+def rss_items(spec: SourceSpec, cutoff: datetime, limit: int, skip_unchanged: bool = False) -> List[Item]:
+    """
+    In-window RSS/Atom entries (Google News search/topic feeds and publisher feeds).
+    src is left empty and filled from the resolved URL's domain.
+    skip_unchanged: return nothing when the feed is unchanged since the collector last read it.
+    """
+    url = google_news_url(spec) if spec.kind == "google_news" else spec.url
+    with RECORDER.span("google_news_rss" if spec.kind == "google_news" else "rss"):
+        fetched = FEEDS.fetch(url, timeout=20, scope="collect" if skip_unchanged else "")
+        if skip_unchanged and fetched.not_modified:
+            return []
+        import feedparser  # deferred: ~60ms that assemble/publish-only runs never need
+        with fetched.open() as f:
+            feed = feedparser.parse(f)
+        items = []
+        for entry in feed.entries:
+            title = getattr(entry, "title", "").strip()
+            raw_link = getattr(entry, "link", "").strip()
+            published = (getattr(entry, "published", "") or getattr(entry, "updated", "")).strip()
+            if not title or not raw_link or not published:
+                continue
             try:
-                pub_dt = datetime.strptime(published[:16], "%a, %d %b %Y").replace(tzinfo=UTC)
+                parsed = getattr(entry, "published_parsed", None) or entry.updated_parsed  # type: ignore[attr-defined]
+                pub_dt = datetime(*parsed[:6], tzinfo=UTC)
             except Exception:
-                pub_dt = None
-        if not pub_dt or pub_dt < cutoff:
-            continue
-        url = resolve_final_url(raw_link)
-        src = domain_of(url)
-        key = (title, url)
-        if key in seen:
-            continue
-        seen.add(key)
-        items.append(li(title, url, src, fmt_rfc822(pub_dt)))
-        sources.append((title, url, src))
-        if len(items) >= num:
-            break
-
-    if not items:
-        items = ['<li>No recent news found.</li>']
-    return "\n".join(items), sources
+                try:
+                    pub_dt = datetime.strptime(published[:16], "%a, %d %b %Y").replace(tzinfo=UTC)
+                except Exception:
+                    pub_dt = None
+            if not pub_dt or pub_dt < cutoff:
+                continue
+            items.append(Item(title, raw_link, "", pub_dt, id=getattr(entry, "id", "") or raw_link))
+            if len(items) >= fetched_limit(spec.kind, limit):
+                break
+        return items
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+_arxiv_lock = threading.Lock()
+_arxiv_last_call = 0.0
+
+def _arxiv_polite_wait() -> None:
+    # arXiv asks API clients to leave ARXIV_DELAY seconds between requests
+    global _arxiv_last_call
+    with _arxiv_lock:
+        wait = _arxiv_last_call + ARXIV_DELAY - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _arxiv_last_call = time.monotonic()
+
+def iter_arxiv_entries(search_query: str = "cat:cs.AI OR cat:cs.LG", page_size: int = ARXIV_PAGE_SIZE,
+                       max_pages: int = ARXIV_MAX_PAGES,
+                       skip_unchanged: bool = False) -> Iterator[Tuple[str, str, str, Optional[datetime]]]:
+    """
+    Stream (title, summary, link, updated) for arXiv entries, newest update first.
+    Pages are requested lazily (stop iterating and no further page is fetched), fetched
+    conditionally and parsed with iterparse from the on-disk body; each <entry> is cleared
+    once read, so memory stays flat however many pages are scanned. Entries with a
+    missing/invalid <updated> yield None for the date.
+    skip_unchanged: stop at the first page unchanged since the collector last read it.
+    """
+    headers = {"User-Agent": "AIML-Newsletter/1.3 (arXiv polite bot)"}
+    for page in range(max_pages):
+        params = {
+            "search_query": search_query,
+            "start": page * page_size,
+            "max_results": page_size,
+            "sortBy": "lastUpdatedDate",
+            "sortOrder": "descending",
+        }
+        _arxiv_polite_wait()
+        fetched = FEEDS.fetch(ARXIV_URL, params=params, headers=headers, timeout=20,
+                              scope="collect" if skip_unchanged else "")
+        if skip_unchanged and fetched.not_modified:
+            return
+        with fetched.open() as body:
+            seen_on_page = 0
+            root = None
+            for event, elem in ET.iterparse(body, events=("start", "end")):
+                if root is None:
+                    root = elem
+                if event != "end" or elem.tag != ATOM_NS + "entry":
+                    continue
+                seen_on_page += 1
+                title = (elem.findtext(ATOM_NS + "title") or "").strip()
+                summary = (elem.findtext(ATOM_NS + "summary") or "").strip()
+                link = (elem.findtext(ATOM_NS + "id") or "").strip()
+                updated = (elem.findtext(ATOM_NS + "updated") or "").strip()
+                root.clear()  # drops this entry (and anything before it) from the tree
+                try:
+                    upd_dt = datetime.strptime(updated[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=UTC)
+                except Exception:
+                    upd_dt = None
+                yield title, summary, link, upd_dt
+        if seen_on_page < page_size:
+            return  # last page
+
+def arxiv_items(spec: SourceSpec, cutoff: datetime, limit: int, skip_unchanged: bool = False) -> List[Item]:
+    """Up to `limit` in-window papers for spec.categories (spec.query overrides the search)."""
+    search = spec.query or " OR ".join(f"cat:{c}" for c in (spec.categories or ["cs.AI", "cs.LG"]))
+    items: List[Item] = []
+    entries = iter_arxiv_entries(search, page_size=max(limit, ARXIV_PAGE_SIZE), skip_unchanged=skip_unchanged)
+    try:
+        for title, summary, link, upd_dt in entries:
+            if upd_dt and upd_dt < cutoff:
+                break  # sorted by lastUpdatedDate desc: everything after is older too
+            if not title or not link or not upd_dt:
+                continue
+            items.append(Item(title, link, "arXiv", upd_dt, kind="paper", summary=summary, id=link, resolved=True))
+            if len(items) >= limit:
+                break
+    finally:
+        entries.close()
+    return items
+
+SOURCE_FETCHERS = {"serpstack": serpstack_items, "google_news": rss_items, "rss": rss_items, "arxiv": arxiv_items}
+
+def select_items(groups: Dict[str, List[Item]], specs: List[SourceSpec], num: int, query: str = "",
+                 profile: str = TOPIC_PROFILE, site_id: str = "") -> List[Item]:
+    """
+    One merge pass over all sources: interleave, near-dup clustering, archive screening against
+    the issues site_id got in the last ARCHIVE_WEEKS, relevance ranking against profile + query,
+    quotas, wave resolution, dedupe.
+    """
+    def rank(candidates: List[Item]) -> List[Item]:
+        weights = None
+        if ARCHIVE_MODE != "off":
+            with RECORDER.span("archive_lookup"):
+                candidates, weights = get_archive().screen(candidates, site_id or WORDPRESS_SITE_ID)
+        if not RANK_ITEMS:  # newest first, covered stories (weight < 1) after the fresh ones
+            by_date = sorted(zip(candidates, weights or [1.0] * len(candidates)),
+                             key=lambda pair: pair[0].published, reverse=True)
+            return [it for it, _ in sorted(by_date, key=lambda pair: pair[1], reverse=True)]
+        with RECORDER.span("rank"):
+            return rank_items(candidates, f"{profile} {query}", weights=weights)
+
+    with RECORDER.span(f"select_{specs[0].item_kind if specs else 'items'}"):
+        picked = select(groups, num, {s.name: s.quota for s in specs}, resolve=resolve_final_urls,
+                        deadline_at=time.monotonic() + RESOLVE_DEADLINE, wave=RESOLVE_MAX_WORKERS,
+                        rank=rank if (RANK_ITEMS or ARCHIVE_MODE != "off") else None)
+        for it in picked:
+            it.src = it.src or domain_of(it.url)
+            for alt in it.alternates:
+                alt.src = alt.src or domain_of(alt.url)
+        return picked
+
+def news_specs(query: str) -> List[SourceSpec]:
+    return [s for s in load_source_specs(query) if s.item_kind == "news"]
+
+def paper_specs(query: str) -> List[SourceSpec]:
+    return [s for s in load_source_specs(query) if s.item_kind == "paper"]
+
+def candidate_limit(num: int) -> int:
+    """Candidates fetched per source for a section of `num` items (more when ranking picks the best)."""
+    return max(num, RANK_CANDIDATES) if RANK_ITEMS else num
 
 # -----------------------------------------------------------------------------
-# Step 2: Fetch arXiv (recent by updated date)
+# Incremental collection ("since last run") into a rolling weekly pool
 # -----------------------------------------------------------------------------
-def fetch_arxiv(max_results: int = 6) -> Tuple[str, List[Tuple[str, str, str]]]:
-    ARXIV_URL = "http://export.arxiv.org/api/query"
-    params = {
-        "search_query": "cat:cs.AI+OR+cat:cs.LG",
-        "start": 0,
-        "max_results": max_results,
-        "sortBy": "lastUpdatedDate",
-        "sortOrder": "descending",
-    }
-    headers = {"User-Agent": "AIML-Newsletter/1.3 (arXiv polite bot)"}
-    cutoff = week_ago()
+_archive: Optional[Archive] = None
+_archive_lock = threading.Lock()
+
+def get_archive() -> Archive:
+    """Archive of published issues, opened on first use (news and paper selection run concurrently)."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = Archive()
+    return _archive
+
+_state_store: Optional[StateStore] = None
+
+def get_state_store() -> StateStore:
+    global _state_store
+    if _state_store is None:
+        _state_store = StateStore()
+    return _state_store
+
+def _collect_source(store: StateStore, spec: SourceSpec, cutoff: datetime) -> int:
+    # Item IDs (raw links, arXiv ids) decide what is new; only new news links get resolved.
+    # arXiv is sorted by update time, so paging stops at the source's high-water mark.
+    hwm = store.high_water(spec.name)
+    since = max(cutoff, hwm) if (hwm and spec.item_kind == "paper") else cutoff
+    limit = spec.limit or (COLLECT_SERPSTACK_NUM if spec.kind == "serpstack" else ARXIV_PAGE_SIZE * ARXIV_MAX_PAGES)
+    items = SOURCE_FETCHERS[spec.kind](spec, since, limit, skip_unchanged=True)
+    new_ids = set(store.unseen(spec.name, [it.id for it in items]))
+    fresh = [it for it in items if it.id in new_ids]
+    pending = [it for it in fresh if spec.resolve and not it.resolved]
+    for it, url in zip(pending, resolve_final_urls([it.url for it in pending])):
+        it.url = url
+    rows = [
+        {"id": it.id, "title": it.title, "url": it.url, "src": it.src or domain_of(it.url),
+         "summary": it.summary, "published": it.published}
+        for it in fresh
+    ]
+    return store.add_items(spec.name, spec.item_kind, rows)
 
-    try:
-        resp = HTTP.get(ARXIV_URL, params=params, headers=headers, timeout=20)
-        resp.raise_for_status()
-        root = ET.fromstring(resp.content)
-    except Exception as e:
-        log.warning(f"arXiv fetch failed: {e}")
-        return "<li>No recent research found.</li>", []
-
-    ns = {"a": "http://www.w3.org/2005/Atom"}
-    lis: List[str] = []
-    sources: List[Tuple[str, str, str]] = []
-
-    for entry in root.findall("a:entry", ns):
-        title = (entry.findtext("a:title", default="", namespaces=ns) or "").strip()
-        summary = (entry.findtext("a:summary", default="", namespaces=ns) or "").strip()
-        link = (entry.findtext("a:id", default="", namespaces=ns) or "").strip()
-        updated = (entry.findtext("a:updated", default="", namespaces=ns) or "").strip()
-        if not title or not link or not updated:
+@RECORDER.timed()
+def collect_incremental(query: str = "artificial intelligence machine learning") -> Dict[str, int]:
+    """Add only new items from every configured source to the pool; returns {source: items added}."""
+    store = get_state_store()
+    cutoff = week_ago()
+    added: Dict[str, int] = {}
+    for spec in load_source_specs(query):
+        if spec.kind == "serpstack" and not SERPSTACK_API_KEY:
             continue
         try:
-            upd_dt = datetime.strptime(updated[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=UTC)
-        except Exception:
-            upd_dt = None
-        if not upd_dt or upd_dt < cutoff:
-            continue
-        text = f"{title}: {summary[:220].rstrip()}…" if len(summary) > 240 else f"{title}: {summary}"
-        lis.append(li(text, link, "arXiv", fmt_rfc822(upd_dt)))
-        sources.append((title, link, "arXiv"))
-        if len(lis) >= max_results:
-            break
-
-    if not lis:
-        return "<li>No recent research found.</li>", sources
-    return "\n".join(lis), sources
+            added[spec.name] = _collect_source(store, spec, cutoff)
+        except Exception as e:
+            log.warning(f"Collect failed for {spec.name}: {e}")
+    store.prune(pool_before=cutoff - timedelta(days=1), seen_before=datetime.now(UTC) - timedelta(days=SEEN_RETENTION_DAYS))
+    log.info(f"Collected new items: {added}")
+    return added
+
+def pool_groups(kind: str, specs: List[SourceSpec]) -> Dict[str, List[Item]]:
+    groups: Dict[str, List[Item]] = {s.name: [] for s in specs}
+    for row in get_state_store().pool_items(kind, week_ago()):
+        if row["source"] in groups:
+            groups[row["source"]].append(Item(row["title"], row["url"], row["src"], row["published"], kind=kind,
+                                              source=row["source"], summary=row["summary"], id=row["id"], resolved=True))
+    return groups
+
+def candidate_groups(kind: str, specs: List[SourceSpec], num: int) -> Dict[str, List[Item]]:
+    """Every candidate per source: the rolling pool when NEWS_POOL is on and has items, else a cold fetch."""
+    with RECORDER.span(f"fetch_{kind}"):
+        if NEWS_POOL:
+            pooled = pool_groups(kind, specs)
+            if any(pooled.values()):
+                return pooled
+            log.info(f"{kind.capitalize()} pool is empty; doing a cold fetch")
+        return fan_out(specs, SOURCE_FETCHERS, week_ago(), candidate_limit(num))
+
+def theme_stage(*groups: Dict[str, List[Item]]) -> List[Theme]:
+    """Ranked themes over all candidates (not only the picked items)."""
+    if not THEMES:
+        return []
+    with RECORDER.span("themes"):
+        themes = extract_themes([it for g in groups for items in g.values() for it in items])
+    log.info(f"Themes: {'; '.join(f'{t.label} ({t.size})' for t in themes) or 'none'}")
+    return themes
 
 # -----------------------------------------------------------------------------
 # Tiny prompts (LLM only for topic + short paragraphs)
 # -----------------------------------------------------------------------------
 
+# Every prompt is PROMPT_PREFIX (the style guide, byte-identical), then fixed instructions, then the
+# variable part last, so a local backend only evaluates the tail of each call (see ollama_client.py)
 topic_prompt = PromptTemplate(
     input_variables=["bullets"],
+    prefix=PROMPT_PREFIX,
     template=(
-        STYLE_GUIDE + "\n\nFrom these weekly AI/ML items, write ONLY a single, specific, captivating topic title (max 12 words, no clickbait, no quotes, no explanations, no labels, no extra text).\n{bullets}"
+        "From these weekly AI/ML items, write ONLY a single, specific, captivating topic title (max 12 words, no clickbait, no quotes, no explanations, no labels, no extra text).\n{bullets}"
     ),
 )
 
 
 intro_prompt = PromptTemplate(
     input_variables=["topic", "why"],
+    prefix=PROMPT_PREFIX,
     template=(
-        STYLE_GUIDE + "\n\nWrite ONLY a punchy, practitioner-focused introduction (2–3 sentences) for the newsletter topic below. Use a concrete tension, question, or surprising stat as a hook. Do not include any labels, explanations, or extra text.\nTOPIC: {topic}\nREASONS: {why}\nNo markdown, no emojis, no links."
+        "Write ONLY a punchy, practitioner-focused introduction (2–3 sentences) for the newsletter topic below. Use a concrete tension, question, or surprising stat as a hook. Do not include any labels, explanations, or extra text. No markdown, no emojis, no links.\nTOPIC: {topic}\nREASONS: {why}"
     ),
 )
 
 
 summary_prompt = PromptTemplate(
     input_variables=["topic"],
+    prefix=PROMPT_PREFIX,
+    template=(
+        "Write ONLY 2–4 sentences summarizing what the week means for practitioners for the topic below. Include actionable takeaways and a 'WHY IT MATTERS' block, but do not include any labels, explanations, or extra text. No markdown, no emojis, no links.\nTOPIC: {topic}"
+    ),
+)
+
+# Batched mode (LLM_BATCH=true): one request returns all three fields as a JSON object
+draft_prompt = PromptTemplate(
+    input_variables=["bullets", "why"],
+    prefix=PROMPT_PREFIX,
     template=(
-        STYLE_GUIDE + "\n\nWrite ONLY 2–4 sentences summarizing what the week means for practitioners for the topic: {topic}. Include actionable takeaways and a 'WHY IT MATTERS' block, but do not include any labels, explanations, or extra text. No markdown, no emojis, no links."
+        "From the weekly AI/ML items below, write the newsletter's topic, introduction and summary.\n"
+        "Return ONLY a JSON object with exactly these string fields and nothing before or after it:\n"
+        '{{"topic": "single, specific, captivating topic title (max 12 words, no clickbait, no quotes)", '
+        '"intro": "punchy, practitioner-focused introduction (2–3 sentences) with a concrete tension, question, or surprising stat as a hook", '
+        '"summary": "2–4 sentences on what the week means for practitioners, with actionable takeaways and a WHY IT MATTERS block"}}\n'
+        "No labels, explanations, markdown, emojis or links inside the fields.\n\n"
+        "{bullets}\nREASONS: {why}"
     ),
 )
 
-def llm_text(prompt: PromptTemplate, **kwargs) -> str:
-    out = llm.invoke(prompt.format(**kwargs))  # type: ignore[arg-type]
+DRAFT_SCHEMA = {"topic": 20, "intro": 120, "summary": 160}
+
+def parse_draft(text: str) -> Dict[str, str]:
+    """Valid fields of a batched JSON answer (code fences and surrounding chatter tolerated)."""
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        field: data[field].strip()
+        for field, max_words in DRAFT_SCHEMA.items()
+        if isinstance(data.get(field), str) and data[field].strip() and len(data[field].split()) <= max_words
+    }
+
+class LLMSlots:
+    """Bounded number of in-flight LLM calls, shared by every caller in the process (0 = unbounded)."""
+
+    def __init__(self, limit: int = 0):
+        self.set_limit(limit)
+
+    def set_limit(self, limit: int) -> None:
+        self.limit = limit
+        self._sem = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    def __enter__(self):
+        if self._sem is not None:
+            self._sem.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        if self._sem is not None:
+            self._sem.release()
+
+LLM_SLOTS = LLMSlots(LLM_MAX_CONCURRENCY)
+
+@RECORDER.timed()
+def llm_text(prompt: PromptTemplate, stop: Optional[StopRule] = None, max_tokens: Optional[int] = None, **kwargs) -> str:
+    """Render and generate; stop/max_tokens cut the (streamed) output short once it is complete."""
+    with LLM_SLOTS:
+        out = cached_invoke(get_llm(), prompt.format(**kwargs), stop_rule=stop, max_tokens=max_tokens)
     return html.escape(str(out).strip())
 
+@RECORDER.timed()
+def llm_draft(**kwargs) -> Dict[str, str]:
+    """Batched topic/intro/summary, HTML-escaped per field like llm_text; {} if the answer is unusable."""
+    with LLM_SLOTS:
+        raw = cached_invoke(get_llm(), draft_prompt.format(**kwargs), stop_rule=StopRule.json_object(),
+                            max_tokens=DRAFT_MAX_TOKENS)
+    fields = parse_draft(str(raw))
+    return {field: html.escape(value) for field, value in fields.items()}
+
 # -----------------------------------------------------------------------------
-# WordPress publish (accept 200 or 201)
+# WordPress publish through the durable outbox (publish_outbox.py)
 # -----------------------------------------------------------------------------
-def publish_to_wordpress(title: str, content: str) -> str:
+_drainer: Optional[OutboxDrainer] = None
+_drainer_lock = threading.Lock()
+
+def get_drainer() -> OutboxDrainer:
+    """The outbox and its background sender, opened on the first publish."""
+    global _drainer
+    with _drainer_lock:
+        if _drainer is None:
+            _drainer = OutboxDrainer(Outbox())
+            _drainer.session.hooks["response"].append(RECORDER.http_hook)
+    return _drainer
+
+@RECORDER.timed()
+def publish_to_wordpress(title: str, content: str, site_id: str = "", token: str = "",
+                         token_env: str = "WORDPRESS_ACCESS_TOKEN", slot: str = "", force: bool = False) -> str:
+    """
+    Queue the post for site_id (default: WORDPRESS_SITE_ID / WORDPRESS_ACCESS_TOKEN) and wait up to
+    PUBLISH_WAIT for it to be sent. slot groups versions of one issue, so a draft gets updated in place.
+    """
     if not PUBLISH:
         return f"(dry-run) Would publish: {title}"
 
+    site_id = site_id or WORDPRESS_SITE_ID
+    token = token or WORDPRESS_ACCESS_TOKEN
     missing = []
-    if not WORDPRESS_ACCESS_TOKEN:
-        missing.append("WORDPRESS_ACCESS_TOKEN")
-    if not WORDPRESS_SITE_ID:
+    if not token:
+        missing.append(token_env)
+    if not site_id:
         missing.append("WORDPRESS_SITE_ID")
     if missing:
         raise RuntimeError(f"Missing env vars: {', '.join(missing)}")
 
-    url = f"https://public-api.wordpress.com/rest/v1.1/sites/{WORDPRESS_SITE_ID}/posts/new"
-    headers = {
-        "Authorization": f"Bearer {WORDPRESS_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    data = {"title": title, "content": content, "status": "publish"}
-
-    resp = HTTP.post(url, headers=headers, json=data, timeout=25)
-    if resp.status_code in (200, 201):  # WordPress.com may return 200 with JSON body
-        try:
-            wp_url = resp.json().get("URL", "<no-url>")
-        except Exception:
-            wp_url = "<no-url>"
-        return f"Post published: {wp_url}"
-    raise RuntimeError(f"Failed to publish ({resp.status_code}): {resp.text}")
+    drainer = get_drainer()
+    key = drainer.outbox.enqueue(site_id, title, content, status=WORDPRESS_POST_STATUS, slot=slot,
+                                 token_env=token_env, force=force)
+    if drainer.outbox.get(key).state == "failed":  # publishing again retries a failed post
+        drainer.outbox.retry(key)
+    drainer.submit(key, token_env, token)
+    entry = drainer.wait(key, PUBLISH_WAIT)
+    if entry.state == "sent":
+        return f"Post {'published' if entry.status == 'publish' else 'saved as draft'}: {entry.url}"
+    if entry.state == "failed":
+        raise RuntimeError(f"Failed to publish ({entry.error}); the post is kept in the outbox")
+    raise RuntimeError(f"Post still queued after {PUBLISH_WAIT:g}s ({entry.error or 'not sent yet'}); "
+                       f"`python publish_outbox.py drain` sends it later")
 
 # -----------------------------------------------------------------------------
 # Assemble HTML deterministically
 # -----------------------------------------------------------------------------
-def build_references_html(sources: List[Tuple[str, str, str]]) -> str:
-    # sources: list of (title, url, source)
-    uniq = []
-    seen = set()
-    for t,u,s in sources:
-        key = (t,u)
-        if key in seen: 
-            continue
-        seen.add(key)
-        uniq.append((t,u,s))
-    if not uniq:
-        return "<li>No references available.</li>"
-    lis = [
-        f'<li><a href="{html.escape(u, quote=True)}">{html.escape(s)} — {html.escape(t)}</a></li>'
-        for (t,u,s) in uniq
-    ]
-    return "\n".join(lis)
-
-def assemble_article(topic: str, intro_txt: str, news_html: str, papers_html: str, summary_txt: str, refs_html: str) -> str:
-    # Ensure lists aren’t empty
-    news_block = news_html.strip() or "<li>No recent news found.</li>"
-    papers_block = papers_html.strip() or "<li>No recent research found.</li>"
+@RECORDER.timed()
+def assemble_article(topic: str, intro_txt: str, news: List[Item], papers: List[Item], summary_txt: str,
+                     layout: str = ARTICLE_LAYOUT) -> str:
+    # Lists and references are rendered from the items by the layout's templates (render.py);
+    # topic/intro/summary arrive HTML-escaped from llm_text
+    return get_layout(layout).article(topic, intro_txt, news, papers, summary_txt)
 
-    return f"""
-<h2 style='font-size:2em; font-weight:800; margin-bottom:0.2em;'>AI/ML Weekly: {html.escape(topic)}</h2>
-
-<h3 style='font-size:1.3em; font-weight:600; margin-top:0;'>This Week's Big Idea</h3>
-
-<h4>Introduction</h4>
-<p>{intro_txt}</p>
+# -----------------------------------------------------------------------------
+# Pipeline (independent stages run concurrently; every stage has a fallback)
+# -----------------------------------------------------------------------------
+DEFAULT_TOPIC = "Key AI/ML Highlights"
+DEFAULT_INTRO = "A quick tour of the most useful AI/ML developments this week."
+DEFAULT_SUMMARY = "Expect continued iteration across models, tooling, and applied ML in production."
 
-<h4>In the News:</h4>
-<ul>
-{news_block}
-</ul>
+def clean_topic(t: str) -> str:
+    # Clean up topic: remove prompt artifacts and quotes
+    t = t.strip()
+    # Remove common prompt artifacts
+    t = re.sub(r"^(Here is a proposed topic title:|Title:|This title.*:)", "", t, flags=re.IGNORECASE)
+    t = t.replace('"', '').replace("'", "")
+    t = re.sub(r"^[:\s]+", "", t)
+    # Remove trailing explanations if present
+    t = t.split("\n")[0]
+    return t.strip()
+
+THEME_PROMPT_LINES = 3  # themes in the topic prompt (they replace the item bullets)
+
+def topic_bullets(news: List[Item], papers: List[Item], themes: Sequence[Theme] = ()) -> str:
+    bullets = [t.prompt_line() for t in themes[:THEME_PROMPT_LINES]] or [it.prompt_line() for it in (news + papers)[:6]]
+    return "\n".join(bullets) if bullets else "- Weekly highlights and notable updates"
+
+def why_fragments(news: List[Item], papers: List[Item]) -> str:
+    return ", ".join([it.title for it in (news + papers)[:3]]) or "notable updates across AI applications and research"
+
+def topic_stage(news, papers, themes=()) -> str:
+    raw_topic = llm_text(topic_prompt, stop=StopRule.first_line(clean_topic), max_tokens=TOPIC_MAX_TOKENS,
+                         bullets=topic_bullets(news, papers, themes)) or DEFAULT_TOPIC
+    return clean_topic(raw_topic) or DEFAULT_TOPIC
+
+def intro_stage(topic, news, papers) -> str:
+    return llm_text(intro_prompt, stop=StopRule.sentences(INTRO_SENTENCES), max_tokens=INTRO_MAX_TOKENS,
+                    topic=topic, why=why_fragments(news, papers)) or html.escape(DEFAULT_INTRO)
+
+def summary_stage(topic) -> str:
+    return llm_text(summary_prompt, stop=StopRule.sentences(SUMMARY_SENTENCES), max_tokens=SUMMARY_MAX_TOKENS,
+                    topic=topic) or html.escape(DEFAULT_SUMMARY)
+
+def draft_stage(news, papers, themes=()) -> Dict[str, str]:
+    draft = llm_draft(bullets=topic_bullets(news, papers, themes), why=why_fragments(news, papers))
+    if "topic" in draft:
+        draft["topic"] = clean_topic(draft["topic"])
+        if not draft["topic"]:
+            del draft["topic"]
+    missing = [f for f in DRAFT_SCHEMA if f not in draft]
+    if missing:
+        log.warning(f"Batched generation incomplete; per-field calls for: {', '.join(missing)}")
+    return draft
+
+def build_stages(query: str = "artificial intelligence machine learning", num: int = 6) -> List[Stage]:
+    """The whole build in one graph (fetch + generate); "news"/"papers" yield the picked items, "themes" the themes."""
+    return [
+        *source_stages(query, num),
+        *(llm_stages_batched() if LLM_BATCH else llm_stages()),
+    ]
 
-<h4>Research Breakthroughs:</h4>
-<ul>
-{papers_block}
-</ul>
+def source_stages(query: str, num: int) -> List[Stage]:
+    # Candidates first; selection (link resolution) and theme extraction then run side by side
+    n_specs, p_specs = news_specs(query), paper_specs(query)
+    return [
+        Stage("news_candidates", lambda: candidate_groups("news", n_specs, num), timeout=STAGE_TIMEOUT_FETCH,
+              fallback=lambda: {}),
+        Stage("paper_candidates", lambda: candidate_groups("paper", p_specs, num), timeout=STAGE_TIMEOUT_FETCH,
+              fallback=lambda: {}),
+        Stage("news", lambda news_candidates: select_items(news_candidates, n_specs, num, query),
+              deps=("news_candidates",), timeout=STAGE_TIMEOUT_FETCH, fallback=lambda news_candidates: []),
+        Stage("papers", lambda paper_candidates: select_items(paper_candidates, p_specs, num, query),
+              deps=("paper_candidates",), timeout=STAGE_TIMEOUT_FETCH, fallback=lambda paper_candidates: []),
+        Stage("themes", lambda news_candidates, paper_candidates: theme_stage(news_candidates, paper_candidates),
+              deps=("news_candidates", "paper_candidates"),
+              fallback=lambda news_candidates, paper_candidates: []),
+    ]
 
-<h4>Summary &amp; Implications</h4>
-<p>{summary_txt}</p>
+def llm_stages() -> List[Stage]:
+    return [
+        Stage("topic", topic_stage, deps=("news", "papers", "themes"), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda news, papers, themes: DEFAULT_TOPIC),
+        Stage("intro", intro_stage, deps=("topic", "news", "papers"), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda topic, news, papers: html.escape(DEFAULT_INTRO)),
+        Stage("summary", summary_stage, deps=("topic",), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda topic: html.escape(DEFAULT_SUMMARY)),
+    ]
 
-<h4>References</h4>
-<ul>
-{refs_html}
-</ul>
+def llm_stages_batched() -> List[Stage]:
+    # One "draft" call; each field falls back to its own prompt only when the draft lacks it
+    return [
+        Stage("draft", draft_stage, deps=("news", "papers", "themes"), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda news, papers, themes: {}),
+        Stage("topic", lambda draft, news, papers, themes: draft.get("topic") or topic_stage(news, papers, themes),
+              deps=("draft", "news", "papers", "themes"), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda draft, news, papers, themes: DEFAULT_TOPIC),
+        Stage("intro", lambda draft, topic, news, papers: draft.get("intro") or intro_stage(topic, news, papers),
+              deps=("draft", "topic", "news", "papers"), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda draft, topic, news, papers: html.escape(DEFAULT_INTRO)),
+        Stage("summary", lambda draft, topic: draft.get("summary") or summary_stage(topic),
+              deps=("draft", "topic"), timeout=STAGE_TIMEOUT_LLM,
+              fallback=lambda draft, topic: html.escape(DEFAULT_SUMMARY)),
+    ]
 
-<p>Stay tuned for further developments and insights in the world of AI!</p>
-""".strip()
+def write_run_report() -> None:
+    RECORDER.extra["caches"] = {"urls": dict(URL_CACHE.stats), "llm": dict(LLM_CACHE.stats)}
+    if isinstance(llm, LLMPool):  # only when an LLM was actually used
+        RECORDER.extra["llm_pool"] = dict(llm.stats)
+    client = ollama_client()
+    if client is not None and client.calls:
+        RECORDER.extra["ollama"] = client.summary()
+    if _archive is not None:
+        RECORDER.extra["archive"] = {**_archive.stats, "entries": _archive.counts()}
+    if _drainer is not None:
+        RECORDER.extra["outbox"] = {**_drainer.stats, "entries": _drainer.outbox.counts()}
+    RECORDER.write_report()
 
 # -----------------------------------------------------------------------------
-# Main
+# Build steps over the issue artifact (fetch -> generate -> assemble -> publish)
 # -----------------------------------------------------------------------------
-if __name__ == "__main__":
-    print("=== AI/ML Weekly — Deterministic Builder ===")
-    print(f"MODE: {AGENT_MODE} | PUBLISH: {PUBLISH}")
-
-    # 1) Fetch sources
-    news_list_html, news_sources = fetch_news("artificial intelligence machine learning", 6)
-    papers_list_html, paper_sources = fetch_arxiv(6)
-
-    # 2) Topic (robust: if LLM fails, fallback)
-    bullets = []
-    for (t,u,s) in (news_sources + paper_sources)[:6]:
-        bullets.append(f"- {t} ({s})")
-    bullets_text = "\n".join(bullets) if bullets else "- Weekly highlights and notable updates"
-    raw_topic = llm_text(topic_prompt, bullets=bullets_text) or "Key AI/ML Highlights"
-    # Clean up topic: remove prompt artifacts and quotes
-    def clean_topic(t: str) -> str:
-        t = t.strip()
-        # Remove common prompt artifacts
-        t = re.sub(r"^(Here is a proposed topic title:|Title:|This title.*:)", "", t, flags=re.IGNORECASE)
-        t = t.replace('"', '').replace("'", "")
-        t = re.sub(r"^[:\s]+", "", t)
-        # Remove trailing explanations if present
-        t = t.split("\n")[0]
-        return t.strip()
-    topic = clean_topic(raw_topic) or "Key AI/ML Highlights"
-
-    # 3) Intro & Summary (short text only)
-    why_fragments = ", ".join([t for (t,_,_) in (news_sources + paper_sources)[:3]]) or "notable updates across AI applications and research"
-    intro_txt = llm_text(intro_prompt, topic=topic, why=why_fragments) or html.escape("A quick tour of the most useful AI/ML developments this week.")
-    summary_txt = llm_text(summary_prompt, topic=topic) or html.escape("Expect continued iteration across models, tooling, and applied ML in production.")
-
-    # 4) References
-    refs_html = build_references_html(news_sources + paper_sources)
-
-    # 5) Assemble
-    article_html = assemble_article(topic, intro_txt, news_list_html, papers_list_html, summary_txt, refs_html)
-
+def fetch_issue(query: str = "artificial intelligence machine learning", num: int = 6) -> Issue:
+    out = run_stages(source_stages(query, num), timings=RECORDER.extra.setdefault("stages", {}))
+    issue = Issue(query, num, news=out["news"], papers=out["papers"], themes=out["themes"])
+    issue.mark("fetch")
+    log.info(URL_CACHE.summary())
+    return issue
+
+def generate_issue(issue: Issue, timings: Optional[Dict[str, Dict]] = None) -> Issue:
+    """Topic, intro and summary for the artifact's items; no source is fetched again."""
+    stages = [
+        Stage("news", lambda: issue.news),
+        Stage("papers", lambda: issue.papers),
+        Stage("themes", lambda: issue.themes),
+        *(llm_stages_batched() if LLM_BATCH else llm_stages()),
+    ]
+    out = run_stages(stages, timings=RECORDER.extra.setdefault("stages", {}) if timings is None else timings)
+    issue.text = {field: out[field] for field in ("topic", "intro", "summary")}
+    issue.mark("generate")
+    log.info(LLM_CACHE.summary())
+    if isinstance(llm, LLMPool):
+        log.info(llm.summary())
+    return issue
+
+def assemble_issue(issue: Issue, layout: str = ARTICLE_LAYOUT) -> Issue:
+    t = issue.text
+    article_html = assemble_article(t["topic"], t["intro"], issue.news, issue.papers, t["summary"], layout=layout)
     # Absolute safety: don’t publish if suspiciously short
-    if len(article_html) < 300 or "<ul>" not in article_html:
+    if len(article_html) < 300 or (layout != "text" and "<ul" not in article_html):
         print("ERROR: Article too short or malformed; aborting publish.")
         print(article_html)
         raise SystemExit(1)
-
-    # 6) Publish
     # Make the WordPress post title captivating and relevant to the week's topic
-    title = f"AI/ML Weekly: {topic}"
-    result = publish_to_wordpress(title, article_html)
+    issue.title = f"AI/ML Weekly: {t['topic']}"
+    issue.article_html = article_html
+    issue.layout = layout
+    issue.mark("assemble")
+    return issue
+
+def publish_issue(issue: Issue, force: bool = False, **site) -> Issue:
+    """
+    Publish the assembled article; an artifact that was already published is not posted again.
+    site: site_id / token / token_env for publish_to_wordpress (editions publish to their own site).
+    """
+    if issue.published and not force:
+        print(f"Already published ({issue.published}); use --force to post again")
+        return issue
+    if issue.layout == "text":
+        raise RuntimeError("Artifact was assembled with the text layout; run `assemble --layout wordpress` to publish")
+    result = publish_to_wordpress(issue.title, issue.article_html, slot=issue.slot, force=force, **site)
     print(result)
+    if PUBLISH:  # a dry run leaves the artifact publishable
+        issue.published = result
+        issue.mark("publish")
+        # Later issues for the same site skip or down-rank what this one covered
+        get_archive().add_issue(issue, site.get("site_id") or WORDPRESS_SITE_ID, result)
+    return issue
+
+def run_collect(query: str = "artificial intelligence machine learning") -> None:
+    added = collect_incremental(query)
+    store = get_state_store()
+    for source, count in added.items():
+        print(f"{source}: +{count} new (high-water mark: {store.high_water(source)})")
+    log.info(URL_CACHE.summary())
+
+# -----------------------------------------------------------------------------
+# Import-time budget (LangChain, feedparser and the LLM clients are deferred to first use)
+# -----------------------------------------------------------------------------
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+RECORDER.extra["import_seconds"] = round(IMPORT_SECONDS, 3)
+if IMPORT_SECONDS > IMPORT_TIME_BUDGET:
+    log.warning(f"Module import took {IMPORT_SECONDS:.2f}s (budget {IMPORT_TIME_BUDGET:g}s); "
+                "run benchmarks/bench_import.py to see which imports dominate")
+
+# -----------------------------------------------------------------------------
+# CLI: each step reads and rewrites the artifact, so a failed step can be rerun on its own
+# (e.g. retrying `publish` touches neither the sources nor the LLM); `all` runs every step
+# -----------------------------------------------------------------------------
+def run_step(step: str, issue: Optional[Issue], args: argparse.Namespace) -> Issue:
+    if step == "fetch":
+        return fetch_issue(args.query, args.num)
+    if issue is None:  # step run on its own: start from the previous step's artifact
+        issue = read_issue(args.artifact, require=STAGES[STAGES.index(step) - 1])
+    if step == "generate":
+        return generate_issue(issue)
+    if step == "assemble":
+        return assemble_issue(issue, args.layout)
+    return publish_issue(issue, force=args.force)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="AI/ML Weekly newsletter builder")
+    ap.add_argument("command", nargs="?", default="all", choices=["all", "collect", *STAGES],
+                    help="step to run (default: all)")
+    ap.add_argument("--artifact", default=ARTIFACT_PATH, help=f"issue artifact (default: {ARTIFACT_PATH})")
+    ap.add_argument("--query", default="artificial intelligence machine learning")
+    ap.add_argument("--num", type=int, default=6, help="items per section (fetch)")
+    ap.add_argument("--layout", default=ARTICLE_LAYOUT, choices=LAYOUTS, help="article layout (assemble)")
+    ap.add_argument("--force", action="store_true", help="publish even if the artifact was already published")
+    return ap.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    print("=== AI/ML Weekly — Deterministic Builder ===")
+    print(f"MODE: {AGENT_MODE} | PUBLISH: {PUBLISH} | STEP: {args.command}")
+    RECORDER.start_profiling()
+    atexit.register(write_run_report)  # also runs on aborts and publish failures
+    if args.command == "collect":
+        run_collect(args.query)
+        return
+
+    if args.command in ("all", "generate"):
+        prewarm_llm()  # overlaps model load + prefix eval with fetching / reading the artifact
+    issue: Optional[Issue] = None
+    for step in (STAGES if args.command == "all" else [args.command]):
+        with RECORDER.span(f"step_{step}"):
+            issue = run_step(step, issue, args)
+        write_issue(issue, args.artifact)
+    log.info(f"Artifact {args.artifact}: {', '.join(issue.stages)} done")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# Multi-source aggregation engine
+# - Sources (search queries, Google News topics/searches, publisher RSS, arXiv categories) come from a
+#   JSON list (NEWS_SOURCES_PATH) or default to Serpstack + Google News search + arXiv cs.AI/cs.LG
+# - fan_out fetches every source concurrently into Item lists; one failing source never sinks the rest
+# - select merges them in one pass: per-source ranking, round-robin interleave (no source starves),
+#   near-duplicate clustering (dedupe.py), optional relevance ranking (ranking.py), per-source quotas,
+#   redirect resolution in ordered waves and a final exact (title, url) dedupe
+#
+# Example sources.json:
+# [
+#   {"name": "serpstack", "kind": "serpstack", "query": "artificial intelligence machine learning"},
+#   {"name": "gn-ai", "kind": "google_news", "query": "generative AI enterprise", "quota": 3},
+#   {"name": "gn-tech", "kind": "google_news", "url": "https://news.google.com/rss/headlines/section/topic/TECHNOLOGY"},
+#   {"name": "mit-tr", "kind": "rss", "url": "https://www.technologyreview.com/feed/", "resolve": false, "quota": 2},
+#   {"name": "arxiv", "kind": "arxiv", "categories": ["cs.AI", "cs.LG", "cs.CL"]}
+# ]
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from dedupe import collapse_near_duplicates
+from items import Item
+
+log = logging.getLogger("aiml-newsletter")
+
+NEWS_SOURCES_PATH = os.getenv("NEWS_SOURCES_PATH", "")
+SOURCE_MAX_WORKERS = int(os.getenv("SOURCE_MAX_WORKERS", "6"))
+
+SOURCE_KINDS = ("serpstack", "google_news", "rss", "arxiv")
+PAPER_KINDS = ("arxiv",)
+
+
+@dataclass
+class SourceSpec:
+    name: str
+    kind: str  # one of SOURCE_KINDS
+    query: str = ""  # serpstack / google_news search
+    url: str = ""  # google_news topic feed or publisher RSS
+    categories: List[str] = field(default_factory=list)  # arxiv
+    quota: Optional[int] = None  # max items this source may contribute to a section
+    limit: Optional[int] = None  # max candidates to fetch; None = section size based
+    resolve: bool = True  # follow redirects for item links
+
+    @property
+    def item_kind(self) -> str:
+        return "paper" if self.kind in PAPER_KINDS else "news"
+
+
+def default_source_specs(query: str) -> List[SourceSpec]:
+    return [
+        SourceSpec("serpstack", "serpstack", query=query),
+        SourceSpec("google_news", "google_news", query=query),
+        SourceSpec("arxiv", "arxiv", categories=["cs.AI", "cs.LG"], resolve=False),
+    ]
+
+
+def load_source_specs(query: str, path: str = NEWS_SOURCES_PATH) -> List[SourceSpec]:
+    """Sources from the JSON config at `path`, else the defaults for `query`."""
+    if not path:
+        return default_source_specs(query)
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_source_specs(json.load(f), path)
+
+
+def parse_source_specs(raw: List[dict], origin: str = "sources") -> List[SourceSpec]:
+    """SourceSpecs from decoded JSON entries (a sources file or an edition's inline list)."""
+    specs = [SourceSpec(**entry) for entry in raw]
+    for spec in specs:
+        if spec.kind not in SOURCE_KINDS:
+            raise ValueError(f"Unknown source kind {spec.kind!r} for {spec.name!r}; expected one of {SOURCE_KINDS}")
+    names = [s.name for s in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate source names in {origin}: {names}")
+    return specs
+
+
+Fetcher = Callable[..., List[Item]]  # fetcher(spec, cutoff, limit, skip_unchanged=False)
+
+
+def fan_out(specs: List[SourceSpec], fetchers: Dict[str, Fetcher], cutoff, limit: int,
+            skip_unchanged: bool = False) -> Dict[str, List[Item]]:
+    """Fetch all sources concurrently; returns {spec name: items} in spec order."""
+    def run(spec: SourceSpec) -> List[Item]:
+        start = time.perf_counter()
+        try:
+            items = fetchers[spec.kind](spec, cutoff, spec.limit or limit, skip_unchanged=skip_unchanged)
+        except Exception as e:
+            log.warning(f"Source {spec.name} ({spec.kind}) failed: {e}")
+            return []
+        for it in items:
+            it.source = spec.name
+            it.resolved = it.resolved or not spec.resolve
+        log.info(f"Source {spec.name}: {len(items)} items in {time.perf_counter() - start:.2f}s")
+        return items
+
+    if not specs:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(SOURCE_MAX_WORKERS, len(specs)))) as pool:
+        results = list(pool.map(run, specs))
+    return {spec.name: items for spec, items in zip(specs, results)}
+
+
+def interleave(groups: Dict[str, List[Item]]) -> List[Item]:
+    """Round-robin over sources (in config order), each source newest first."""
+    ranked = [sorted(items, key=lambda it: it.published, reverse=True) for items in groups.values()]
+    out: List[Item] = []
+    depth = max((len(r) for r in ranked), default=0)
+    for i in range(depth):
+        out.extend(r[i] for r in ranked if i < len(r))
+    return out
+
+
+def select(groups: Dict[str, List[Item]], num: int, quotas: Dict[str, Optional[int]],
+           resolve: Optional[Callable[[List[str], float], List[str]]] = None,
+           deadline_at: Optional[float] = None, wave: int = 8,
+           rank: Optional[Callable[[List[Item]], List[Item]]] = None) -> List[Item]:
+    """
+    Pick up to `num` items: interleave sources, collapse near-duplicate stories into one canonical
+    item (alternates attached), reorder with rank(candidates) -> best first if given, enforce quotas,
+    resolve unresolved links in ordered waves (resolve(links, seconds_left) -> final URLs) and dedupe
+    on (title, final url). Alternates of picked items are resolved in one last batch.
+    Returned best first when ranked, else newest first.
+    """
+    candidates = collapse_near_duplicates(interleave(groups))
+    if rank is not None:
+        candidates = rank(candidates)
+    picked: List[Item] = []
+    per_source: Dict[str, int] = {}
+    seen = set()
+    pos = 0
+    while pos < len(candidates) and len(picked) < num:
+        batch = candidates[pos: pos + max(num - len(picked), wave)]
+        pos += len(batch)
+        pending = [it for it in batch if not it.resolved
+                   and (quotas.get(it.source) is None or per_source.get(it.source, 0) < quotas[it.source])]
+        if pending and resolve is not None:
+            left = (deadline_at - time.monotonic()) if deadline_at is not None else 45.0
+            for it, url in zip(pending, resolve([it.url for it in pending], left)):
+                it.url, it.resolved = url, True
+        for it in batch:
+            quota = quotas.get(it.source)
+            if quota is not None and per_source.get(it.source, 0) >= quota:
+                continue
+            key = (it.title, it.url)
+            if key in seen:
+                continue
+            seen.add(key)
+            picked.append(it)
+            per_source[it.source] = per_source.get(it.source, 0) + 1
+            if len(picked) >= num:
+                break
+    alternates = [alt for it in picked for alt in it.alternates if not alt.resolved]
+    if alternates and resolve is not None:
+        left = (deadline_at - time.monotonic()) if deadline_at is not None else 45.0
+        for alt, url in zip(alternates, resolve([alt.url for alt in alternates], left)):
+            alt.url, alt.resolved = url, True
+    if rank is None:
+        picked.sort(key=lambda it: it.published, reverse=True)
+    return picked
@@ -0,0 +1,348 @@
+# Archive of published issues and cross-week story suppression
+# - Every published issue and its items are stored in ARCHIVE_PATH (SQLite), with an FTS5 index
+#   over item titles/summaries for `python archive.py search`
+# - Each archived item (alternates included) leaves integer lookup keys in one indexed table:
+#   exact keys (canonical URL, arXiv id without version, normalized headline) and the 16 MinHash
+#   LSH band keys of its headline (dedupe.py). Checking a batch of candidates is one index probe
+#   per key, restricted to issues of the same site from the last ARCHIVE_WEEKS weeks, so the cost
+#   per item stays flat as the archive grows to years of issues (~80 us, mostly computing the keys;
+#   python -m benchmarks.bench_archive)
+# - screen(): an exact repeat (same link, same paper, revised or not, same headline) is dropped;
+#   a headline that is only similar (band hit confirmed by shingle Jaccard >= ARCHIVE_SIMILARITY,
+#   e.g. a follow-up on a long-running story) is down-ranked by ARCHIVE_PENALTY.
+#   ARCHIVE_MODE=demote down-ranks repeats too; off disables the lookup
+#
+#   python archive.py [issues | search <query> | add <artifact> | check <artifact> | stats]
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from artifact import Issue, read_issue
+from cache_store import CACHE_DIR
+from dedupe import LSH_BANDS, MINHASH_PERMUTATIONS, minhash_signatures, normalize_title, shingle_hashes
+from items import Item
+
+log = logging.getLogger("aiml-newsletter")
+
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", os.path.join(CACHE_DIR, "archive.sqlite"))
+ARCHIVE_MODE = os.getenv("ARCHIVE_MODE", "drop").lower()  # drop | demote | off
+ARCHIVE_WEEKS = float(os.getenv("ARCHIVE_WEEKS", "4"))  # look-back window
+ARCHIVE_PENALTY = float(os.getenv("ARCHIVE_PENALTY", "0.3"))  # score factor for down-ranked items
+ARCHIVE_SIMILARITY = float(os.getenv("ARCHIVE_SIMILARITY", "0.6"))  # headline shingle Jaccard
+ARCHIVE_MIN_TITLE_WORDS = 4  # shorter headlines ("AI news roundup") are too generic for title keys
+
+_WEEK = 7 * 86400.0
+_ARXIV = re.compile(r"arxiv\.org/(?:abs|pdf)/([^?#]+?)(?:v\d+)?(?:\.pdf)?/?$")
+_ROW_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93],
+                    dtype=np.uint64)[:MINHASH_PERMUTATIONS // LSH_BANDS]
+
+
+def _key(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def canonical_link(link: str) -> str:
+    """arXiv papers by id without version, other links by host + path (no query, no www.)."""
+    link = link.strip()
+    m = _ARXIV.search(link)
+    if m:
+        return f"arxiv:{m.group(1)}"
+    p = urlparse(link)
+    if not p.netloc:
+        return f"id:{link}"
+    host = p.netloc.lower()
+    return f"url:{host[4:] if host.startswith('www.') else host}{p.path.rstrip('/')}"
+
+
+def exact_keys(it: Item) -> List[int]:
+    """Lookup keys that mean "the same story/paper" for the item and its alternates."""
+    keys = set()
+    for copy in it.with_alternates():
+        for link in (copy.url, copy.id):
+            if link:
+                keys.add(canonical_link(link))
+        title = normalize_title(copy.title)
+        if len(title.split()) >= ARCHIVE_MIN_TITLE_WORDS:
+            keys.add(f"title:{title}")
+    return [_key(k) for k in sorted(keys)]
+
+
+def band_keys(titles: Sequence[str]) -> np.ndarray:
+    """(n, LSH_BANDS) int64 keys, one per MinHash band of each headline."""
+    sig = minhash_signatures([shingle_hashes(t) for t in titles])
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    blocks = sig.reshape(len(titles), LSH_BANDS, rows)
+    mixed = np.bitwise_xor.reduce(blocks * _ROW_MIX, axis=2)
+    bands = np.arange(LSH_BANDS, dtype=np.uint64) * np.uint64(0x100000001B3)
+    return (mixed ^ bands[None, :]).view(np.int64)
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = set(shingle_hashes(a)), set(shingle_hashes(b))
+    return len(sa & sb) / max(1, len(sa | sb))
+
+
+@dataclass
+class Coverage:
+    repeat: bool  # exact repeat (same link/paper/headline) vs. similar headline
+    title: str  # archived item
+    url: str
+    issue: str  # title of the issue it appeared in
+    published_at: float
+    similarity: float = 1.0
+
+
+class Archive:
+    def __init__(self, path: str = ARCHIVE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS issues (
+                id INTEGER PRIMARY KEY, scope TEXT NOT NULL, slot TEXT NOT NULL, query TEXT NOT NULL,
+                title TEXT NOT NULL, post TEXT NOT NULL, published_at REAL NOT NULL,
+                UNIQUE (scope, slot));
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY, issue_id INTEGER NOT NULL, kind TEXT NOT NULL, title TEXT NOT NULL,
+                url TEXT NOT NULL, src TEXT NOT NULL, summary TEXT NOT NULL, published TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS items_issue ON items(issue_id);
+            CREATE TABLE IF NOT EXISTS item_keys (
+                scope TEXT NOT NULL, key INTEGER NOT NULL, published_at REAL NOT NULL, item_id INTEGER NOT NULL,
+                exact INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS item_keys_lookup ON item_keys(scope, key, published_at);
+            CREATE INDEX IF NOT EXISTS item_keys_item ON item_keys(item_id);
+        """)
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(title, summary, src)")
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5: search falls back to LIKE
+            self.fts = False
+        self.stats: Dict[str, float] = {"checked": 0, "dropped": 0, "demoted": 0, "lookup_ms": 0.0}
+
+    # --- writing ---------------------------------------------------------------
+    def add_issue(self, issue: Issue, scope: str = "", post: str = "", published_at: Optional[float] = None) -> int:
+        """Store a published issue and its items; archiving the same issue again replaces it."""
+        items = issue.news + issue.papers
+        published_at = time.time() if published_at is None else published_at
+        bands = band_keys([copy.title for it in items for copy in it.with_alternates()])
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                row = self._db.execute("SELECT id FROM issues WHERE scope = ? AND slot = ?", (scope, issue.slot)).fetchone()
+                if row:
+                    self._delete_issue(row[0])
+                issue_id = self._db.execute(
+                    "INSERT INTO issues (scope, slot, query, title, post, published_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (scope, issue.slot, issue.query, issue.title, post, published_at),
+                ).lastrowid
+                b = 0
+                for it in items:
+                    item_id = self._db.execute(
+                        "INSERT INTO items (issue_id, kind, title, url, src, summary, published) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (issue_id, it.kind, it.title, it.url, it.label, it.summary, it.published.isoformat()),
+                    ).lastrowid
+                    if self.fts:
+                        self._db.execute("INSERT INTO items_fts (rowid, title, summary, src) VALUES (?, ?, ?, ?)",
+                                         (item_id, it.title, it.summary, it.label))
+                    copies = len(it.with_alternates())
+                    keys = [(k, 1) for k in exact_keys(it)]
+                    keys += [(int(k), 0) for k in set(bands[b:b + copies].ravel().tolist())]
+                    b += copies
+                    self._db.executemany(
+                        "INSERT INTO item_keys (scope, key, published_at, item_id, exact) VALUES (?, ?, ?, ?, ?)",
+                        [(scope, k, published_at, item_id, exact) for k, exact in keys],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return issue_id
+
+    def _delete_issue(self, issue_id: int) -> None:
+        ids = [r[0] for r in self._db.execute("SELECT id FROM items WHERE issue_id = ?", (issue_id,))]
+        self._db.executemany("DELETE FROM item_keys WHERE item_id = ?", [(i,) for i in ids])
+        if self.fts:
+            self._db.executemany("DELETE FROM items_fts WHERE rowid = ?", [(i,) for i in ids])
+        self._db.execute("DELETE FROM items WHERE issue_id = ?", (issue_id,))
+        self._db.execute("DELETE FROM issues WHERE id = ?", (issue_id,))
+
+    # --- lookups ---------------------------------------------------------------
+    def covered(self, items: Sequence[Item], scope: str = "", weeks: float = ARCHIVE_WEEKS,
+                now: Optional[float] = None) -> List[Optional[Coverage]]:
+        """For each item, what covered it in the last `weeks` weeks (None if nothing did)."""
+        if not items:
+            return []
+        since = (time.time() if now is None else now) - weeks * _WEEK
+        probes: Dict[int, List[Tuple[int, bool]]] = {}  # key -> [(item index, exact)]
+        for i, it in enumerate(items):
+            for k in exact_keys(it):
+                probes.setdefault(k, []).append((i, True))
+        for i, row in enumerate(band_keys([it.title for it in items]).tolist()):
+            for k in row:
+                probes.setdefault(k, []).append((i, False))
+        with self._lock:
+            hits = self._db.execute(
+                "SELECT key, item_id, exact FROM item_keys WHERE scope = ? AND published_at >= ?"
+                " AND key IN (SELECT value FROM json_each(?))",
+                (scope, since, json.dumps(list(probes))),
+            ).fetchall()
+            archived = {}
+            if hits:
+                archived = {r[0]: r[1:] for r in self._db.execute(
+                    "SELECT items.id, items.title, items.url, issues.title, issues.published_at FROM items"
+                    " JOIN issues ON issues.id = items.issue_id WHERE items.id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(sorted({h[1] for h in hits})),),
+                )}
+        out: List[Optional[Coverage]] = [None] * len(items)
+        checked = set()  # (item, archived item) pairs already compared; they can share several bands
+        for key, item_id, exact in hits:
+            title, url, issue, published_at = archived[item_id]
+            for i, probe_exact in probes.get(key, ()):
+                if exact and probe_exact:
+                    out[i] = Coverage(True, title, url, issue, published_at)
+                elif not exact and not probe_exact and (i, item_id) not in checked and not (out[i] and out[i].repeat):
+                    checked.add((i, item_id))
+                    sim = jaccard(items[i].title, title)
+                    if sim >= ARCHIVE_SIMILARITY and sim > (out[i].similarity if out[i] else 0.0):
+                        out[i] = Coverage(False, title, url, issue, published_at, sim)
+        return out
+
+    def screen(self, items: Sequence[Item], scope: str = "", mode: str = ARCHIVE_MODE,
+               weeks: float = ARCHIVE_WEEKS) -> Tuple[List[Item], List[float]]:
+        """(items kept, score factor per kept item): repeats dropped (or demoted), similar ones demoted."""
+        start = time.perf_counter()
+        coverage = self.covered(items, scope, weeks)
+        kept: List[Item] = []
+        weights: List[float] = []
+        dropped = demoted = 0
+        for it, cov in zip(items, coverage):
+            if cov is None:
+                kept.append(it)
+                weights.append(1.0)
+            elif cov.repeat and mode == "drop":
+                dropped += 1
+                log.info(f"Archive: dropping {it.title[:80]!r} (in {cov.issue[:60]!r})")
+            else:
+                kept.append(it)
+                weights.append(ARCHIVE_PENALTY)
+                demoted += 1
+        with self._lock:
+            self.stats["checked"] += len(items)
+            self.stats["dropped"] += dropped
+            self.stats["demoted"] += demoted
+            self.stats["lookup_ms"] = round(self.stats["lookup_ms"] + (time.perf_counter() - start) * 1000, 3)
+        return kept, weights
+
+    def search(self, query: str, limit: int = 20, weeks: Optional[float] = None, scope: Optional[str] = None,
+               raw: bool = False) -> List[Dict]:
+        """Archived items matching query, best first (FTS5 bm25; words are ANDed unless raw FTS syntax)."""
+        where, args = [], []
+        if weeks is not None:
+            where.append("issues.published_at >= ?")
+            args.append(time.time() - weeks * _WEEK)
+        if scope is not None:
+            where.append("issues.scope = ?")
+            args.append(scope)
+        if self.fts:
+            match = query if raw else " ".join('"' + w.replace('"', '""') + '"' for w in query.split())
+            sql = ("SELECT items.title, items.url, items.src, items.kind, issues.title, issues.published_at"
+                   " FROM items_fts JOIN items ON items.id = items_fts.rowid JOIN issues ON issues.id = items.issue_id"
+                   f" WHERE items_fts MATCH ? {''.join(' AND ' + w for w in where)} ORDER BY bm25(items_fts) LIMIT ?")
+            args = [match, *args, limit]
+        else:
+            words = query.split()
+            where += ["(items.title || ' ' || items.summary) LIKE ?"] * len(words)
+            sql = ("SELECT items.title, items.url, items.src, items.kind, issues.title, issues.published_at"
+                   " FROM items JOIN issues ON issues.id = items.issue_id"
+                   f" WHERE {' AND '.join(where) or '1'} ORDER BY issues.published_at DESC LIMIT ?")
+            args = [*args, *(f"%{w}%" for w in words), limit]
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [{"title": r[0], "url": r[1], "src": r[2], "kind": r[3], "issue": r[4], "published_at": r[5]}
+                for r in rows]
+
+    def issues(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT issues.id, scope, title, published_at, post, (SELECT count(*) FROM items WHERE issue_id = issues.id)"
+                " FROM issues ORDER BY published_at DESC LIMIT ?", (limit,)).fetchall()
+        return [{"id": r[0], "scope": r[1], "title": r[2], "published_at": r[3], "post": r[4], "items": r[5]}
+                for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {table: self._db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                    for table in ("issues", "items", "item_keys")}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _date(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    ap = argparse.ArgumentParser(description="Query the archive of published issues")
+    ap.add_argument("command", nargs="?", default="issues", choices=["issues", "search", "add", "check", "stats"])
+    ap.add_argument("arg", nargs="*", help="search words (FTS5 syntax with --raw), or an artifact path")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--weeks", type=float, default=None, help="only issues from the last N weeks "
+                                                               f"(check: default ARCHIVE_WEEKS={ARCHIVE_WEEKS:g})")
+    ap.add_argument("--scope", default=None, help="WordPress site ID the issues were published to "
+                                                  "(add/check: default WORDPRESS_SITE_ID)")
+    ap.add_argument("--raw", action="store_true", help="pass the query to FTS5 as is (OR, NEAR, prefix*)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    archive = Archive()
+    if args.command == "issues":
+        rows = archive.issues(args.limit)
+        if not args.json:
+            for r in rows:
+                print(f"{_date(r['published_at'])}  {r['items']:>3} items  {r['scope'] or '-':<12} {r['title'][:70]}")
+    elif args.command == "search":
+        rows = archive.search(" ".join(args.arg), args.limit, args.weeks, args.scope, args.raw)
+        if not args.json:
+            for r in rows:
+                print(f"{_date(r['published_at'])}  {r['kind']:<5} {r['title'][:70]}  ({r['src']})\n"
+                      f"{'':12}{r['url']}  [{r['issue'][:50]}]")
+    elif args.command in ("add", "check"):
+        if len(args.arg) != 1:
+            raise SystemExit(f"{args.command} takes one artifact path")
+        issue = read_issue(args.arg[0], require="fetch")
+        scope = os.getenv("WORDPRESS_SITE_ID", "") if args.scope is None else args.scope
+        if args.command == "add":
+            rows = [{"issue_id": archive.add_issue(issue, scope, issue.published)}]
+        else:
+            items = issue.news + issue.papers
+            cov = archive.covered(items, scope, ARCHIVE_WEEKS if args.weeks is None else args.weeks)
+            rows = [{"title": it.title, "repeat": c.repeat, "similarity": round(c.similarity, 2),
+                     "archived": c.title, "issue": c.issue, "published_at": c.published_at}
+                    for it, c in zip(items, cov) if c is not None]
+            if not args.json:
+                for r in rows:
+                    print(f"{'repeat ' if r['repeat'] else 'similar'} {r['similarity']:.2f}  {r['title'][:60]}\n"
+                          f"{'':13}~ {r['archived'][:60]}  [{_date(r['published_at'])} {r['issue'][:40]}]")
+                print(f"{len(rows)} of {len(items)} items covered")
+    else:
+        rows = archive.counts()
+    if args.json or args.command in ("add", "stats"):
+        print(json.dumps(rows, indent=2))
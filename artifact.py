@@ -0,0 +1,139 @@
+# Intermediate issue artifact exchanged by the CLI subcommands (fetch -> generate -> assemble -> publish)
+# - JSON Lines: one header record, then one record per picked item (alternates nested), the themes of
+#   the candidate pool (top members nested), generated text fields, the assembled article and the
+#   publish result, each added by the stage that made it
+# - Versioned: a reader refuses artifacts from a newer/older format instead of guessing
+# - Written to a temp file and renamed, so a failed stage never leaves a half-written artifact
+# Each stage can be rerun on its own (or on another machine / from a CI cache); publishing from an
+# artifact touches neither the sources nor the LLM.
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from items import Item
+from themes import Theme
+
+ARTIFACT_VERSION = 1
+ARTIFACT_PATH = os.getenv("ARTIFACT_PATH", os.path.join("build", "issue.jsonl"))
+STAGES = ("fetch", "generate", "assemble", "publish")
+
+
+class ArtifactError(ValueError):
+    """Missing, malformed or incompatible artifact, or one that lacks the stage a command needs."""
+
+
+@dataclass
+class Issue:
+    query: str
+    num: int
+    news: List[Item] = field(default_factory=list)
+    papers: List[Item] = field(default_factory=list)
+    themes: List[Theme] = field(default_factory=list)  # ranked, from all fetched candidates
+    text: Dict[str, str] = field(default_factory=dict)  # topic, intro, summary (already HTML-escaped)
+    title: str = ""
+    article_html: str = ""
+    layout: str = "wordpress"  # render.py layout the article was assembled with
+    published: str = ""  # publish result message
+    stages: List[str] = field(default_factory=list)  # completed stages, in order
+    created: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    edition: str = ""  # editions.py edition name; empty for a single-issue run
+
+    @property
+    def slot(self) -> str:
+        """Key of this issue in the publish outbox and the archive: editions of one run get their own."""
+        return f"{self.query}@{self.created}" + (f"#{self.edition}" if self.edition else "")
+
+    def require(self, stage: str) -> None:
+        if stage not in self.stages:
+            done = ", ".join(self.stages) or "nothing"
+            raise ArtifactError(f"Artifact has no '{stage}' output yet (done: {done}); run `{stage}` first")
+
+    def mark(self, stage: str) -> None:
+        # Rerunning a stage invalidates everything after it
+        keep = STAGES[:STAGES.index(stage)]
+        self.stages = [s for s in self.stages if s in keep] + [stage]
+
+
+def item_record(it: Item) -> Dict[str, Any]:
+    return {
+        "title": it.title, "url": it.url, "src": it.src, "published": it.published.isoformat(),
+        "kind": it.kind, "source": it.source, "summary": it.summary, "id": it.id, "resolved": it.resolved,
+        "alternates": [item_record(a) for a in it.alternates],
+    }
+
+
+def item_from_record(rec: Dict[str, Any]) -> Item:
+    return Item(rec["title"], rec["url"], rec["src"], datetime.fromisoformat(rec["published"]),
+                kind=rec.get("kind", "news"), source=rec.get("source", ""), summary=rec.get("summary", ""),
+                id=rec.get("id", ""), resolved=rec.get("resolved", True),
+                alternates=[item_from_record(a) for a in rec.get("alternates", [])])
+
+
+def _records(issue: Issue) -> Iterator[Dict[str, Any]]:
+    yield {"type": "issue", "version": ARTIFACT_VERSION, "query": issue.query, "num": issue.num,
+           "created": issue.created, "edition": issue.edition, "stages": issue.stages}
+    for section in ("news", "papers"):
+        for it in getattr(issue, section):
+            yield {"type": "item", "section": section, **item_record(it)}
+    for t in issue.themes:
+        yield {"type": "theme", "label": t.label, "terms": t.terms, "size": t.size, "score": round(t.score, 4),
+               "members": [item_record(it) for it in t.members]}
+    for name, value in issue.text.items():
+        yield {"type": "text", "field": name, "value": value}
+    if issue.article_html:
+        yield {"type": "article", "title": issue.title, "html": issue.article_html, "layout": issue.layout}
+    if issue.published:
+        yield {"type": "publish", "result": issue.published}
+
+
+def write_issue(issue: Issue, path: str = ARTIFACT_PATH) -> str:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".issue-", suffix=".jsonl")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for rec in _records(issue):
+                f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def read_issue(path: str = ARTIFACT_PATH, require: Optional[str] = None) -> Issue:
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        raise ArtifactError(f"No artifact at {path}; run `fetch` first") from None
+    except ValueError as e:
+        raise ArtifactError(f"Malformed artifact {path}: {e}") from None
+    if not lines or lines[0].get("type") != "issue":
+        raise ArtifactError(f"{path} does not start with an issue header")
+    header = lines[0]
+    if header.get("version") != ARTIFACT_VERSION:
+        raise ArtifactError(f"{path} is artifact version {header.get('version')}, expected {ARTIFACT_VERSION}")
+    issue = Issue(header["query"], header["num"], stages=list(header.get("stages", [])), created=header["created"],
+                  edition=header.get("edition", ""))
+    for rec in lines[1:]:
+        kind = rec.get("type")
+        if kind == "item":
+            getattr(issue, rec["section"]).append(item_from_record(rec))
+        elif kind == "theme":
+            issue.themes.append(Theme(rec["label"], rec["terms"], rec["size"], rec["score"],
+                                      [item_from_record(m) for m in rec.get("members", [])]))
+        elif kind == "text":
+            issue.text[rec["field"]] = rec["value"]
+        elif kind == "article":
+            issue.title, issue.article_html = rec["title"], rec["html"]
+            issue.layout = rec.get("layout", "wordpress")
+        elif kind == "publish":
+            issue.published = rec["result"]
+    if require:
+        issue.require(require)
+    return issue
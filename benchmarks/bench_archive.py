@@ -0,0 +1,101 @@
+# Archive benchmark (archive.py): cross-week lookups and search as the archive grows
+# Fills an archive with weekly issues (news + papers from the fixtures, syndicated copies as
+# alternates), then screens a candidate pool in which every 10th item repeats a story from the last
+# few weeks. Prints the lookup cost per candidate, what was dropped/down-ranked and an FTS5 query time.
+#
+#   python -m benchmarks.bench_archive --years 1,5,20 --pool 2000 --repeat 5
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive import Archive  # noqa: E402
+from artifact import Issue  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+from dedupe import collapse_near_duplicates  # noqa: E402
+from items import Item  # noqa: E402
+
+PER_ISSUE = 6  # news items and papers each
+WEEK = 7 * 86400.0
+
+
+def codename(rnd: random.Random) -> str:
+    # The fixtures' codenames repeat every few thousand stories; years of issues need more
+    return " ".join("".join(rnd.choice(fixtures._SYLLABLES) for _ in range(3)).capitalize() for _ in range(4))
+
+
+def items(n: int, offset: int = 0):
+    rnd = random.Random(offset)
+    news = [Item(f"{it['title'].split(':')[0]}: {codename(rnd)}", f"https://{it['publisher']}/{offset + i}",
+                 it["publisher"], it["published"], id=f"https://news.google.example/articles/{offset + i}")
+            for i, it in enumerate(fixtures.news_items(n, seed=offset))]
+    papers = [Item(f"{e['title']}: {codename(rnd)}",
+                   f"http://arxiv.org/abs/{2400 + (offset + i) // 10000}.{(offset + i) % 10000:05d}v1",
+                   "arXiv", e["updated"], kind="paper", summary=e["summary"])
+              for i, e in enumerate(fixtures.arxiv_entries(n, seed=offset))]
+    return collapse_near_duplicates(news), papers
+
+
+def fill(archive: Archive, weeks: int, now: float) -> None:
+    news, papers = items(weeks * PER_ISSUE * 2)
+    for w in range(weeks):
+        issue = Issue("q", PER_ISSUE, news=news[w * PER_ISSUE:(w + 1) * PER_ISSUE],
+                      papers=papers[w * PER_ISSUE:(w + 1) * PER_ISSUE], title=f"Week {w}", created=str(w))
+        archive.add_issue(issue, "site", published_at=now - (weeks - w) * WEEK)
+
+
+def pool(size: int, recent) -> list:
+    news, papers = items(size // 2, offset=10 ** 6)
+    fresh = news + papers
+    # Every 10th candidate is a story from the last issues: same paper revised, or the same link
+    for i in range(0, min(len(fresh), 10 * len(recent)), 10):
+        old = recent[i // 10]
+        fresh[i] = Item(old.title, old.url.replace("v1", "v2"), old.src, old.published, kind=old.kind,
+                        id=old.id, summary=old.summary)
+    return fresh
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--years", default="1,5,20", help="archive sizes, in years of weekly issues")
+    ap.add_argument("--pool", type=int, default=2000, help="candidates screened per run")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'years':>5} {'issues':>6} {'items':>7} {'keys':>8} {'fill s':>7} {'screen ms':>9} {'us/item':>8} "
+          f"{'dropped':>7} {'demoted':>7} {'search ms':>9}")
+    for years in (int(y) for y in args.years.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = Archive(os.path.join(tmp, "archive.sqlite"))
+            now = time.time()
+            start = time.perf_counter()
+            fill(archive, years * 52, now)
+            filled = time.perf_counter() - start
+            last = archive._db.execute("SELECT max(id) FROM issues").fetchone()[0]
+            recent = [Item(r[0], r[1], r[2], datetime.now(), kind=r[3]) for r in archive._db.execute(
+                "SELECT title, url, src, kind FROM items WHERE issue_id > ?", (last - 3,))]
+            candidates = pool(args.pool, recent)
+            best = float("inf")
+            for _ in range(args.repeat):
+                archive.stats.update(checked=0, dropped=0, demoted=0, lookup_ms=0.0)
+                t = time.perf_counter()
+                archive.screen(candidates, "site")
+                best = min(best, time.perf_counter() - t)
+            t = time.perf_counter()
+            archive.search("long-context reasoning", limit=20)
+            search = time.perf_counter() - t
+            c = archive.counts()
+            print(f"{years:>5} {c['issues']:>6} {c['items']:>7} {c['item_keys']:>8} {filled:>7.2f} {best * 1000:>9.1f} "
+                  f"{best * 1e6 / len(candidates):>8.1f} {archive.stats['dropped']:>7} {archive.stats['demoted']:>7} "
+                  f"{search * 1000:>9.2f}")
+            archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Near-duplicate clustering benchmark (dedupe.py) on fixture headlines
+# Every 5th fixture story is a reworded syndicated copy, so a good run finds ~20% of items as alternates.
+#
+#   python -m benchmarks.bench_dedupe --sizes 100,1000,10000 --repeat 5
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from dedupe import cluster_indices  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="100,1000,10000")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'size':>7} {'best ms':>9} {'clusters':>9} {'merged':>7}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        titles = [f"{it['title']} - {it['publisher']}" for it in fixtures.news_items(size)]
+        best, groups = float("inf"), []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            groups = cluster_indices(titles)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>7} {best * 1000:>9.1f} {len(groups):>9} {size - len(groups):>7}")
+
+
+if __name__ == "__main__":
+    main()
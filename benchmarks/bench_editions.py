@@ -0,0 +1,74 @@
+# Multi-edition benchmark (editions.py) against the local stub server and FakeLLM
+# Builds 1, 2, 4, 8 editions in one process (shared fetch, shared LLM slots) and compares that with
+# building the same editions one after another, each with its own fetch. Editions alternate between
+# two queries and share the arXiv categories, as topic editions of one newsletter usually do.
+# Publishing runs as a dry run; artifacts go to a temp dir.
+#
+#   python -m benchmarks.bench_editions --counts 1,2,4,8 --llm-latency 0.2 --llm-workers 4
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="aiml-bench-"))
+os.environ.setdefault("LLM_CACHE", "off")
+os.environ.setdefault("HTTP_POOL_SIZE", "64")  # every stub route is one host
+os.environ.setdefault("EDITION_DIR", tempfile.mkdtemp(prefix="aiml-editions-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agentic_newsletter_generator as gen  # noqa: E402
+import editions  # noqa: E402
+from benchmarks.fake_llm import FakeLLM  # noqa: E402
+from benchmarks.stub_server import StubServer  # noqa: E402
+
+QUERIES = ("artificial intelligence machine learning", "large language models")
+
+
+def make_editions(count: int):
+    return [editions.Edition(f"ed{i}", query=QUERIES[i % len(QUERIES)], num=6) for i in range(count)]
+
+
+def cold() -> None:
+    gen.URL_CACHE.clear()
+    gen.FEEDS.validators.clear()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--counts", default="1,2,4,8")
+    ap.add_argument("--size", type=int, default=100, help="fixture items per feed")
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake LLM call")
+    ap.add_argument("--llm-workers", type=int, default=4, help="shared LLM slots in batch mode")
+    ap.add_argument("--http-latency", type=float, default=0.05)
+    args = ap.parse_args()
+
+    with StubServer(n_news=args.size, n_papers=args.size, latency=args.http_latency) as srv:
+        for key, url in srv.endpoints().items():
+            setattr(gen, key, url)
+        gen.SERPSTACK_API_KEY = ""
+        gen.ARXIV_DELAY = 0.0
+        gen.llm = FakeLLM(latency=args.llm_latency)
+
+        print(f"{'editions':>8} {'separate s':>10} {'batch s':>8} {'batch/ed s':>10} {'speedup':>8} "
+              f"{'fetched':>7} {'http hits':>9}")
+        for count in (int(c) for c in args.counts.split(",")):
+            eds = make_editions(count)
+            cold()
+            start = time.perf_counter()
+            for ed in eds:  # one process per edition, minus the import: own fetch, LLM calls in series
+                editions.run_editions([ed], workers=1, llm_workers=1)
+            separate = time.perf_counter() - start
+
+            cold()
+            srv.state.hits.clear()
+            report = editions.run_editions(eds, workers=count, llm_workers=args.llm_workers)
+            batch = report["total_seconds"]
+            hits = sum(srv.state.hits.values())
+            print(f"{count:>8} {separate:>10.2f} {batch:>8.2f} {batch / count:>10.2f} {separate / batch:>7.1f}x "
+                  f"{report['sources_fetched']:>7} {hits:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Cold-start benchmark: wall time of `import agentic_newsletter_generator` in a fresh interpreter,
+# plus the slowest imports from -X importtime, checked against IMPORT_TIME_BUDGET
+#
+#   python -m benchmarks.bench_import --repeat 5 --top 10
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "agentic_newsletter_generator"
+
+
+def import_once(importtime: bool = False):
+    """(wall seconds, stderr) of one import in a fresh interpreter."""
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", f"import {MODULE}"]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PUBLISH": "false"})
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+    return elapsed, proc.stderr
+
+
+def top_level_imports(stderr: str, top: int):
+    """(cumulative microseconds, module) for imports done directly by the module under test."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative, name = line.split(":", 1)[1].split("|")
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:  # two spaces under the module itself
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    budget = float(os.getenv("IMPORT_TIME_BUDGET", "0.5"))
+    import_once()  # warm the bytecode and filesystem caches
+    times = sorted(import_once()[0] for _ in range(args.repeat))
+    print(f"import {MODULE}: best {times[0] * 1000:.0f} ms, median {times[len(times) // 2] * 1000:.0f} ms "
+          f"(budget {budget * 1000:.0f} ms, includes interpreter start-up)")
+
+    _, stderr = import_once(importtime=True)
+    print(f"\n{'cumulative ms':>14}  module")
+    for us, name in top_level_imports(stderr, args.top):
+        print(f"{us / 1000:>14.1f}  {name}")
+    if times[0] > budget:
+        raise SystemExit(f"import time {times[0]:.2f}s exceeds budget {budget:g}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Local-LLM benchmark (ollama_client.py) against the stub server's Ollama stand-in
+# Runs the generate step's LLM stages three ways and prints Ollama's own per-call timings:
+#   cold      keep_alive=0 (model unloaded after each call), style guide after the call-specific text
+#   shared    keep_alive on, shared PROMPT_PREFIX first, no warm-up
+#   prewarm   as shared, with the model loaded and the prefix evaluated while "fetching"
+# Pass --url http://localhost:11434 to measure a real Ollama instead of the stand-in.
+#
+#   python -m benchmarks.bench_ollama --items 6 --fetch-seconds 1.0
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="aiml-bench-"))
+os.environ.setdefault("LLM_CACHE", "off")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agentic_newsletter_generator as gen  # noqa: E402
+from artifact import Issue  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+from benchmarks.stub_server import StubServer  # noqa: E402
+from items import Item  # noqa: E402
+from llm_pool import Backend, LLMPool  # noqa: E402
+from ollama_client import OllamaClient  # noqa: E402
+from prompt_template import PromptTemplate  # noqa: E402
+
+
+def issue(n: int) -> Issue:
+    news = [Item(it["title"], f"https://{it['publisher']}/{it['id']}", it["publisher"], it["published"])
+            for it in fixtures.news_items(n)]
+    papers = [Item(e["title"], e["id"], "arXiv", e["updated"], kind="paper", summary=e["summary"])
+              for e in fixtures.arxiv_entries(n)]
+    return Issue("artificial intelligence machine learning", n, news=news, papers=papers)
+
+
+def style_last(prompt: PromptTemplate) -> PromptTemplate:
+    # The pre-change layout: call-specific text first, style guide at the end
+    return PromptTemplate(prompt.input_variables, prompt.template + "\n\n" + prompt.prefix.strip())
+
+
+def run(url: str, it: Issue, keep_alive: str, layout: str, fetch_seconds: float, prewarm: bool):
+    client = OllamaClient(base_url=url, keep_alive=keep_alive)
+    gen.llm = LLMPool([Backend("ollama", client)])
+    saved = {name: getattr(gen, name) for name in ("topic_prompt", "intro_prompt", "summary_prompt", "draft_prompt")}
+    if layout == "style_last":
+        for name, prompt in saved.items():
+            setattr(gen, name, style_last(prompt))
+    try:
+        start = time.perf_counter()
+        if prewarm:
+            client.warm(gen.PROMPT_PREFIX)  # the CLI does this on a thread while fetching
+        time.sleep(max(0.0, fetch_seconds - (time.perf_counter() - start)))
+        llm_start = time.perf_counter()
+        gen.generate_issue(Issue(it.query, it.num, news=it.news, papers=it.papers), timings={})
+        return time.perf_counter() - llm_start, client.summary()
+    finally:
+        for name, prompt in saved.items():
+            setattr(gen, name, prompt)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--url", default="", help="real Ollama base URL (default: stub server)")
+    ap.add_argument("--items", type=int, default=6, help="news items and papers in the issue")
+    ap.add_argument("--fetch-seconds", type=float, default=1.0, help="fetch time the warm-up overlaps with")
+    args = ap.parse_args()
+
+    it = issue(args.items)
+    with StubServer(n_news=1, n_papers=1) as srv:
+        url = args.url or srv.ollama_url()
+        # first chunk: client side, every call; the rest: Ollama's timings, calls that ran to the end
+        print(f"{'mode':>8} {'llm s':>7} {'calls':>5} {'1st chunk ms':>12} {'full':>4} {'load ms':>8} "
+              f"{'prompt tok':>10} {'prompt ms':>9} {'gen tok':>7} {'gen ms':>7}")
+        for mode, keep_alive, layout, prewarm in (("cold", "0", "style_last", False),
+                                                  ("shared", "30m", "shared_prefix", False),
+                                                  ("prewarm", "30m", "shared_prefix", True)):
+            srv.state.ollama.loaded = None  # every mode starts with the model unloaded
+            seconds, summary = run(url, it, keep_alive, layout, args.fetch_seconds, prewarm)
+            generated = [c for c in summary["per_call"] if c["kind"] == "generate"]
+            t = {k: sum(c.get(k, 0) for c in generated)
+                 for k in ("first_chunk_ms", "load_ms", "prompt_tokens", "prompt_eval_ms", "eval_tokens", "eval_ms")}
+            full = sum(1 for c in generated if not c.get("stopped_early"))
+            print(f"{mode:>8} {seconds:>7.2f} {len(generated):>5} {t['first_chunk_ms']:>12.0f} {full:>4} "
+                  f"{t['load_ms']:>8.0f} {t['prompt_tokens']:>10} {t['prompt_eval_ms']:>9.0f} {t['eval_tokens']:>7} "
+                  f"{t['eval_ms']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
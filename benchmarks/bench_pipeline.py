@@ -0,0 +1,128 @@
+# Offline end-to-end benchmark for the newsletter pipeline
+# Replays fixture Serpstack / Google News RSS / arXiv / redirect responses from a local stub server,
+# swaps in a deterministic FakeLLM, and runs the real stage graph (build_stages: news/paper candidates,
+# news/papers selection, themes, topic/intro/summary) plus assemble_article incl. references at
+# several fixture sizes.
+#
+#   python -m benchmarks.bench_pipeline --sizes 10,100,1000,10000 --repeat 5 --llm-latency 0.05
+#
+# Reports p50/p90/p99/max per stage, peak traced memory and stub HTTP hits per size.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+# Isolate caches and keep LLM output uncached before the generator reads its config
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="aiml-bench-"))
+os.environ.setdefault("LLM_CACHE", "off")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging  # noqa: E402
+
+import agentic_newsletter_generator as gen  # noqa: E402
+from benchmarks.fake_llm import FakeLLM  # noqa: E402
+from llm_pool import Backend, LLMPool  # noqa: E402
+from benchmarks.stub_server import StubServer  # noqa: E402
+from pipeline import run_stages  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_once(num: int, timings: Dict[str, List[float]]) -> None:
+    stage_t: Dict[str, Dict] = {}
+    out = run_stages(gen.build_stages("artificial intelligence machine learning", num), timings=stage_t)
+    for name, t in stage_t.items():
+        timings.setdefault(name, []).append(t["seconds"])
+    start = time.perf_counter()
+    gen.assemble_article(out["topic"], out["intro"], out["news"], out["papers"], out["summary"])
+    timings.setdefault("assemble", []).append(time.perf_counter() - start)
+
+
+def bench_size(size: int, args) -> Dict:
+    with StubServer(n_news=size, n_papers=size, latency=args.http_latency) as srv:
+        for key, url in srv.endpoints().items():
+            setattr(gen, key, url)
+        gen.SERPSTACK_API_KEY = "bench" if args.source == "serpstack" else ""
+        gen.llm = FakeLLM(latency=args.llm_latency, per_word=args.llm_per_word, words=args.llm_words)
+        if args.slow_primary:
+            gen.llm = LLMPool([Backend("slow", FakeLLM(latency=args.slow_primary, words=args.llm_words)),
+                               Backend("fake", gen.llm)])
+        gen.ARXIV_DELAY = args.arxiv_delay
+        gen.LLM_BATCH = args.batch
+        timings: Dict[str, List[float]] = {}
+        for _ in range(args.repeat):
+            if args.cold:
+                gen.URL_CACHE.clear()
+                gen.FEEDS.validators.clear()
+            start = time.perf_counter()
+            run_once(args.num, timings)
+            timings.setdefault("total", []).append(time.perf_counter() - start)
+
+        gen.URL_CACHE.clear()
+        gen.FEEDS.validators.clear()
+        tracemalloc.start()
+        run_once(args.num, {})
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        hits = dict(srv.state.hits)
+
+    return {
+        "size": size,
+        "stages": {
+            name: {
+                "p50": percentile(vals, 50), "p90": percentile(vals, 90),
+                "p99": percentile(vals, 99), "max": max(vals),
+            }
+            for name, vals in timings.items()
+        },
+        "peak_mem_mb": peak / 1e6,
+        "http_hits": hits,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="10,100,1000", help="comma-separated fixture sizes (items per feed)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--num", type=int, default=6, help="items per section, as in the real run")
+    ap.add_argument("--source", choices=("rss", "serpstack"), default="rss",
+                    help="rss: Google News only; serpstack: also enable the Serpstack source")
+    ap.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake LLM call")
+    ap.add_argument("--llm-per-word", type=float, default=0.0, help="extra fake LLM seconds per generated word")
+    ap.add_argument("--llm-words", type=int, default=40, help="words per fake LLM completion")
+    ap.add_argument("--slow-primary", type=float, default=0.0,
+                    help="put the fake LLM behind an LLMPool whose primary takes this many seconds (shows hedging)")
+    ap.add_argument("--batch", action="store_true", help="batched topic/intro/summary generation (LLM_BATCH)")
+    ap.add_argument("--http-latency", type=float, default=0.0, help="seconds added to every stub response")
+    ap.add_argument("--arxiv-delay", type=float, default=0.0, help="polite delay between arXiv pages")
+    ap.add_argument("--cold", action="store_true", help="clear URL and feed caches before every repeat")
+    ap.add_argument("--json", dest="json_path", help="also write results to this JSON file")
+    args = ap.parse_args(argv)
+
+    logging.getLogger("aiml-newsletter").setLevel(logging.WARNING)
+    results = [bench_size(int(s), args) for s in args.sizes.split(",") if s.strip()]
+
+    print(f"{'size':>6} {'stage':<10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for r in results:
+        for name, st in r["stages"].items():
+            print(f"{r['size']:>6} {name:<10} {st['p50']*1e3:>9.1f} {st['p90']*1e3:>9.1f} {st['p99']*1e3:>9.1f} {st['max']*1e3:>9.1f}")
+        print(f"{r['size']:>6} peak traced memory {r['peak_mem_mb']:.1f} MB | stub hits {r['http_hits']}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+# Relevance ranking benchmark (ranking.py) on fixture headlines and arXiv abstracts
+#
+#   python -m benchmarks.bench_ranking --sizes 100,1000,10000 --repeat 5
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from items import Item  # noqa: E402
+from ranking import rank_items  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="100,1000,10000")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'size':>7} {'pool':<7} {'best ms':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        pools = {
+            "news": [Item(f"{it['title']} - {it['publisher']}", f"https://{it['publisher']}/{it['id']}", "",
+                          it["published"], source="google_news") for it in fixtures.news_items(size)],
+            "papers": [Item(e["title"], e["id"], "arXiv", e["updated"], kind="paper", summary=e["summary"])
+                       for e in fixtures.arxiv_entries(size)],
+        }
+        for name, items in pools.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                rank_items(items)
+                best = min(best, time.perf_counter() - start)
+            print(f"{size:>7} {name:<7} {best * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
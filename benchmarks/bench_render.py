@@ -0,0 +1,74 @@
+# Article rendering benchmark (render.py layouts) on fixture news and arXiv items
+# Compares each compiled layout with the previous f-string renderer (html.escape per use) to show
+# that render time stays linear and small for digests with hundreds of items.
+#
+#   python -m benchmarks.bench_render --sizes 10,100,1000 --repeat 20
+
+import argparse
+import html
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from items import Item  # noqa: E402
+from render import LAYOUTS, fmt_rfc822, get_layout  # noqa: E402
+
+
+def fstring_article(topic, intro, news, papers, summary) -> str:
+    """The renderer before render.py, kept here as the baseline."""
+    def li(title, url, src, published):
+        return (f'<li><a href="{html.escape(url, quote=True)}">{html.escape(title)}</a> — '
+                f'<em>{html.escape(src)} • {html.escape(published)}</em></li>')
+
+    def paper_li(it):
+        s = it.summary
+        text = f"{it.title}: {s[:220].rstrip()}…" if len(s) > 240 else f"{it.title}: {s}"
+        return li(text, it.url, "arXiv", fmt_rfc822(it.published))
+
+    news_block = "\n".join(li(it.title, it.url, it.src, fmt_rfc822(it.published)) for it in news)
+    papers_block = "\n".join(paper_li(it) for it in papers)
+    seen, refs = set(), []
+    for x in (x for it in news + papers for x in it.with_alternates()):
+        if (x.title, x.url) not in seen:
+            seen.add((x.title, x.url))
+            refs.append(f'<li><a href="{html.escape(x.url, quote=True)}">{html.escape(x.label)} — {html.escape(x.title)}</a></li>')
+    return (f"<h2>AI/ML Weekly: {html.escape(topic)}</h2><p>{intro}</p><ul>{news_block}</ul><ul>{papers_block}</ul>"
+            f"<p>{summary}</p><ul>{chr(10).join(refs)}</ul>")
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="10,100,1000")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    renderers = {"fstring": fstring_article}
+    for name in LAYOUTS:
+        get_layout(name)  # compile once, outside the timing
+        renderers[name] = get_layout(name).article
+
+    print(f"{'items':>7} {'renderer':<10} {'best ms':>9} {'us/item':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        news = [Item(it["title"], f"https://{it['publisher']}/{it['id']}", it["publisher"], it["published"])
+                for it in fixtures.news_items(size)]
+        papers = [Item(e["title"], e["id"], "arXiv", e["updated"], kind="paper", summary=e["summary"])
+                  for e in fixtures.arxiv_entries(size)]
+        for name, render in renderers.items():
+            secs = best_of(lambda: render("Agents & evals", "Intro.", news, papers, "Summary."), args.repeat)
+            print(f"{2 * size:>7} {name:<10} {secs * 1000:>9.2f} {secs * 1e6 / (2 * size):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
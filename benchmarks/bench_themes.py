@@ -0,0 +1,47 @@
+# Theme extraction benchmark (themes.py) on fixture news titles and arXiv abstracts
+# Times vectorizing + clustering pools of several sizes and prints the ranked themes of the largest.
+#
+#   python -m benchmarks.bench_themes --sizes 100,1000,5000 --repeat 5
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from items import Item  # noqa: E402
+from themes import extract_themes  # noqa: E402
+
+
+def pool(size: int):
+    news = [Item(it["title"], f"https://{it['publisher']}/{it['id']}", it["publisher"], it["published"])
+            for it in fixtures.news_items(size)]
+    papers = [Item(e["title"], e["id"], "arXiv", e["updated"], kind="paper", summary=e["summary"])
+              for e in fixtures.arxiv_entries(size)]
+    return news + papers
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="100,1000,5000", help="news items and papers each")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'items':>7} {'best ms':>9} {'us/item':>9} {'themes':>7}")
+    themes = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        items = pool(size)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            themes = extract_themes(items)
+            best = min(best, time.perf_counter() - start)
+        print(f"{len(items):>7} {best * 1000:>9.1f} {best * 1e6 / len(items):>9.1f} {len(themes):>7}")
+    for t in themes:
+        print(f"  {t.score:>8.1f}  {t.size:>5}  {t.label}")
+
+
+if __name__ == "__main__":
+    main()
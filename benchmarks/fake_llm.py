@@ -0,0 +1,50 @@
+# Deterministic stand-in for the Cohere/Ollama LLMs
+# - Same prompt -> same text (derived from a hash of the prompt)
+# - Fixed latency plus a per-output-word cost, so prompt stages have realistic shape
+# - stream() yields word by word (paying per_word each), so early stopping shows up in timings
+# - Exposes _identifying_params so llm_cache keys it like a real backend
+# - Prompts asking for a JSON object (batched generation) get {"topic", "intro", "summary"}
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, Iterator
+
+_WORDS = ("models agents inference retrieval evaluation latency practitioners tooling production "
+          "benchmarks open-source enterprise costs governance data teams").split()
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.05, per_word: float = 0.0, words: int = 40):
+        self.latency = latency
+        self.per_word = per_word
+        self.words = words
+        self.calls = 0
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": "fake-llm", "words": self.words}
+
+    def _text(self, prompt) -> str:
+        digest = hashlib.sha256(str(prompt).encode("utf-8")).digest()
+        words = [_WORDS[b % len(_WORDS)] for b in (digest * (self.words // len(digest) + 1))[: self.words]]
+        sentences = [" ".join(words[i:i + 10]).capitalize() + "." for i in range(0, len(words), 10)]
+        return sentences[0] + "\n" + " ".join(sentences[1:])  # chatty models put a line break after the gist
+
+    def invoke(self, prompt, **kwargs) -> str:
+        self.calls += 1
+        time.sleep(self.latency + self.per_word * self.words)
+        if "Return ONLY a JSON object" in str(prompt):
+            text = self._text(prompt)
+            return json.dumps({"topic": " ".join(text.split()[:8]), "intro": text, "summary": text[::-1].capitalize()})
+        return self._text(prompt)
+
+    def stream(self, prompt, **kwargs) -> Iterator[str]:
+        if "Return ONLY a JSON object" in str(prompt):
+            yield self.invoke(prompt, **kwargs)
+            return
+        self.calls += 1
+        time.sleep(self.latency)
+        for i, word in enumerate(self._text(prompt).split(" ")):
+            time.sleep(self.per_word)
+            yield word if i == 0 else " " + word
@@ -0,0 +1,123 @@
+# Deterministic fixtures shaped like recorded Serpstack / Google News RSS / arXiv Atom responses
+# - Sized by `n` so the same pipeline can be replayed at 10 .. 10,000 items
+# - Every 5th news item is a syndicated copy (reworded headline, other publisher) of an earlier one
+# - All timestamps fall inside the last week, newest first, like the live feeds
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List, Dict
+from xml.sax.saxutils import escape
+
+UTC = timezone.utc
+
+_SUBJECTS = ["Open-source LLM", "Agent framework", "Vision transformer", "Diffusion model", "Chip startup",
+             "Bank", "Regulator", "Robotics lab", "Search engine", "Cloud provider", "Health AI tool", "Benchmark"]
+_VERBS = ["launches", "beats", "cuts cost of", "rethinks", "scales", "audits", "open-sources", "delays"]
+_OBJECTS = ["long-context reasoning", "on-device inference", "fraud detection", "code generation",
+            "multimodal retrieval", "RLHF pipelines", "GPU scheduling", "model evaluation"]
+_PUBLISHERS = ["techwire.example", "dailyml.example", "finnews.example", "labnotes.example",
+               "cloudbeat.example", "policywatch.example", "devjournal.example", "aiherald.example"]
+_SYLLABLES = ["ka", "ro", "mi", "tev", "lu", "zan", "or", "pel", "qui", "sa", "dor", "ne", "vix", "ta", "bo", "ren"]
+_TOPICS = ["attention", "retrieval", "agents", "alignment", "compression", "graphs", "tabular", "speech"]
+
+
+def _codename(i: int) -> str:
+    # Made-up words unique to story i, so distinct stories don't look like near-duplicates
+    words = []
+    for salt in (1, 7, 13, 29):
+        n, w = i * salt + salt, ""
+        for _ in range(3):
+            n, r = divmod(n, len(_SYLLABLES))
+            w += _SYLLABLES[r]
+        words.append(w.capitalize())
+    return " ".join(words)
+
+
+def news_items(n: int, seed: int = 7) -> List[Dict[str, str]]:
+    rnd = random.Random(seed)
+    now = datetime.now(UTC)
+    items: List[Dict[str, str]] = []
+    for i in range(n):
+        if i % 5 == 4 and items:
+            base = items[rnd.randrange(len(items))]
+            title = base["title"].replace(" launches ", " unveils ").replace(" beats ", " outperforms ") + " - report"
+        else:
+            title = f"{rnd.choice(_SUBJECTS)} {rnd.choice(_VERBS)} {rnd.choice(_OBJECTS)}: {_codename(i)}"
+        items.append({
+            "title": title,
+            "publisher": _PUBLISHERS[i % len(_PUBLISHERS)],
+            "published": now - timedelta(minutes=7 * i % (6 * 24 * 60)),
+            "id": str(i),
+        })
+    items.sort(key=lambda it: it["published"], reverse=True)
+    return items
+
+
+def serpstack_json(items: List[Dict], base_url: str) -> bytes:
+    return json.dumps({
+        "request": {"success": True},
+        "news_results": [
+            {
+                "title": it["title"],
+                "url": f"{base_url}/redirect/{it['id']}",
+                "source_name": it["publisher"],
+                "published": it["published"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            for it in items
+        ],
+    }).encode("utf-8")
+
+
+def google_news_rss(items: List[Dict], base_url: str) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<rss version="2.0"><channel><title>"artificial intelligence" - Google News</title>',
+             f"<link>{base_url}/rss</link><language>en-US</language>"]
+    for it in items:
+        parts.append(
+            "<item>"
+            f"<title>{escape(it['title'])} - {escape(it['publisher'])}</title>"
+            f"<link>{base_url}/redirect/{it['id']}</link>"
+            f"<guid isPermaLink=\"false\">CBMi{it['id']}</guid>"
+            f"<pubDate>{format_datetime(it['published'], usegmt=True)}</pubDate>"
+            f"<source url=\"https://{it['publisher']}\">{escape(it['publisher'])}</source>"
+            "</item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+def arxiv_entries(n: int, seed: int = 11) -> List[Dict]:
+    rnd = random.Random(seed)
+    now = datetime.now(UTC)
+    out = []
+    for i in range(n):
+        topic = rnd.choice(_TOPICS)
+        out.append({
+            "id": f"http://arxiv.org/abs/2610.{10000 + i:05d}v{1 + i % 3}",
+            "title": f"Efficient {topic} for {rnd.choice(_OBJECTS)} at scale",
+            "summary": (f"We study {topic} in the context of {rnd.choice(_OBJECTS)}. " * 6).strip(),
+            # ~60% inside the week, the rest older, still sorted by lastUpdatedDate desc
+            "updated": now - timedelta(hours=int(i * 280 / max(n, 1))),
+        })
+    return out
+
+
+def arxiv_atom(entries: List[Dict], start: int, max_results: int) -> bytes:
+    page = entries[start:start + max_results]
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">',
+             f"<opensearch:totalResults>{len(entries)}</opensearch:totalResults>",
+             f"<opensearch:startIndex>{start}</opensearch:startIndex>"]
+    for e in page:
+        ts = e["updated"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        parts.append(
+            "<entry>"
+            f"<id>{e['id']}</id><updated>{ts}</updated><published>{ts}</published>"
+            f"<title>{escape(e['title'])}</title><summary>{escape(e['summary'])}</summary>"
+            "<author><name>A. Researcher</name></author>"
+            "</entry>"
+        )
+    parts.append("</feed>")
+    return "".join(parts).encode("utf-8")
@@ -0,0 +1,278 @@
+# Local stand-in for the external services the pipeline talks to
+#   GET /serpstack/search   -> Serpstack news JSON
+#   GET /rss                -> Google News RSS
+#   GET /arxiv/api/query    -> arXiv Atom (honours start / max_results)
+#   GET /redirect/<id>      -> 302 to /article/<id>, like a Google News link
+#   GET /article/<id>       -> tiny publisher page
+#   POST /wp/sites/<site>/posts/new | /posts/<id>, GET /wp/sites/<site>/posts/?meta_key&meta_value
+#                           -> WordPress.com REST v1.1 stand-in (WORDPRESS_API_BASE=<base>/wp); posts are
+#                              kept in StubState.posts, and wp_faults can fail the next POSTs
+#   POST /api/generate      -> Ollama stand-in (OllamaSim): model load unless loaded and kept alive
+#                              with the same num_ctx, prompt eval only past the longest prefix shared
+#                              with a slot's last prompt, NDJSON stream with Ollama's timing fields
+# Feed/API bodies carry an ETag (If-None-Match -> 304) and are gzipped when the client accepts it.
+# Optional per-request latency simulates network round trips.
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import fixtures
+from benchmarks.fake_llm import FakeLLM
+
+
+def _keep_alive_seconds(value) -> float:
+    text = str(value if value is not None else "5m").strip()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+class OllamaSim:
+    """Costs of one local model server; tokens are approximated as 4 characters."""
+
+    def __init__(self, load_seconds: float = 0.5, prompt_token_seconds: float = 0.0005,
+                 token_seconds: float = 0.005, parallel: int = 2):
+        self.load_seconds = load_seconds
+        self.prompt_token_seconds = prompt_token_seconds
+        self.token_seconds = token_seconds
+        self.parallel = parallel
+        self.loaded: Optional[tuple] = None  # (model, num_ctx)
+        self.expires = 0.0
+        self.ready = 0.0  # when the model being loaded can serve (requests arriving meanwhile wait)
+        self.slots: List[str] = []  # last prompt per slot (its KV cache)
+        self.text = FakeLLM(latency=0.0)
+        self._lock = threading.Lock()
+
+    def admit(self, model: str, num_ctx, keep_alive, prompt: str):
+        """(load seconds, prompt tokens to evaluate) for a request, updating the loaded model and slots."""
+        with self._lock:
+            now = time.monotonic()
+            if self.loaded != (model, num_ctx) or now > self.expires:
+                self.loaded, self.slots, self.ready = (model, num_ctx), [], now + self.load_seconds
+            load = max(0.0, self.ready - now)
+            best, shared = None, 0
+            for i, old in enumerate(self.slots):
+                n = 0
+                for a, b in zip(old, prompt):
+                    if a != b:
+                        break
+                    n += 1
+                if n > shared:
+                    best, shared = i, n
+            if best is not None:
+                self.slots[best] = prompt
+            elif len(self.slots) < self.parallel:
+                self.slots.append(prompt)
+            else:
+                self.slots = self.slots[1:] + [prompt]
+            self.expires = now + load + _keep_alive_seconds(keep_alive)
+            return load, max(1, (len(prompt) - shared) // 4)
+
+
+class StubState:
+    def __init__(self, n_news: int, n_papers: int, latency: float = 0.0):
+        self.latency = latency
+        self.news = fixtures.news_items(n_news)
+        self.papers = fixtures.arxiv_entries(n_papers)
+        self.base_url = ""
+        self.hits: Dict[str, int] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.posts: Dict[int, Dict] = {}  # WordPress stand-in: post ID -> post
+        # Outcomes of the next POSTs: "error" (503, nothing stored) or "lost" (stored, but 503 returned,
+        # like a request that timed out after the server committed it)
+        self.wp_faults: List[str] = []
+        self.ollama = OllamaSim()
+
+    def wp_save(self, site: str, post_id: Optional[int], data: Dict) -> Dict:
+        with self._lock:
+            if post_id is None:
+                post_id = len(self.posts) + 1
+                self.posts[post_id] = {"ID": post_id, "site": site, "URL": f"{self.base_url}/wp/{site}/p/{post_id}"}
+            post = self.posts[post_id]
+            post.update(title=data.get("title", ""), content=data.get("content", ""), status=data.get("status", "publish"),
+                        metadata={m["key"]: m["value"] for m in data.get("metadata", [])})
+            return dict(post)
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.hits[route] = self.hits.get(route, 0) + 1
+
+    def body(self, route: str) -> bytes:
+        # Rendered once per server, like a recorded response
+        if route not in self._bodies:
+            if route == "serpstack":
+                self._bodies[route] = fixtures.serpstack_json(self.news, self.base_url)
+            elif route == "rss":
+                self._bodies[route] = fixtures.google_news_rss(self.news, self.base_url)
+        return self._bodies[route]
+
+
+def _handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):  # keep benchmark output clean
+            pass
+
+        def _send_feed(self, body: bytes, ctype: str):
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                state.count("not_modified")
+                return self._send(304, headers={"ETag": etag})
+            headers = {"ETag": etag}
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = gzip.compress(body, compresslevel=5)
+                headers["Content-Encoding"] = "gzip"
+            self._send(200, body, ctype, headers)
+
+        def _send(self, code: int, body: bytes = b"", ctype: str = "text/plain", headers: Optional[Dict[str, str]] = None):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            if state.latency:
+                time.sleep(state.latency)
+            url = urlparse(self.path)
+            qs = parse_qs(url.query)
+            path = url.path
+            if path == "/serpstack/search":
+                state.count("serpstack")
+                return self._send_feed(state.body("serpstack"), "application/json")
+            if path == "/rss":
+                state.count("rss")
+                return self._send_feed(state.body("rss"), "application/rss+xml")
+            if path == "/arxiv/api/query":
+                state.count("arxiv")
+                start = int(qs.get("start", ["0"])[0])
+                size = int(qs.get("max_results", ["10"])[0])
+                return self._send_feed(fixtures.arxiv_atom(state.papers, start, size), "application/atom+xml")
+            if path.startswith("/redirect/"):
+                state.count("redirect")
+                return self._send(302, headers={"Location": f"{state.base_url}/article/{path.rsplit('/', 1)[-1]}"})
+            if path.startswith("/wp/sites/"):
+                return self._wp_get(path.strip("/").split("/"), qs)
+            if path.startswith("/article/"):
+                state.count("article")
+                return self._send(200, b"<html><body>article</body></html>", "text/html")
+            self._send(404, b"not found")
+
+        do_HEAD = do_GET
+
+        def _json(self, code: int, payload) -> None:
+            self._send(code, json.dumps(payload).encode("utf-8"), "application/json")
+
+        def _wp_get(self, parts: List[str], qs: Dict[str, List[str]]) -> None:
+            # /wp/sites/<site>/posts/  (meta_key / meta_value lookup)
+            state.count("wp_lookup")
+            key, value = qs.get("meta_key", [""])[0], qs.get("meta_value", [""])[0]
+            with state._lock:
+                posts = [p for p in state.posts.values()
+                         if p["site"] == parts[2] and (not key or p["metadata"].get(key) == value)]
+            self._json(200, {"found": len(posts), "posts": [{"ID": p["ID"], "URL": p["URL"]} for p in posts]})
+
+        def _ollama_generate(self, data: Dict) -> None:
+            state.count("ollama")
+            sim, options = state.ollama, data.get("options") or {}
+            prompt = data.get("prompt", "")
+            load, prompt_tokens = sim.admit(data.get("model", ""), options.get("num_ctx"), data.get("keep_alive"), prompt)
+            time.sleep(load + prompt_tokens * sim.prompt_token_seconds)
+            words = sim.text.invoke(prompt).split(" ")[:options.get("num_predict") or None]
+            final = {"done": True, "load_duration": int(load * 1e9), "prompt_eval_count": prompt_tokens,
+                     "prompt_eval_duration": int(prompt_tokens * sim.prompt_token_seconds * 1e9),
+                     "eval_count": len(words), "eval_duration": int(len(words) * sim.token_seconds * 1e9)}
+            if not data.get("stream", True):
+                time.sleep(len(words) * sim.token_seconds)
+                return self._json(200, {"response": " ".join(words), **final})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for i, word in enumerate(words):
+                    time.sleep(sim.token_seconds)
+                    self._chunk({"response": word if i == 0 else " " + word, "done": False})
+                self._chunk({"response": "", **final})
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):  # client stopped reading (early stop)
+                self.close_connection = True
+
+        def _chunk(self, payload: Dict) -> None:
+            line = json.dumps(payload).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            if state.latency:
+                time.sleep(state.latency)
+            parts = urlparse(self.path).path.strip("/").split("/")
+            data = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            if parts == ["api", "generate"]:
+                return self._ollama_generate(data)
+            if len(parts) != 5 or parts[:2] != ["wp", "sites"] or parts[3] != "posts":
+                return self._send(404, b"not found")
+            if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+                return self._json(403, {"error": "unauthorized"})
+            with state._lock:
+                fault = state.wp_faults.pop(0) if state.wp_faults else ""
+            if fault == "error":
+                state.count("wp_error")
+                return self._json(503, {"error": "unavailable"})
+            if parts[4] == "new":
+                state.count("wp_new")
+                post = state.wp_save(parts[2], None, data)
+            elif int(parts[4]) in state.posts:
+                state.count("wp_update")
+                post = state.wp_save(parts[2], int(parts[4]), data)
+            else:
+                return self._json(404, {"error": "unknown_post"})
+            if fault == "lost":
+                state.count("wp_lost")
+                return self._json(503, {"error": "timeout"})
+            self._json(200, {"ID": post["ID"], "URL": post["URL"], "status": post["status"]})
+
+    return Handler
+
+
+class StubServer:
+    def __init__(self, n_news: int, n_papers: int, latency: float = 0.0):
+        self.state = StubState(n_news, n_papers, latency)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self.state))
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.state.base_url = self.base_url
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def endpoints(self) -> Dict[str, str]:
+        return {
+            "SERPSTACK_URL": f"{self.base_url}/serpstack/search",
+            "GOOGLE_NEWS_SEARCH_URL": f"{self.base_url}/rss?q={{q}}",
+            "ARXIV_URL": f"{self.base_url}/arxiv/api/query",
+        }
+
+    def wordpress_api_base(self) -> str:
+        return f"{self.base_url}/wp"
+
+    def ollama_url(self) -> str:
+        return self.base_url
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,111 @@
+# Small persistent key/value cache on SQLite
+# - Per-entry TTL (expired rows are treated as misses and overwritten)
+# - Size cap with LRU eviction (by last access time)
+# - Values may be None, which lets callers cache negative results
+# - Thread-safe: one connection guarded by a lock, shared by worker threads
+# - on_evict(keys) is told about every expired/evicted/cleared key (files kept alongside the rows)
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MISS = object()  # sentinel: distinguishes "not cached" from a cached None
+
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+
+class SqliteCache:
+    def __init__(self, path: str, table: str = "cache", max_entries: int = 5000,
+                 on_evict: Optional[Callable[[List[str]], None]] = None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.stats: Dict[str, int] = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_lru ON {table}(last_access)")
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_exp ON {table}(expires_at)")
+
+    def get(self, key: str) -> Any:
+        """Return the cached value (possibly None) or MISS."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.stats["misses"] += 1
+                return MISS
+            self._db.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self.stats["negative_hits" if row[0] is None else "hits"] += 1
+            return row[0]
+
+    def set(self, key: str, value: Optional[str], ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self.stats["stores"] += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        # Expired rows go first, then least-recently-used rows above the cap
+        evicted = self._delete("expires_at < ?", (time.time(),))
+        count = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            evicted += self._delete(f"key IN (SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                                    (overflow,))
+        self.stats["evictions"] += evicted
+
+    def _delete(self, where: str, args: tuple = ()) -> int:
+        keys = None
+        if self.on_evict is not None:
+            keys = [row[0] for row in self._db.execute(f"SELECT key FROM {self.table} WHERE {where}", args)]
+        cur = self._db.execute(f"DELETE FROM {self.table} WHERE {where}", args)
+        if keys:
+            self.on_evict(keys)
+        return max(cur.rowcount, 0)
+
+    def keys(self) -> List[str]:
+        """Keys of the entries that have not expired."""
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                f"SELECT key FROM {self.table} WHERE expires_at >= ?", (time.time(),))]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._delete("1")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def summary(self) -> str:
+        s = self.stats
+        lookups = s["hits"] + s["negative_hits"] + s["misses"]
+        rate = (s["hits"] + s["negative_hits"]) / lookups if lookups else 0.0
+        return (
+            f"{self.table}: {s['hits']} hits, {s['negative_hits']} negative hits, {s['misses']} misses "
+            f"({rate:.0%} hit rate), {s['stores']} stores, {s['evictions']} evictions"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,11 @@
+# Incremental collector for the rolling weekly pool
+# Run it daily or hourly; each run adds only items not seen before (per-source high-water
+# marks + seen IDs in state_store). The Friday build reads the pool when NEWS_POOL=true.
+# Same as `python agentic_newsletter_generator.py collect`.
+
+from agentic_newsletter_generator import run_collect, write_run_report
+
+if __name__ == "__main__":
+    print("=== AI/ML Weekly — Incremental Collector ===")
+    run_collect("artificial intelligence machine learning")
+    write_run_report()
@@ -0,0 +1,109 @@
+# Conditional GET layer for feeds and APIs
+# - Remembers ETag / Last-Modified per full URL (validators live in a SqliteCache); secret query
+#   params (API keys) are left out of that key and the body filename, so no credential is written
+#   to the cache (uploaded by the workflows) and rotating a key keeps the validators
+# - Sends If-None-Match / If-Modified-Since; a 304 is served from the local body cache
+# - Asks for compressed transfer; bodies are streamed to disk, never held whole in memory
+# - A body file lives as long as its validator row: expired/evicted rows delete theirs, and opening
+#   the fetcher sweeps bodies no live row points to (e.g. responses without validators) and
+#   interrupted .part downloads, so FEED_CACHE_DIR stays bounded by FEED_CACHE_MAX_ENTRIES
+# - Goes through the shared requests session, so retries and instrumentation still apply
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional, Sequence
+
+import requests
+
+from cache_store import SqliteCache, MISS, CACHE_DIR
+
+FEED_CACHE_DIR = os.getenv("FEED_CACHE_DIR", os.path.join(CACHE_DIR, "feeds"))
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL_DAYS", "30")) * 86400
+FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "500"))
+SECRET_PARAMS = ("access_key",)  # Serpstack's API key
+
+
+@dataclass
+class Fetched:
+    url: str  # without secret params
+    path: str  # local copy of the (decoded) body
+    status: int  # 200, or 304 when served from the body cache
+    not_modified: bool
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+
+class ConditionalFetcher:
+    def __init__(self, session: requests.Session, cache_dir: str = FEED_CACHE_DIR):
+        self.session = session
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.validators = SqliteCache(os.path.join(cache_dir, "validators.sqlite"), table="feed_validators",
+                                      max_entries=FEED_CACHE_MAX_ENTRIES, on_evict=self._drop_bodies)
+        self._sweep()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".body")
+
+    def _drop_bodies(self, keys: List[str]) -> None:
+        for key in keys:
+            try:
+                os.unlink(self._body_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _sweep(self) -> None:
+        """Delete body files no live validator row points to, and leftover .part downloads."""
+        live = {os.path.basename(self._body_path(key)) for key in self.validators.keys()}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".part") or (name.endswith(".body") and name not in live):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+
+    def fetch(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+              timeout: float = 20, scope: str = "", secret_params: Sequence[str] = SECRET_PARAMS) -> Fetched:
+        """
+        GET url (+params) conditionally; raises for non-2xx/304 responses.
+        scope: separate validator namespace, so a consumer's 304 means "unchanged since *it* last fetched".
+        secret_params: params sent with the request but kept out of the cache key.
+        """
+        full_url = requests.Request("GET", url, params=params).prepare().url or url
+        public = {k: v for k, v in (params or {}).items() if k not in secret_params}
+        key_url = requests.Request("GET", url, params=public).prepare().url or url
+        key = f"{scope}|{key_url}" if scope else key_url
+        body_path = self._body_path(key)
+        req_headers = {"Accept-Encoding": "gzip, deflate", **(headers or {})}
+
+        cached = self.validators.get(key)
+        meta = json.loads(cached) if cached not in (MISS, None) else {}
+        if meta and os.path.exists(body_path):
+            if meta.get("etag"):
+                req_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                req_headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self.session.get(full_url, headers=req_headers, timeout=timeout, stream=True) as resp:
+            if resp.status_code == 304 and os.path.exists(body_path):
+                return Fetched(key_url, body_path, 304, True)
+            resp.raise_for_status()
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    for chunk in resp.iter_content(chunk_size=64 * 1024):
+                        out.write(chunk)
+                os.replace(tmp, body_path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+
+        if etag or last_modified:
+            self.validators.set(key, json.dumps({"etag": etag, "last_modified": last_modified}), ttl=FEED_CACHE_TTL)
+        return Fetched(key_url, body_path, 200, False)
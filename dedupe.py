@@ -0,0 +1,116 @@
+# Near-duplicate story clustering (MinHash + LSH)
+# - Titles are normalized (case, punctuation, trailing " - Publisher") and cut into word shingles
+# - MinHash signatures are computed for the whole pool at once with NumPy (segment-wise min)
+# - LSH banding proposes candidate pairs; pairs whose estimated Jaccard clears the threshold are
+#   merged with union-find, so cost stays roughly linear in the pool size
+# - Each cluster keeps one canonical item; the others ride along as `alternates` (extra references)
+
+import os
+import re
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from items import Item
+
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.5"))  # estimated Jaccard on shingles
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: ~50% pair-detection at Jaccard 0.5, ~96% at 0.7
+MAX_ALTERNATES = int(os.getenv("NEAR_DUP_MAX_ALTERNATES", "3"))  # extra references kept per cluster
+
+# Multiply-shift hash family: h(x) = (a*x + b mod 2^64) >> 32 with odd a; wraparound is intended
+_rng = np.random.RandomState(1729)  # fixed: signatures must be stable across runs
+_A = _rng.randint(0, 1 << 62, size=MINHASH_PERMUTATIONS, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.randint(0, 1 << 62, size=MINHASH_PERMUTATIONS, dtype=np.int64).astype(np.uint64)
+_SHIFT = np.uint64(32)
+
+PUBLISHER_SUFFIX = re.compile(r"\s+[-–—|]\s+[^-–—|]{1,60}$")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_STOPWORDS = frozenset("a an and are as at by for from in into is it its of on or over the to with".split())
+
+
+def normalize_title(title: str) -> str:
+    t = PUBLISHER_SUFFIX.sub("", title.strip())
+    return _NON_WORD.sub(" ", t.lower()).strip()
+
+
+def shingle_hashes(title: str) -> List[int]:
+    """Word shingles without stopwords; headlines are too short for character n-grams to separate stories."""
+    words = {w for w in normalize_title(title).split() if w not in _STOPWORDS} or {normalize_title(title)}
+    return [zlib.crc32(w.encode("utf-8")) for w in words]
+
+
+def minhash_signatures(shingles: List[List[int]], chunk: int = 8) -> np.ndarray:
+    """(n, MINHASH_PERMUTATIONS) uint64 signatures; one vectorized pass per permutation chunk."""
+    lengths = np.fromiter((len(s) for s in shingles), dtype=np.int64, count=len(shingles))
+    if not len(shingles):
+        return np.zeros((0, MINHASH_PERMUTATIONS), dtype=np.uint64)
+    flat = np.fromiter((h for s in shingles for h in s), dtype=np.uint64, count=int(lengths.sum()))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    sig = np.empty((len(shingles), MINHASH_PERMUTATIONS), dtype=np.uint64)
+    for lo in range(0, MINHASH_PERMUTATIONS, chunk):
+        a, b = _A[lo:lo + chunk, None], _B[lo:lo + chunk, None]
+        hashed = (a * flat[None, :] + b) >> _SHIFT
+        sig[:, lo:lo + chunk] = np.minimum.reduceat(hashed, starts, axis=1).T
+    return sig
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_indices(titles: List[str], threshold: float = NEAR_DUP_THRESHOLD) -> List[List[int]]:
+    """Groups of indices whose titles are near-duplicates (singletons included), in first-seen order."""
+    n = len(titles)
+    if n < 2:
+        return [[i] for i in range(n)]
+    shingles = [shingle_hashes(t) for t in titles]
+    sig = minhash_signatures(shingles)
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    heads, members = [], []
+    for band in range(LSH_BANDS):
+        block = np.ascontiguousarray(sig[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind="stable")
+        bucket_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        head = order[bucket_start[inverse[order]]]  # first (lowest) index of each item's bucket
+        shared = head != order
+        heads.append(head[shared])
+        members.append(order[shared])
+    # Candidate pairs from all bands; the signature estimate is too noisy on ~10-word headlines,
+    # so each candidate is confirmed with the exact Jaccard of its shingle sets
+    pairs = np.unique(np.stack([np.concatenate(heads), np.concatenate(members)], axis=1), axis=0)
+    sets = [frozenset(s) for s in shingles]
+    parent = list(range(n))
+    for a, b in pairs.tolist():
+        if len(sets[a] & sets[b]) < threshold * len(sets[a] | sets[b]):
+            continue
+        ra, rb = _find(parent, a), _find(parent, b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups: Dict[int, List[int]] = {}
+    for i in range(n):
+        groups.setdefault(_find(parent, i), []).append(i)
+    return list(groups.values())
+
+
+def collapse_near_duplicates(items: List[Item], threshold: float = NEAR_DUP_THRESHOLD) -> List[Item]:
+    """
+    One canonical item per near-duplicate cluster, original order kept.
+    The canonical item is the earliest published (the original report; ties keep pool order);
+    up to MAX_ALTERNATES of the rest (earliest first) are attached to it as `alternates`.
+    """
+    out: List[Tuple[int, Item]] = []
+    for group in cluster_indices([it.title for it in items], threshold):
+        members = sorted((items[i] for i in group), key=lambda it: it.published)
+        canonical = members[0]
+        canonical.alternates = members[1:1 + MAX_ALTERNATES]
+        out.append((group[0], canonical))
+    out.sort(key=lambda pair: pair[0])
+    return [it for _, it in out]
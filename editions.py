@@ -0,0 +1,222 @@
+# Multi-edition batch mode: several newsletters (topic, sources, layout, WordPress site) per process
+# - One process means one import of the LLM clients, one HTTP session (HTTP_POOL_SIZE connections
+#   per host), one LLM pool and the shared URL / feed / LLM caches
+# - Sources are planned across editions: identical sources (same kind, query, url, categories) are
+#   fetched once, with the largest candidate limit any edition needs; each edition then selects
+#   and ranks its own section from copies of the shared items
+# - Editions run concurrently (EDITION_WORKERS); their LLM calls share LLM_MAX_CONCURRENCY slots
+#   (EDITION_LLM_WORKERS when that is unset), so adding editions queues calls instead of piling
+#   them onto the backend
+# - Each edition writes its own artifact (default build/<name>.jsonl) and publishes to its own
+#   site; per-edition timings go into the run report ("editions") and are printed as a table
+#
+#   python editions.py [editions.json] [--only nlp,robotics]
+#
+# Example editions.json (tokens are read from the named env vars, never from the file):
+# [
+#   {"name": "weekly", "query": "artificial intelligence machine learning",
+#    "wordpress_site_id": "123456", "wordpress_token_env": "WORDPRESS_ACCESS_TOKEN"},
+#   {"name": "nlp", "query": "large language models", "num": 5, "categories": ["cs.CL"],
+#    "topic_profile": "language models, NLP, tokenizers, evaluation", "layout": "email",
+#    "wordpress_site_id": "654321", "wordpress_token_env": "WORDPRESS_TOKEN_NLP"},
+#   {"name": "robotics", "query": "robotics", "sources": "sources-robotics.json"}
+# ]
+# `sources` is a sources file or an inline list in the NEWS_SOURCES_PATH format (see aggregator.py);
+# without it an edition uses the default sources for its query, with `categories` for arXiv.
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import agentic_newsletter_generator as gen
+from aggregator import SourceSpec, default_source_specs, fan_out, parse_source_specs
+from artifact import Issue, write_issue
+from instrumentation import RECORDER
+from items import Item
+from ranking import TOPIC_PROFILE
+
+log = logging.getLogger("aiml-newsletter")
+
+EDITIONS_PATH = os.getenv("EDITIONS_PATH", "editions.json")
+EDITION_WORKERS = int(os.getenv("EDITION_WORKERS", "4"))  # editions generated at the same time
+EDITION_LLM_WORKERS = int(os.getenv("EDITION_LLM_WORKERS", "4"))  # shared LLM slots unless LLM_MAX_CONCURRENCY
+EDITION_DIR = os.getenv("EDITION_DIR", "build")
+
+SourceKey = Tuple[str, str, str, Tuple[str, ...], bool]
+
+
+@dataclass
+class Edition:
+    name: str
+    query: str = "artificial intelligence machine learning"
+    num: int = 6
+    sources: Union[str, List[Dict[str, Any]], None] = None  # sources file or inline list; None = defaults
+    categories: List[str] = field(default_factory=list)  # arXiv categories for the default sources
+    topic_profile: str = TOPIC_PROFILE
+    layout: str = "wordpress"
+    wordpress_site_id: str = ""
+    wordpress_token_env: str = "WORDPRESS_ACCESS_TOKEN"
+    artifact: str = ""  # default EDITION_DIR/<name>.jsonl
+
+    def __post_init__(self):
+        if not re.fullmatch(r"[\w.-]+", self.name):
+            raise ValueError(f"Edition name {self.name!r} must be letters, digits, '.', '-' or '_'")
+        self.artifact = self.artifact or os.path.join(EDITION_DIR, f"{self.name}.jsonl")
+
+    def source_specs(self) -> List[SourceSpec]:
+        if isinstance(self.sources, str):
+            with open(self.sources, "r", encoding="utf-8") as f:
+                return parse_source_specs(json.load(f), self.sources)
+        if self.sources is not None:
+            return parse_source_specs(self.sources, f"edition {self.name}")
+        specs = default_source_specs(self.query)
+        if self.categories:
+            specs = [replace(s, categories=list(self.categories)) if s.kind == "arxiv" else s for s in specs]
+        return specs
+
+
+def load_editions(path: str = EDITIONS_PATH) -> List[Edition]:
+    with open(path, "r", encoding="utf-8") as f:
+        editions = [Edition(**entry) for entry in json.load(f)]
+    names = [e.name for e in editions]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate edition names in {path}: {names}")
+    return editions
+
+
+# -----------------------------------------------------------------------------
+# Shared fetch: every distinct source once, for all editions
+# -----------------------------------------------------------------------------
+def source_key(spec: SourceSpec) -> SourceKey:
+    return spec.kind, spec.query, spec.url, tuple(spec.categories), spec.resolve
+
+
+def prefetch(editions: List[Edition]) -> Dict[SourceKey, List[Item]]:
+    """Fetch the union of all editions' sources; {source key: items, newest candidates first}."""
+    plan: Dict[SourceKey, SourceSpec] = {}
+    for ed in editions:
+        for spec in ed.source_specs():
+            key, limit = source_key(spec), spec.limit or gen.candidate_limit(ed.num)
+            if key in plan:
+                plan[key].limit = max(plan[key].limit, limit)
+            else:
+                plan[key] = replace(spec, name=f"shared{len(plan)}", limit=limit)
+    fetched = fan_out(list(plan.values()), gen.SOURCE_FETCHERS, gen.week_ago(), 0)
+    return {key: fetched[spec.name] for key, spec in plan.items()}
+
+
+def edition_groups(specs: List[SourceSpec], num: int, shared: Dict[SourceKey, List[Item]]) -> Dict[str, List[Item]]:
+    # Copies, so one edition's dedupe, link resolution and alternates never leak into another's.
+    # Each source gets as many candidates as its fetcher would return for this edition on its own.
+    limit = gen.candidate_limit(num)
+    return {
+        spec.name: [replace(it, source=spec.name, alternates=())
+                    for it in shared.get(source_key(spec), [])[:gen.fetched_limit(spec.kind, spec.limit or limit)]]
+        for spec in specs
+    }
+
+
+# -----------------------------------------------------------------------------
+# Per-edition build (themes, select -> generate -> assemble -> publish)
+# -----------------------------------------------------------------------------
+def build_edition(ed: Edition, shared: Dict[SourceKey, List[Item]]) -> Dict[str, Any]:
+    timings: Dict[str, Any] = {"edition": ed.name, "status": "ok"}
+    started = time.perf_counter()
+
+    def step(name: str, fn):
+        start = time.perf_counter()
+        with RECORDER.span(f"edition_{name}"):
+            out = fn()
+        timings[name] = round(time.perf_counter() - start, 4)
+        return out
+
+    try:
+        specs = ed.source_specs()
+        news_specs = [s for s in specs if s.item_kind == "news"]
+        paper_specs = [s for s in specs if s.item_kind == "paper"]
+        news_groups = edition_groups(news_specs, ed.num, shared)
+        paper_groups = edition_groups(paper_specs, ed.num, shared)
+        themes = step("themes", lambda: gen.theme_stage(news_groups, paper_groups))
+        news, papers = step("select", lambda: (
+            gen.select_items(news_groups, news_specs, ed.num, ed.query, ed.topic_profile, ed.wordpress_site_id),
+            gen.select_items(paper_groups, paper_specs, ed.num, ed.query, ed.topic_profile, ed.wordpress_site_id),
+        ))
+        issue = Issue(ed.query, ed.num, news=news, papers=papers, themes=themes, edition=ed.name)
+        issue.mark("fetch")
+        step("generate", lambda: gen.generate_issue(issue, timings=timings.setdefault("stages", {})))
+        step("assemble", lambda: gen.assemble_issue(issue, ed.layout))
+        write_issue(issue, ed.artifact)
+        if ed.layout != "text":
+            token = os.getenv(ed.wordpress_token_env, "")
+            step("publish", lambda: gen.publish_issue(issue, site_id=ed.wordpress_site_id, token=token,
+                                                      token_env=ed.wordpress_token_env))
+            write_issue(issue, ed.artifact)
+        timings.update(news=len(issue.news), papers=len(issue.papers), published=issue.published)
+    except (Exception, SystemExit) as e:  # assemble_issue exits on a malformed article; other editions go on
+        log.error(f"Edition {ed.name} failed: {e!r}")
+        timings["status"] = "failed"
+    timings["total"] = round(time.perf_counter() - started, 4)
+    return timings
+
+
+def run_editions(editions: List[Edition], workers: int = EDITION_WORKERS,
+                 llm_workers: Optional[int] = None) -> Dict[str, Any]:
+    if llm_workers is None:
+        llm_workers = gen.LLM_MAX_CONCURRENCY or EDITION_LLM_WORKERS
+    gen.LLM_SLOTS.set_limit(llm_workers)
+    gen.get_llm()  # build the shared pool once, before the editions race for it
+    started = time.perf_counter()
+    with RECORDER.span("editions_prefetch"):
+        shared = prefetch(editions)
+    prefetch_seconds = time.perf_counter() - started
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(editions)))) as pool:
+        results = list(pool.map(lambda ed: build_edition(ed, shared), editions))
+    report = {
+        "prefetch_seconds": round(prefetch_seconds, 4),
+        "sources_fetched": len(shared),
+        "source_requests": sum(len(ed.source_specs()) for ed in editions),
+        "llm_workers": llm_workers,
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "editions": results,
+    }
+    RECORDER.extra["editions"] = report
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Shared fetch: {report['sources_fetched']} distinct sources for {report['source_requests']} "
+          f"edition sources in {report['prefetch_seconds']:.2f}s")
+    print(f"{'edition':<16} {'news':>4} {'papers':>6} {'select':>7} {'generate':>8} {'assemble':>8} "
+          f"{'publish':>7} {'total':>7}  status")
+    for r in report["editions"]:
+        cols = " ".join(f"{r.get(k, 0):>{w}.2f}" for k, w in
+                        (("select", 7), ("generate", 8), ("assemble", 8), ("publish", 7), ("total", 7)))
+        print(f"{r['edition']:<16} {r.get('news', 0):>4} {r.get('papers', 0):>6} {cols}  {r['status']}")
+    print(f"All editions: {report['total_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build several newsletter editions in one process")
+    ap.add_argument("config", nargs="?", default=EDITIONS_PATH, help=f"editions JSON (default: {EDITIONS_PATH})")
+    ap.add_argument("--only", default="", help="comma-separated edition names to build")
+    ap.add_argument("--workers", type=int, default=EDITION_WORKERS, help="editions built concurrently")
+    ap.add_argument("--llm-workers", type=int, default=None, help="concurrent LLM calls across all editions")
+    args = ap.parse_args()
+
+    print("=== AI/ML Weekly — Editions ===")
+    print(f"MODE: {gen.AGENT_MODE} | PUBLISH: {gen.PUBLISH}")
+    editions = load_editions(args.config)
+    if args.only:
+        wanted = set(args.only.split(","))
+        editions = [e for e in editions if e.name in wanted]
+    report = run_editions(editions, args.workers, args.llm_workers)
+    print_report(report)
+    gen.write_run_report()
+    if any(r["status"] != "ok" for r in report["editions"]):
+        raise SystemExit(1)
@@ -0,0 +1,201 @@
+# Lightweight run instrumentation
+# - Spans: wall time, call/error counts per named block (decorator or context manager)
+# - HTTP: request count, bytes received and urllib3 retries via a requests response hook,
+#   attributed to every span active on the calling thread and to the target host
+# - LLM: per-call prompt/response sizes, latency and cache hits
+# - Optional deep dive: PROFILE=cprofile (writes a .prof file) or PROFILE=tracemalloc
+# Everything ends up in one JSON run report (RUN_REPORT_PATH).
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+log = logging.getLogger("aiml-newsletter")
+
+RUN_REPORT_PATH = os.getenv("RUN_REPORT_PATH", "run_report.json")
+PROFILE = os.getenv("PROFILE", "").lower()  # "", "cprofile" or "tracemalloc"
+PROFILE_PATH = os.getenv("PROFILE_PATH", "run_profile.prof")
+
+
+def _new_span() -> Dict[str, Any]:
+    return {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+            "http_requests": 0, "http_bytes": 0, "http_retries": 0}
+
+
+class RunRecorder:
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans: Dict[str, Dict[str, Any]] = {}
+        self.http: Dict[str, Any] = {"requests": 0, "bytes": 0, "retries": 0, "by_host": {}}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.extra: Dict[str, Any] = {}
+        self._profiler: Optional[cProfile.Profile] = None
+
+    # --- spans -------------------------------------------------------------
+    def _stack(self) -> List[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_span(self) -> str:
+        """Innermost span active on the calling thread ("-" outside any span)."""
+        return (self._stack() or ["-"])[-1]
+
+    def carry(self, fn: Callable) -> Callable:
+        """fn run under the calling thread's open spans, for work handed to another thread."""
+        stack = list(self._stack())
+
+        def run(*args, **kwargs):
+            self._local.stack = list(stack)
+            return fn(*args, **kwargs)
+        return run
+
+    @contextmanager
+    def span(self, name: str):
+        stack = self._stack()
+        stack.append(name)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                sp = self.spans.setdefault(name, _new_span())
+                sp["calls"] += 1
+                sp["errors"] += int(failed)
+                sp["seconds"] += elapsed
+                sp["max_seconds"] = max(sp["max_seconds"], elapsed)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        def deco(fn: Callable) -> Callable:
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    # --- HTTP --------------------------------------------------------------
+    def http_hook(self, resp, *args, **kwargs):
+        """requests 'response' hook; must not consume streamed bodies."""
+        if kwargs.get("stream"):
+            size = int(resp.headers.get("Content-Length") or 0)
+        else:
+            size = len(resp.content or b"")  # Session reads it right after the hook anyway
+        try:
+            retries = len(resp.raw.retries.history) if resp.raw is not None and resp.raw.retries else 0
+        except Exception:
+            retries = 0
+        host = urlparse(resp.url).netloc or "unknown"
+        with self._lock:
+            self.http["requests"] += 1
+            self.http["bytes"] += size
+            self.http["retries"] += retries
+            h = self.http["by_host"].setdefault(host, {"requests": 0, "bytes": 0, "retries": 0})
+            h["requests"] += 1
+            h["bytes"] += size
+            h["retries"] += retries
+            for name in set(self._stack()):
+                sp = self.spans.setdefault(name, _new_span())
+                sp["http_requests"] += 1
+                sp["http_bytes"] += size
+                sp["http_retries"] += retries
+        return resp
+
+    # --- LLM ---------------------------------------------------------------
+    def llm_call(self, prompt_chars: int, response_chars: int, seconds: float, cached: bool, **info) -> None:
+        with self._lock:
+            self.llm_calls.append({
+                "span": self.current_span(),
+                "prompt_chars": prompt_chars,
+                "response_chars": response_chars,
+                "approx_prompt_tokens": prompt_chars // 4,
+                "approx_response_tokens": response_chars // 4,
+                "seconds": round(seconds, 4),
+                "cached": cached,
+                **info,
+            })
+
+    # --- profiling ---------------------------------------------------------
+    def start_profiling(self) -> None:
+        if PROFILE == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif PROFILE == "tracemalloc":
+            tracemalloc.start(25)
+
+    def _stop_profiling(self) -> Dict[str, Any]:
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(PROFILE_PATH)
+            buf = io.StringIO()
+            pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(25)
+            log.info(f"cProfile stats written to {PROFILE_PATH}")
+            self._profiler = None
+            return {"mode": "cprofile", "path": PROFILE_PATH, "top_cumulative": buf.getvalue().splitlines()[:60]}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:15]
+            tracemalloc.stop()
+            return {"mode": "tracemalloc", "current_bytes": current, "peak_bytes": peak,
+                    "top_allocations": [str(stat) for stat in top]}
+        return {}
+
+    # --- report ------------------------------------------------------------
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            llm = {
+                "calls": len(self.llm_calls),
+                "cache_hits": sum(1 for c in self.llm_calls if c["cached"]),
+                "prompt_chars": sum(c["prompt_chars"] for c in self.llm_calls),
+                "response_chars": sum(c["response_chars"] for c in self.llm_calls),
+                "seconds": round(sum(c["seconds"] for c in self.llm_calls), 4),
+                "detail": list(self.llm_calls),
+            }
+            spans = {k: {**v, "seconds": round(v["seconds"], 4), "max_seconds": round(v["max_seconds"], 4)}
+                     for k, v in self.spans.items()}
+            return {
+                "started": self.started.isoformat(),
+                "wall_seconds": round(time.perf_counter() - self._t0, 4),
+                "spans": spans,
+                "http": json.loads(json.dumps(self.http)),
+                "llm": llm,
+                **self.extra,
+            }
+
+    def write_report(self, path: str = RUN_REPORT_PATH) -> Dict[str, Any]:
+        profile = self._stop_profiling()
+        data = self.report()
+        if profile:
+            data["profile"] = profile
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        log.info(
+            f"Run report written to {path}: wall={data['wall_seconds']:.2f}s, "
+            f"http={data['http']['requests']} req/{data['http']['bytes']} B, llm={data['llm']['calls']} calls"
+        )
+        return data
+
+
+RECORDER = RunRecorder()
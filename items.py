@@ -0,0 +1,47 @@
+# Normalized item model shared by every source (news feeds, search APIs, arXiv), the selection
+# steps, the newsletter renderer, the issue artifact and the LinkedIn nodes
+# - Slotted dataclass: no per-instance __dict__, so large candidate pools stay small in memory
+# - Rendering (render.py layouts, reference rows, prompt lines, model_dump) happens on demand from
+#   the fields, so nothing pre-rendered has to be carried along or parsed back
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+@dataclass(slots=True)
+class Item:
+    title: str
+    url: str  # raw link until resolved, then the final publisher URL
+    src: str  # outlet name shown to readers; empty -> domain of the resolved URL
+    published: datetime
+    kind: str = "news"  # "news" or "paper"
+    source: str = ""  # name of the SourceSpec that produced it
+    summary: str = ""
+    id: str = ""  # stable per-source ID (raw link, arXiv id)
+    resolved: bool = False  # url is already final; skip redirect resolution
+    alternates: Sequence["Item"] = ()  # near-duplicate copies (see dedupe.py); shared empty tuple until set
+
+    @property
+    def label(self) -> str:
+        """Outlet as shown to readers (papers are always credited to arXiv)."""
+        return "arXiv" if self.kind == "paper" else self.src
+
+    @property
+    def timestamp(self) -> float:
+        return self.published.timestamp()
+
+    def row(self) -> Tuple[str, str, str]:
+        """(title, url, outlet) for reference lists."""
+        return self.title, self.url, self.label
+
+    def with_alternates(self) -> List["Item"]:
+        return [self, *self.alternates]
+
+    def prompt_line(self) -> str:
+        return f"- {self.title} ({self.label})"
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Prompt-ready dict of the item (pydantic-style name, used by linkedin_nodes); alternates are left out."""
+        return {"title": self.title, "url": self.url, "src": self.label, "published": self.published.isoformat(),
+                "kind": self.kind, "summary": self.summary, "id": self.id}
@@ -1,5 +1,6 @@
 from langchain_core.messages import SystemMessage, HumanMessage
 from style_guide import STYLE_GUIDE
+from llm_cache import cached_invoke
 
 def title_hook_node(state, llm):
     sys = SystemMessage(content=STYLE_GUIDE)
@@ -9,7 +10,7 @@ Return JSON: {{"titles":[str], "hooks":[str]}}.
 Items:
 {[it.model_dump() for it in state.news + state.papers]}
 """)
-    out = llm.invoke([sys, hum])
+    out = cached_invoke(llm, [sys, hum])
     import json
     try:
         data = json.loads(str(out))
@@ -44,7 +45,7 @@ PAPER_ITEMS: {pap_json}
 
 Also produce AFTER the article a '---\nCAROUSEL' section with slide-by-slide lines (Slide 1..N) max ~20 words each.
 """)
-    text = str(llm.invoke([sys, hum]))
+    text = str(cached_invoke(llm, [sys, hum]))
     return state.copy(update={"draft_html": text})
 
 def engagement_judge_node(state, llm):
@@ -55,7 +56,7 @@ Return JSON: {"pass": bool, "scores": {...}, "issues": [str], "edits":[str]}
 Fail if: hook<0.5 or evidence<0.6 or scannability<0.6 or jargon>0.6.
 """)
     hum = HumanMessage(content=f"TEXT:\n{state.draft_html}\n\nSources:\n{[it.model_dump() for it in state.news+state.papers]}")
-    out = llm.invoke([sys, hum])
+    out = cached_invoke(llm, [sys, hum])
     import json
     try:
         verdict = json.loads(str(out))
@@ -72,7 +73,7 @@ EDITS: {state.verification.get("edits", [])}
 ARTICLE:
 {state.draft_html}
 """)
-    text2 = str(llm.invoke([sys, hum]))
+    text2 = str(cached_invoke(llm, [sys, hum]))
     return state.copy(update={"draft_html": text2})
 
 def hashtag_node(state, llm):
@@ -82,7 +83,7 @@ Propose 6–10 hashtags for this article. Follow the Style Guide rules. Return c
 ARTICLE (excerpt): {state.draft_html[:1200]}
 TOPIC: {state.themes[:2]}
 """)
-    tags = str(llm.invoke([sys, hum]))
+    tags = str(cached_invoke(llm, [sys, hum]))
     meta = dict(state.meta); meta["hashtags"] = [t.strip() for t in tags.replace("#"," #").split() if t.startswith("#")][:10]
     return state.copy(update={"meta": meta})
 
@@ -0,0 +1,173 @@
+# Runs the LinkedIn nodes (linkedin_nodes.py) as a small graph:
+#   title_hook -> writer -> { hashtags  ||  judge -> (fix -> judge)* }
+# - hashtag_node only needs the first draft, so it runs on its own thread next to the review loop
+# - The judge/fix loop stops as soon as verification["pass"] is true, or before a round that would
+#   exceed LINKEDIN_FIX_ROUNDS, LINKEDIN_LOOP_SECONDS or LINKEDIN_LOOP_TOKENS (approximate tokens of
+#   uncached LLM calls in the loop; the next round is assumed to cost what the previous one did)
+# - Every node call is timed and its LLM tokens counted (RunResult.nodes, "linkedin" in the run report)
+#
+#   python linkedin_runner.py [--artifact build/issue.jsonl] [--out linkedin_post.txt]
+
+import argparse
+import html
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from instrumentation import RECORDER
+from items import Item
+from linkedin_nodes import (engagement_judge_node, export_linkedin_package, hashtag_node, linkedin_fix_node,
+                            linkedin_writer_node, title_hook_node)
+from pipeline import Stage, run_stages
+
+log = logging.getLogger("aiml-newsletter")
+
+LINKEDIN_FIX_ROUNDS = int(os.getenv("LINKEDIN_FIX_ROUNDS", "2"))  # fix -> judge rounds after the first verdict
+LINKEDIN_LOOP_SECONDS = float(os.getenv("LINKEDIN_LOOP_SECONDS", "180"))
+LINKEDIN_LOOP_TOKENS = int(os.getenv("LINKEDIN_LOOP_TOKENS", "20000"))
+
+
+@dataclass
+class LinkedInState:
+    news: List[Item] = field(default_factory=list)
+    papers: List[Item] = field(default_factory=list)
+    themes: List[str] = field(default_factory=list)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    draft_html: str = ""
+    verification: Dict[str, Any] = field(default_factory=dict)
+
+    def copy(self, update: Optional[Dict[str, Any]] = None) -> "LinkedInState":
+        """Shallow copy with `update` applied (the pydantic-style call the nodes use)."""
+        return replace(self, **(update or {}))
+
+
+@dataclass
+class RunResult:
+    state: LinkedInState
+    rounds: int  # fix -> judge rounds run
+    stop_reason: str  # "pass" | "max_rounds" | "latency_budget" | "token_budget" | "error" | "no_draft"
+    nodes: List[Dict[str, Any]]  # one entry per node call, in start order
+    stages: Dict[str, Dict[str, Any]]
+
+
+class LinkedInRunner:
+    def __init__(self, llm, max_rounds: int = LINKEDIN_FIX_ROUNDS, loop_seconds: float = LINKEDIN_LOOP_SECONDS,
+                 loop_tokens: int = LINKEDIN_LOOP_TOKENS):
+        self.llm = llm
+        self.max_rounds = max_rounds
+        self.loop_seconds = loop_seconds
+        self.loop_tokens = loop_tokens
+        self.nodes: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    def call(self, name: str, node: Callable, state: LinkedInState, round_: int = 0) -> LinkedInState:
+        """Run one node; its timing and the tokens of its uncached LLM calls go into self.nodes."""
+        span = f"linkedin_{name}"
+        seen = len(RECORDER.llm_calls)
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            with RECORDER.span(span):
+                return node(state, self.llm)
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            tokens = sum(c["approx_prompt_tokens"] + c["approx_response_tokens"]
+                         for c in RECORDER.llm_calls[seen:] if c["span"] == span and not c["cached"])
+            with self._lock:
+                self.nodes.append({"node": name, "round": round_, "start": round(start - self._t0, 4),
+                                   "seconds": round(time.perf_counter() - start, 4), "tokens": tokens,
+                                   "status": status})
+
+    def _cost(self, first: int):
+        """(seconds, tokens) of the node calls recorded since index `first`."""
+        with self._lock:
+            calls = self.nodes[first:]
+        return sum(c["seconds"] for c in calls), sum(c["tokens"] for c in calls)
+
+    def review(self, state: LinkedInState):
+        """Judge, then fix and re-judge until the draft passes or a budget would be exceeded."""
+        if not state.draft_html.strip():
+            return state, 0, "no_draft"
+        loop_start = time.perf_counter()
+        with self._lock:
+            first = len(self.nodes)
+        try:
+            state = self.call("judge", engagement_judge_node, state)
+        except Exception as e:
+            log.warning(f"LinkedIn judge failed: {e}")
+            return state, 0, "error"
+        est_seconds, est_tokens = (2 * x for x in self._cost(first))  # fix ~ judge until measured
+        rounds = 0
+        while True:
+            if state.verification.get("pass"):
+                return state, rounds, "pass"
+            if rounds >= self.max_rounds:
+                return state, rounds, "max_rounds"
+            if time.perf_counter() - loop_start + est_seconds > self.loop_seconds:
+                return state, rounds, "latency_budget"
+            if self._cost(first)[1] + est_tokens > self.loop_tokens:
+                return state, rounds, "token_budget"
+            rounds += 1
+            with self._lock:
+                round_first = len(self.nodes)
+            try:
+                fixed = self.call("fix", linkedin_fix_node, state, rounds)
+                state = self.call("judge", engagement_judge_node, fixed, rounds)
+            except Exception as e:
+                log.warning(f"LinkedIn fix round {rounds} failed: {e}; keeping the previous draft")
+                return state, rounds, "error"
+            est_seconds, est_tokens = self._cost(round_first)
+
+    def run(self, state: LinkedInState) -> RunResult:
+        stages = [
+            Stage("title", lambda: self.call("title_hook", title_hook_node, state), fallback=lambda: state),
+            Stage("write", lambda title: self.call("writer", linkedin_writer_node, title), deps=("title",),
+                  fallback=lambda title: title),
+            Stage("hashtags", lambda write: self.call("hashtags", hashtag_node, write) if write.draft_html else write,
+                  deps=("write",), fallback=lambda write: write),
+            Stage("review", lambda write: self.review(write), deps=("write",), fallback=lambda write: (write, 0, "error")),
+        ]
+        timings: Dict[str, Dict[str, Any]] = {}
+        out = run_stages(stages, timings=timings)
+        reviewed, rounds, reason = out["review"]
+        hashtags = out["hashtags"].meta.get("hashtags", [])
+        final = reviewed.copy(update={"meta": {**reviewed.meta, "hashtags": hashtags}})
+        log.info(f"LinkedIn review: {rounds} fix round(s), stopped on {reason}; "
+                 f"pass={bool(final.verification.get('pass'))}")
+        result = RunResult(final, rounds, reason, sorted(self.nodes, key=lambda c: c["start"]), timings)
+        RECORDER.extra["linkedin"] = {"rounds": rounds, "stop_reason": reason, "nodes": result.nodes,
+                                      "stages": timings}
+        return result
+
+
+def run_linkedin(news: List[Item], papers: List[Item], themes: Optional[List[str]] = None, llm=None,
+                 **budgets) -> RunResult:
+    if llm is None:
+        from agentic_newsletter_generator import get_llm  # the shared, lazily built pool
+        llm = get_llm()
+    return LinkedInRunner(llm, **budgets).run(LinkedInState(news=news, papers=papers, themes=themes or []))
+
+
+if __name__ == "__main__":
+    from artifact import ARTIFACT_PATH, read_issue
+
+    ap = argparse.ArgumentParser(description="LinkedIn article from a fetched (and ideally generated) issue artifact")
+    ap.add_argument("--artifact", default=ARTIFACT_PATH)
+    ap.add_argument("--out", default="linkedin_post.txt")
+    args = ap.parse_args()
+
+    issue = read_issue(args.artifact, require="fetch")
+    # The writer leads with themes[0]: the generated topic when there is one, then the pool's themes
+    themes = [html.unescape(issue.text["topic"])] if issue.text.get("topic") else []
+    themes += [t.label for t in issue.themes]
+    result = run_linkedin(issue.news, issue.papers, themes)
+    print(f"Written to {export_linkedin_package(result.state, args.out)}")
+    for c in result.nodes:
+        print(f"  {c['node']:<11} round {c['round']}  {c['seconds']:>7.2f}s  ~{c['tokens']} tokens  {c['status']}")
+    RECORDER.write_report()
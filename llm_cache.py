@@ -0,0 +1,78 @@
+# Content-addressed cache for LLM generations
+# Key = sha256 over (backend, model + generation params, fully rendered prompt or message list, call kwargs).
+# LLM_CACHE=on (default) reads and writes, "refresh" skips reads but stores fresh output, "off" bypasses it.
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from cache_store import SqliteCache, MISS, CACHE_DIR
+from instrumentation import RECORDER
+from llm_stream import StopRule, generate
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE", "on").lower()
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+
+LLM_CACHE = SqliteCache(os.path.join(CACHE_DIR, "llm.sqlite"), table="llm_responses", max_entries=LLM_CACHE_MAX_ENTRIES)
+
+log = logging.getLogger("aiml-newsletter")
+
+# Credential fields some LLM clients report in _identifying_params; never part of the key
+CREDENTIAL_PARAMS = ("api_key", "cohere_api_key", "openai_api_key", "anthropic_api_key", "google_api_key",
+                     "access_token", "auth_token", "token", "password", "secret")
+
+
+def llm_identity(llm) -> Dict[str, Any]:
+    """Backend class plus model/generation params (token budgets, top_k, ...), minus CREDENTIAL_PARAMS."""
+    try:
+        params = dict(getattr(llm, "_identifying_params", {}) or {})
+    except Exception:
+        params = {}
+    params = {k: v for k, v in params.items() if k.lower() not in CREDENTIAL_PARAMS}
+    return {"backend": type(llm).__name__, "params": params}
+
+
+def _render(prompt) -> Any:
+    if isinstance(prompt, str):
+        return prompt
+    # LangChain message list -> [(role, content), ...]
+    return [(getattr(m, "type", type(m).__name__), getattr(m, "content", str(m))) for m in prompt]
+
+
+def cache_key(llm, prompt, **kwargs) -> str:
+    payload = json.dumps(
+        {"llm": llm_identity(llm), "prompt": _render(prompt), "kwargs": kwargs},
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_invoke(llm, prompt, stop_rule: Optional[StopRule] = None, max_tokens: Optional[int] = None, **kwargs) -> str:
+    """
+    The LLM's answer to prompt as a string, memoized on disk according to LLM_CACHE_MODE.
+    With a stop_rule the generation is streamed and cut as soon as the rule is met; the rule and
+    max_tokens are part of the cache key, so trimmed and full outputs never mix.
+    """
+    start = time.perf_counter()
+    prompt_chars = len(json.dumps(_render(prompt), ensure_ascii=False)) if not isinstance(prompt, str) else len(prompt)
+    key_kwargs = dict(kwargs)
+    if stop_rule:
+        key_kwargs["stop_rule"] = stop_rule.key
+    if max_tokens:
+        key_kwargs["max_tokens"] = max_tokens
+    key = cache_key(llm, prompt, **key_kwargs) if LLM_CACHE_MODE != "off" else None
+    if key and LLM_CACHE_MODE != "refresh":
+        hit = LLM_CACHE.get(key)
+        if hit is not MISS and hit is not None:
+            RECORDER.llm_call(prompt_chars, len(hit), time.perf_counter() - start, cached=True)
+            return hit
+    out, stopped_early = generate(llm, prompt, stop_rule, max_tokens, **kwargs)
+    RECORDER.llm_call(prompt_chars, len(out), time.perf_counter() - start, cached=False,
+                      backend=type(llm).__name__, stopped_early=stopped_early)
+    if key and out.strip():  # never pin an empty generation
+        LLM_CACHE.set(key, out, ttl=LLM_CACHE_TTL)
+    return out
@@ -0,0 +1,251 @@
+# Pool of LLM backends behind llm_text and the LinkedIn nodes
+# - Backends are used in priority order (primary first); a failure fails over to the next one
+# - Per-call deadline (LLM_CALL_DEADLINE): a hung provider raises LLMUnavailable instead of stalling the run
+# - Token bucket per provider (LLM_RATE_<NAME>, calls per minute; 0 = unlimited) paces calls
+#   before the provider starts answering 429s
+# - Hedging: if the primary has not answered after its p<LLM_HEDGE_PERCENTILE> latency (LLM_HEDGE_AFTER
+#   seconds until enough samples exist), the same request also goes to the next backend; first answer wins
+# - Circuit breaker: LLM_BREAKER_FAILURES consecutive failures open a provider for LLM_BREAKER_COOLDOWN
+#   seconds; after that one trial call decides whether it closes again
+# Latency samples persist in CACHE_DIR, so weekly runs hedge on real percentiles, not defaults.
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from cache_store import SqliteCache, MISS, CACHE_DIR
+from instrumentation import RECORDER
+from llm_cache import llm_identity
+from llm_stream import StopRule, generate
+
+log = logging.getLogger("aiml-newsletter")
+
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "90"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "20"))  # seconds, until enough latency samples exist
+LLM_HEDGE_MIN_SAMPLES = 5
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "120"))
+LATENCY_WINDOW = 50
+LATENCY_TTL = 30 * 86400
+
+LATENCY_STORE = SqliteCache(os.path.join(CACHE_DIR, "llm.sqlite"), table="llm_latency", max_entries=50)
+
+
+class LLMUnavailable(RuntimeError):
+    """No backend produced an answer before the deadline."""
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to `timeout` seconds; unlimited buckets (rate 0) always succeed."""
+        if self.rate <= 0:
+            return True
+        give_up = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > give_up:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() >= self.opened_at + self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a half-open trial slot that was granted but not used."""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record(self, ok: bool) -> bool:
+        """Returns True when this result opened the circuit."""
+        with self._lock:
+            self.trial_in_flight = False
+            if ok:
+                self.consecutive, self.opened_at = 0, None
+                return False
+            self.consecutive += 1
+            if self.opened_at is not None or self.consecutive >= self.failures:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class Backend:
+    def __init__(self, name: str, llm, per_minute: Optional[float] = None):
+        self.name = name
+        self.llm = llm
+        rate = per_minute if per_minute is not None else float(os.getenv(f"LLM_RATE_{name.upper()}", "0"))
+        self.bucket = TokenBucket(rate)
+        self.breaker = CircuitBreaker()
+        cached = LATENCY_STORE.get(self._latency_key)
+        self.latencies: Deque[float] = deque(json.loads(cached) if cached not in (MISS, None) else [],
+                                             maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    @property
+    def _latency_key(self) -> str:
+        return json.dumps(llm_identity(self.llm), sort_keys=True, default=str)
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(round(seconds, 3))
+            snapshot = list(self.latencies)
+        LATENCY_STORE.set(self._latency_key, json.dumps(snapshot), ttl=LATENCY_TTL)
+
+    def hedge_after(self) -> float:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_AFTER
+        return samples[min(len(samples) - 1, int(len(samples) * LLM_HEDGE_PERCENTILE / 100.0))]
+
+
+class LLMPool:
+    def __init__(self, backends: List[Backend], deadline: float = LLM_CALL_DEADLINE):
+        if not backends:
+            raise ValueError("LLMPool needs at least one backend")
+        self.backends = backends
+        self.deadline = deadline
+        self.stats: Dict[str, Any] = {"calls": 0, "hedges": 0, "failovers": 0, "timeouts": 0,
+                                      "breaker_opened": 0, "wins": {}}
+        self._lock = threading.Lock()
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"backends": [llm_identity(b.llm) for b in self.backends]}
+
+    def _count(self, key: str, backend: Optional[str] = None) -> None:
+        with self._lock:
+            if backend is None:
+                self.stats[key] += 1
+            else:
+                self.stats[key][backend] = self.stats[key].get(backend, 0) + 1
+
+    def invoke(self, prompt, **kwargs) -> str:
+        return self.complete(prompt, None, None, **kwargs)[0]
+
+    def complete(self, prompt, stop_rule: Optional[StopRule] = None, max_tokens: Optional[int] = None,
+                 **kwargs) -> Tuple[str, bool]:
+        """(text, stopped_early) from the first backend to answer, within the pool's deadline."""
+        self._count("calls")
+        deadline_at = time.monotonic() + self.deadline
+        results: "queue.Queue[Tuple[Backend, Optional[Tuple[str, bool]], Optional[BaseException]]]" = queue.Queue()
+        waiting = list(self.backends)
+        running: List[Backend] = []
+        errors: List[str] = []
+
+        def attempt(backend: Backend) -> None:
+            start = time.monotonic()
+            try:
+                out = generate(backend.llm, prompt, stop_rule, max_tokens, **kwargs)
+            except Exception as e:
+                if backend.breaker.record(False):
+                    self._count("breaker_opened")
+                    log.warning(f"LLM backend {backend.name} circuit opened after repeated failures")
+                results.put((backend, None, e))
+                return
+            results.put((backend, out, None))
+            backend.breaker.record(True)
+            backend.record_latency(time.monotonic() - start)
+
+        def launch() -> Optional[Backend]:
+            while waiting:
+                backend = waiting.pop(0)
+                if not backend.breaker.allow():
+                    errors.append(f"{backend.name}: circuit open")
+                    continue
+                if not backend.bucket.acquire(timeout=max(0.0, deadline_at - time.monotonic())):
+                    backend.breaker.release()
+                    errors.append(f"{backend.name}: rate limited")
+                    continue
+                running.append(backend)
+                threading.Thread(target=RECORDER.carry(attempt), args=(backend,), name=f"llm-{backend.name}", daemon=True).start()
+                return backend
+            return None
+
+        first = launch()
+        if first is None:
+            raise LLMUnavailable("; ".join(errors) or "no LLM backend available")
+        hedge_at: Optional[float] = time.monotonic() + first.hedge_after()
+        while running:
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            wake = min(deadline_at, hedge_at) if (hedge_at is not None and waiting) else deadline_at
+            try:
+                backend, out, err = results.get(timeout=max(0.0, wake - now))
+            except queue.Empty:
+                if hedge_at is not None and waiting and time.monotonic() >= hedge_at:
+                    slow = running[-1].name
+                    hedge = launch()
+                    if hedge is not None:
+                        self._count("hedges")
+                        log.info(f"LLM {slow} slower than its p{LLM_HEDGE_PERCENTILE:g}; hedging with {hedge.name}")
+                        hedge_at = time.monotonic() + hedge.hedge_after()
+                    else:
+                        hedge_at = None
+                continue
+            running.remove(backend)
+            if err is None and out is not None:
+                self._count("wins", backend.name)
+                return out
+            errors.append(f"{backend.name}: {err}")
+            if not running and launch() is not None:
+                self._count("failovers")
+                log.warning(f"LLM backend {backend.name} failed ({err}); failing over to {running[-1].name}")
+        if running:
+            self._count("timeouts")
+            for backend in running:  # a provider that cannot answer within the deadline counts as failing
+                if backend.breaker.record(False):
+                    self._count("breaker_opened")
+            raise LLMUnavailable(f"no answer within {self.deadline:g}s from {', '.join(b.name for b in running)}"
+                                 + (f" ({'; '.join(errors)})" if errors else ""))
+        raise LLMUnavailable("; ".join(errors))
+
+    def summary(self) -> str:
+        s = self.stats
+        wins = ", ".join(f"{k}={v}" for k, v in s["wins"].items()) or "none"
+        return (f"LLM pool: {s['calls']} calls, wins {wins}, hedges={s['hedges']}, failovers={s['failovers']}, "
+                f"timeouts={s['timeouts']}, breaker_opened={s['breaker_opened']}")
@@ -0,0 +1,129 @@
+# Streamed generation with early stopping and per-prompt token budgets
+# - StopRule says when a partial output is already complete (first line, N sentences, one JSON object);
+#   the stream is closed at that point, which makes Ollama stop generating. A first-line rule with a
+#   clean function skips lines that clean to nothing (a "Here is a title:" preamble before the title)
+# - budget_kwargs maps a max-token budget onto the backend's own parameter
+#   (Ollama: num_predict, Cohere: max_tokens); unknown backends get no budget
+# - Backends without a real stream (LangChain's default, or no .stream at all) yield one chunk;
+#   the rule then only trims the finished text
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() == "true"
+
+_SENTENCE_END = re.compile(r"[.!?][\"'”’)]*(?=\s)")
+
+
+@dataclass(frozen=True)
+class StopRule:
+    kind: str  # "line" | "sentences" | "json"
+    count: int = 1
+    clean: Optional[Callable[[str], str]] = None  # "line": stop at the first line where clean(text) is non-empty
+
+    @classmethod
+    def first_line(cls, clean: Optional[Callable[[str], str]] = None) -> "StopRule":
+        return cls("line", clean=clean)
+
+    @classmethod
+    def sentences(cls, n: int) -> "StopRule":
+        return cls("sentences", n)
+
+    @classmethod
+    def json_object(cls) -> "StopRule":
+        return cls("json")
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.count}" + (f":{self.clean.__name__}" if self.clean else "")
+
+    def cut(self, text: str) -> Optional[str]:
+        """The complete output if `text` already satisfies the rule, else None (keep streaming)."""
+        if self.kind == "line":
+            body = text.lstrip()
+            if self.clean is None:
+                return body.split("\n", 1)[0] if "\n" in body else None
+            end = body.find("\n")
+            while end >= 0:
+                if self.clean(body[:end]):
+                    return body[:end]
+                end = body.find("\n", end + 1)
+            return None
+        if self.kind == "sentences":
+            for i, m in enumerate(_SENTENCE_END.finditer(text), 1):
+                if i == self.count:
+                    return text[:m.end()]
+            return None
+        if self.kind == "json":
+            return _first_json_object(text)
+        raise ValueError(f"Unknown stop rule {self.kind!r}")
+
+
+def _first_json_object(text: str) -> Optional[str]:
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth, in_str, escaped = 0, False, False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return text[:i + 1]
+    return None
+
+
+def budget_kwargs(llm, max_tokens: Optional[int]) -> Dict[str, Any]:
+    if not max_tokens:
+        return {}
+    backend = type(llm).__name__.lower()
+    if "ollama" in backend:
+        return {"num_predict": max_tokens}
+    if "cohere" in backend:
+        return {"max_tokens": max_tokens}
+    return {}
+
+
+def _chunks(llm, prompt, **kwargs) -> Iterator[str]:
+    if LLM_STREAM and hasattr(llm, "stream"):
+        for chunk in llm.stream(prompt, **kwargs):
+            yield chunk if isinstance(chunk, str) else str(getattr(chunk, "content", chunk))
+    else:
+        yield str(llm.invoke(prompt, **kwargs))
+
+
+def generate(llm, prompt, stop_rule: Optional[StopRule] = None, max_tokens: Optional[int] = None,
+             **kwargs) -> Tuple[str, bool]:
+    """
+    (text, stopped_early) from one backend: stream until the rule is met or the backend finishes.
+    Objects with complete() (llm_pool.LLMPool) pick the backend themselves and come back through here.
+    """
+    if hasattr(llm, "complete"):
+        return llm.complete(prompt, stop_rule, max_tokens, **kwargs)
+    kwargs = {**kwargs, **budget_kwargs(llm, max_tokens)}
+    if stop_rule is None:
+        return str(llm.invoke(prompt, **kwargs)), False
+    text = ""
+    stream = _chunks(llm, prompt, **kwargs)
+    try:
+        for chunk in stream:
+            text += chunk
+            done = stop_rule.cut(text)
+            if done is not None:
+                return done, True
+    finally:
+        stream.close()  # closes the HTTP stream when we stop early
+    return text, False
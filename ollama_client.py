@@ -0,0 +1,134 @@
+# Native Ollama client (POST /api/generate) for the local backend, instead of LangChain's Ollama
+# - keep_alive (OLLAMA_KEEP_ALIVE, default 30m) keeps the model loaded across the run's calls, and
+#   the options that would make Ollama reload it (num_ctx) are the same on every call
+# - Prompts go out as one string; message lists (the LinkedIn nodes) are flattened to
+#   "system\n\nhuman", so they start with the same PROMPT_PREFIX bytes as the newsletter prompts.
+#   Ollama keeps the KV cache of each slot's last prompt and re-evaluates only the part after the
+#   longest common prefix, so a shared style-guide prefix is evaluated once, not on every call
+# - warm() loads the model and evaluates the prefix ahead of the first call (run while fetching)
+# - Per call, Ollama's own timings (load, prompt eval, generation, token counts) are kept in
+#   .calls and summarized for the run report ("ollama"). Ollama sends them with the last chunk, so a
+#   call stopped early only has the client-side split: time to first chunk vs the rest
+# Streams are read line by line; closing one early (llm_stream stop rules) makes Ollama stop.
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+
+from instrumentation import RECORDER
+
+log = logging.getLogger("aiml-newsletter")
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434").rstrip("/")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi3")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))  # fixed per run: a different value reloads the model
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300"))  # seconds between streamed chunks
+OLLAMA_NATIVE = os.getenv("OLLAMA_NATIVE", "true").lower() == "true"  # false: LangChain's Ollama
+
+_OPTIONS = ("num_predict", "temperature", "top_p", "top_k", "seed", "stop")  # per-call options passed through
+_NS = 1e6  # Ollama durations are nanoseconds; reported in ms
+
+
+def render_prompt(prompt) -> str:
+    """A prompt string as is; a message list as its system parts, a blank line, then the rest."""
+    if isinstance(prompt, str):
+        return prompt
+    system = [m.content for m in prompt if getattr(m, "type", "") == "system"]
+    other = [getattr(m, "content", str(m)) for m in prompt if getattr(m, "type", "") != "system"]
+    return "\n\n".join(["\n\n".join(system), "\n\n".join(other)]) if system else "\n\n".join(other)
+
+
+class OllamaClient:
+    def __init__(self, model: str = OLLAMA_MODEL, base_url: str = OLLAMA_URL, keep_alive: str = OLLAMA_KEEP_ALIVE,
+                 num_ctx: int = OLLAMA_NUM_CTX, session: Optional[requests.Session] = None):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.session = session or requests.Session()
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # keep_alive changes nothing in the output, so it stays out of the LLM cache key
+        return {"model": self.model, "num_ctx": self.num_ctx}
+
+    def _payload(self, prompt: str, stream: bool, **kwargs) -> Dict[str, Any]:
+        options = {"num_ctx": self.num_ctx, **{k: kwargs[k] for k in _OPTIONS if k in kwargs}}
+        return {"model": self.model, "prompt": prompt, "stream": stream, "keep_alive": self.keep_alive,
+                "options": options}
+
+    def _record(self, kind: str, start: float, final: Optional[Dict[str, Any]], first: Optional[float] = None,
+                chunks: int = 0) -> None:
+        entry: Dict[str, Any] = {"span": RECORDER.current_span(), "kind": kind,
+                                 "seconds": round(time.perf_counter() - start, 4)}
+        if first is not None:  # client side: ~load + prompt eval before it, generation after
+            entry.update(first_chunk_ms=round((first - start) * 1000, 1), chunks=chunks)
+        if final is None:  # stream closed before Ollama's final chunk (stopped early): no server timings
+            entry["stopped_early"] = True
+        else:
+            entry.update({
+                "load_ms": round(final.get("load_duration", 0) / _NS, 1),
+                "prompt_tokens": final.get("prompt_eval_count", 0),  # tokens evaluated, i.e. not reused
+                "prompt_eval_ms": round(final.get("prompt_eval_duration", 0) / _NS, 1),
+                "eval_tokens": final.get("eval_count", 0),
+                "eval_ms": round(final.get("eval_duration", 0) / _NS, 1),
+            })
+        with self._lock:
+            self.calls.append(entry)
+
+    def stream(self, prompt, **kwargs) -> Iterator[str]:
+        start = time.perf_counter()
+        final, first, chunks = None, None, 0
+        resp = self.session.post(f"{self.base_url}/api/generate", json=self._payload(render_prompt(prompt), True, **kwargs),
+                                 stream=True, timeout=(10, OLLAMA_TIMEOUT))
+        try:
+            if resp.status_code != 200:
+                raise RuntimeError(f"Ollama {resp.status_code}: {resp.text[:300]}")
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama: {data['error']}")
+                if data.get("response"):
+                    if first is None:
+                        first = time.perf_counter()
+                    chunks += 1
+                    yield data["response"]
+                if data.get("done"):
+                    final = data
+        finally:
+            resp.close()
+            self._record("generate", start, final, first, chunks)
+
+    def invoke(self, prompt, **kwargs) -> str:
+        return "".join(self.stream(prompt, **kwargs))
+
+    def warm(self, prefix: str = "") -> None:
+        """Load the model and evaluate `prefix` into the KV cache; failures are only logged."""
+        start = time.perf_counter()
+        try:
+            resp = self.session.post(f"{self.base_url}/api/generate", json=self._payload(prefix, False, num_predict=1),
+                                     timeout=(10, OLLAMA_TIMEOUT))
+            resp.raise_for_status()
+            self._record("warm", start, resp.json())
+        except Exception as e:
+            log.warning(f"Ollama warm-up failed: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+        done = [c for c in calls if "prompt_eval_ms" in c]
+        total = {k: round(sum(c[k] for c in done), 1)
+                 for k in ("load_ms", "prompt_tokens", "prompt_eval_ms", "eval_tokens", "eval_ms")}
+        total["first_chunk_ms"] = round(sum(c.get("first_chunk_ms", 0) for c in calls), 1)
+        return {"model": self.model, "keep_alive": self.keep_alive, "num_ctx": self.num_ctx,
+                "calls": len(calls), "stopped_early": len(calls) - len(done), "totals": total, "per_call": calls}
@@ -0,0 +1,106 @@
+# Tiny dependency-graph executor for the newsletter pipeline
+# - Each stage runs on its own daemon thread as soon as its dependencies finish
+# - Per-stage timeout: a stage that overruns is abandoned (its thread is left to die
+#   with the process) and its fallback is used, so one hung call cannot stall the run
+# - A failing stage also falls back; dependants always receive a value
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+log = logging.getLogger("aiml-newsletter")
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., Any]  # called with dependency results as keyword args
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None  # seconds; None = no limit
+    fallback: Optional[Callable[..., Any]] = None  # same kwargs as fn; None -> result None
+
+
+def _order_check(stages: Sequence[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+    known = set(names)
+    for s in stages:
+        missing = [d for d in s.deps if d not in known]
+        if missing:
+            raise ValueError(f"Stage {s.name!r} depends on unknown stage(s): {missing}")
+
+
+def run_stages(stages: Sequence[Stage], max_workers: int = 4,
+               timings: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Run stages respecting deps, at most `max_workers` at a time.
+    Returns {stage name: result}; per-stage start/duration/status go into `timings` if given.
+    """
+    _order_check(stages)
+    pending: List[Stage] = list(stages)
+    results: Dict[str, Any] = {}
+    timings = {} if timings is None else timings
+    running: Dict[str, Tuple[Stage, float, Dict[str, Any]]] = {}
+    done_q: "queue.Queue[Tuple[str, bool, Any]]" = queue.Queue()
+    t0 = time.perf_counter()
+
+    def worker(stage: Stage, kwargs: Dict[str, Any]) -> None:
+        try:
+            done_q.put((stage.name, True, stage.fn(**kwargs)))
+        except BaseException as e:  # reported through the fallback path
+            done_q.put((stage.name, False, e))
+
+    def finish(stage: Stage, kwargs: Dict[str, Any], started: float, ok: bool, value: Any, status: str) -> None:
+        if not ok:
+            log.warning(f"Stage {stage.name} {status}: {value}; using fallback")
+            try:
+                value = stage.fallback(**kwargs) if stage.fallback else None
+            except Exception as e:
+                log.warning(f"Stage {stage.name} fallback failed: {e}")
+                value = None
+        results[stage.name] = value
+        timings[stage.name] = {
+            "start": round(started - t0, 4),
+            "seconds": round(time.perf_counter() - started, 4),
+            "status": status,
+        }
+
+    while pending or running:
+        # Launch every ready stage that fits in the worker budget
+        for stage in list(pending):
+            if len(running) >= max_workers:
+                break
+            if all(d in results for d in stage.deps):
+                pending.remove(stage)
+                kwargs = {d: results[d] for d in stage.deps}
+                running[stage.name] = (stage, time.perf_counter(), kwargs)
+                threading.Thread(target=worker, args=(stage, kwargs), name=f"stage-{stage.name}", daemon=True).start()
+        if not running:
+            raise ValueError(f"Dependency cycle among stages: {[s.name for s in pending]}")
+
+        # Wait for the next completion or the nearest stage deadline
+        now = time.perf_counter()
+        deadlines = [started + st.timeout for (st, started, _) in running.values() if st.timeout is not None]
+        wait = max(0.0, min(deadlines) - now) if deadlines else None
+        try:
+            name, ok, value = done_q.get(timeout=wait)
+            if name in running:  # ignore late results from abandoned stages
+                stage, started, kwargs = running.pop(name)
+                finish(stage, kwargs, started, ok, value, "ok" if ok else "failed")
+        except queue.Empty:
+            pass
+
+        now = time.perf_counter()
+        for name, (stage, started, kwargs) in list(running.items()):
+            if stage.timeout is not None and now - started >= stage.timeout:
+                running.pop(name)
+                finish(stage, kwargs, started, False, f"exceeded {stage.timeout:.0f}s", "timeout")
+
+    total = time.perf_counter() - t0
+    log.info("Stages: " + ", ".join(f"{n}={t['seconds']:.2f}s" for n, t in timings.items()) + f" | wall={total:.2f}s")
+    return results
+
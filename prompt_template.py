@@ -0,0 +1,25 @@
+# Minimal stand-in for langchain.prompts.PromptTemplate (f-string templates only)
+# Importing langchain.prompts pulls in most of LangChain (~0.6s); the prompts here only need
+# named {placeholders} filled in, with {{ }} for literal braces, which str.format already does.
+# `prefix` is prepended verbatim (no placeholders): prompts that share one (the style guide) start
+# with byte-identical text, which local backends can keep evaluated between calls.
+
+from string import Formatter
+from typing import List
+
+
+class PromptTemplate:
+    def __init__(self, input_variables: List[str], template: str, prefix: str = ""):
+        found = {name for _, name, _, _ in Formatter().parse(template) if name}
+        missing = found.symmetric_difference(input_variables)
+        if missing:
+            raise ValueError(f"Template variables {sorted(found)} do not match input_variables {sorted(input_variables)}")
+        self.input_variables = list(input_variables)
+        self.template = template
+        self.prefix = prefix
+
+    def format(self, **kwargs) -> str:
+        missing = [v for v in self.input_variables if v not in kwargs]
+        if missing:
+            raise KeyError(f"Missing prompt variables: {missing}")
+        return self.prefix + self.template.format(**kwargs)
@@ -0,0 +1,353 @@
+# Durable outbox for WordPress posts
+# - publish_to_wordpress stores the assembled article here (OUTBOX_PATH, SQLite) before anything is
+#   sent, so a failed or interrupted publish never loses it; `python publish_outbox.py drain` (or the
+#   next publish) sends whatever is still queued
+# - Idempotency key = sha256 of site, title, content and post status: enqueueing the same article
+#   twice is a no-op, and a sent entry is never posted again
+# - POSTs are not retried by the HTTP layer. The outbox retries with backoff itself, and before
+#   retrying an attempt whose outcome is unknown (timeout, 5xx, crash mid-send) it looks the post up
+#   by its key (stored as post metadata), so a request that did succeed is not posted twice
+# - Entries with the same slot (one issue) on the same site update the post a previous entry created
+#   while that post is still a draft, instead of creating another one
+# - One background drainer thread sends queued entries over one pooled session
+#
+#   python publish_outbox.py [list | drain | retry <key>]
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache_store import CACHE_DIR
+
+log = logging.getLogger("aiml-newsletter")
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(CACHE_DIR, "outbox.sqlite"))
+WORDPRESS_API_BASE = os.getenv("WORDPRESS_API_BASE", "https://public-api.wordpress.com/rest/v1.1").rstrip("/")
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF = float(os.getenv("OUTBOX_BACKOFF", "2"))  # seconds before the 1st retry, doubled per attempt
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "300"))
+OUTBOX_TIMEOUT = float(os.getenv("OUTBOX_TIMEOUT", "25"))  # per request
+META_KEY = "aiml_outbox_key"  # post metadata carrying the idempotency key
+
+RETRYABLE = {408, 425, 429, 500, 502, 503, 504}
+_COLUMNS = ("key", "site_id", "slot", "title", "content", "status", "token_env", "state", "attempts",
+            "post_id", "url", "error", "created_at", "updated_at", "next_attempt_at")
+
+
+@dataclass
+class OutboxEntry:
+    key: str
+    site_id: str
+    slot: str  # groups the versions of one issue (draft updates)
+    title: str
+    content: str
+    status: str  # WordPress post status: "publish" or "draft"
+    token_env: str  # env var holding the site's token; tokens are never stored
+    state: str  # "queued" | "sending" | "sent" | "failed"
+    attempts: int
+    post_id: str
+    url: str
+    error: str
+    created_at: float
+    updated_at: float
+    next_attempt_at: float
+
+
+def idempotency_key(site_id: str, title: str, content: str, status: str) -> str:
+    h = hashlib.sha256()
+    for part in (site_id, title, content, status):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class Outbox:
+    def __init__(self, path: str = OUTBOX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                key TEXT PRIMARY KEY, site_id TEXT NOT NULL, slot TEXT NOT NULL,
+                title TEXT NOT NULL, content TEXT NOT NULL, status TEXT NOT NULL, token_env TEXT NOT NULL,
+                state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,
+                post_id TEXT NOT NULL DEFAULT '', url TEXT NOT NULL DEFAULT '', error TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL, updated_at REAL NOT NULL, next_attempt_at REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS outbox_due ON outbox(state, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS outbox_slot ON outbox(site_id, slot, state);
+        """)
+
+    def _entries(self, where: str, args=()) -> List[OutboxEntry]:
+        with self._lock:
+            rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM outbox {where}", args).fetchall()
+        return [OutboxEntry(*r) for r in rows]
+
+    def enqueue(self, site_id: str, title: str, content: str, status: str = "publish", slot: str = "",
+                token_env: str = "WORDPRESS_ACCESS_TOKEN", force: bool = False) -> str:
+        """Store the post (durably) unless the same one is already queued or sent; returns its key."""
+        key = idempotency_key(site_id, title, content, status)
+        if force:  # post again even though an identical entry exists
+            key = idempotency_key(key, str(time.time_ns()), "", "")
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO outbox (key, site_id, slot, title, content, status, token_env, state,"
+                " created_at, updated_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (key, site_id, slot or title, title, content, status, token_env, now, now, now),
+            )
+            new = cur.rowcount == 1
+        if not new:
+            log.info(f"Outbox: {key[:12]} is already in the outbox ({self.get(key).state})")
+        return key
+
+    def get(self, key: str) -> Optional[OutboxEntry]:
+        rows = self._entries("WHERE key = ?", (key,))
+        return rows[0] if rows else None
+
+    def find(self, prefix: str) -> Optional[OutboxEntry]:
+        rows = self._entries("WHERE key LIKE ? ORDER BY created_at DESC", (prefix + "%",))
+        return rows[0] if len(rows) == 1 else None
+
+    def pending(self, due_only: bool = True) -> List[OutboxEntry]:
+        """Queued (and interrupted) entries, oldest first; due_only skips those still backing off."""
+        where = "WHERE state IN ('queued', 'sending')"
+        args: tuple = ()
+        if due_only:
+            where += " AND next_attempt_at <= ?"
+            args = (time.time(),)
+        return self._entries(where + " ORDER BY created_at", args)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE state IN ('queued', 'sending')").fetchone()
+        return row[0]
+
+    def draft_to_update(self, entry: OutboxEntry) -> str:
+        """Post ID of the latest sent draft for the entry's site and slot, else ''."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT post_id, status FROM outbox WHERE site_id = ? AND slot = ? AND state = 'sent' AND key != ?"
+                " ORDER BY updated_at DESC LIMIT 1",
+                (entry.site_id, entry.slot, entry.key),
+            ).fetchone()
+        return row[0] if row and row[1] == "draft" else ""
+
+    def update(self, key: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE outbox SET {cols} WHERE key = ?", (*fields.values(), key))
+
+    def retry(self, key: str) -> None:
+        # attempts is kept, so an earlier attempt that may have gone through is still looked up first
+        self.update(key, state="queued", error="", next_attempt_at=time.time())
+
+    def entries(self, limit: int = 50) -> List[OutboxEntry]:
+        return self._entries("ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall())
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def make_session(pool_size: int = 4) -> requests.Session:
+    # No transport-level retries: a retried POST is exactly what creates duplicate posts
+    s = requests.Session()
+    s.headers.update({"User-Agent": "AIML-Newsletter/1.3 (+https://example.com)"})
+    adapter = HTTPAdapter(max_retries=0, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+class OutboxDrainer:
+    """Sends queued entries on one background thread; wait() blocks until an entry is settled."""
+
+    def __init__(self, outbox: Outbox, session: Optional[requests.Session] = None, api_base: str = "",
+                 token: Callable[[str], str] = lambda env: os.getenv(env, "")):
+        self.outbox = outbox
+        self.session = session or make_session()
+        self.api_base = (api_base or WORDPRESS_API_BASE).rstrip("/")
+        self.token = token
+        self.tokens: Dict[str, str] = {}  # token_env -> token handed over by the caller (kept in memory only)
+        self._stats: Dict[str, int] = {"sent": 0, "updated": 0, "recovered": 0, "retries": 0, "failed": 0}
+        self._stats_lock = threading.Lock()  # the drainer thread counts while callers read
+        self._wake = threading.Event()
+        self._settled = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Copy of the counters, taken under the lock."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    # --- HTTP ----------------------------------------------------------------
+    def _headers(self, entry: OutboxEntry) -> Dict[str, str]:
+        token = self.tokens.get(entry.token_env) or self.token(entry.token_env)
+        if not token:
+            raise PermissionError(f"Missing env var: {entry.token_env}")
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    def lookup(self, entry: OutboxEntry) -> Optional[Dict]:
+        """The post created by an earlier attempt of this entry, if the site has it."""
+        resp = self.session.get(f"{self.api_base}/sites/{entry.site_id}/posts/", headers=self._headers(entry),
+                                params={"meta_key": META_KEY, "meta_value": entry.key, "status": "any",
+                                        "number": 1, "fields": "ID,URL"},
+                                timeout=OUTBOX_TIMEOUT)
+        resp.raise_for_status()
+        posts = resp.json().get("posts", [])
+        return posts[0] if posts else None
+
+    def send(self, entry: OutboxEntry) -> OutboxEntry:
+        """One attempt for one entry; the outcome is written to the outbox before returning."""
+        attempt = entry.attempts + 1
+        try:
+            if entry.attempts and not entry.post_id:  # an earlier attempt may have gone through
+                found = self.lookup(entry)
+                if found:
+                    self._count("recovered")
+                    self.outbox.update(entry.key, state="sent", post_id=str(found.get("ID", "")),
+                                       url=found.get("URL", ""), error="")
+                    log.info(f"Outbox: {entry.key[:12]} was already posted ({found.get('URL', '')})")
+                    return self.outbox.get(entry.key)
+            target = self.outbox.draft_to_update(entry)
+            url = f"{self.api_base}/sites/{entry.site_id}/posts/{target or 'new'}"
+            data = {"title": entry.title, "content": entry.content, "status": entry.status,
+                    "metadata": [{"key": META_KEY, "value": entry.key}]}
+            headers = self._headers(entry)
+            self.outbox.update(entry.key, state="sending", attempts=attempt)  # outcome unknown from here on
+            resp = self.session.post(url, headers=headers, json=data, timeout=OUTBOX_TIMEOUT)
+        except PermissionError as e:
+            return self._fail(entry, str(e))
+        except requests.RequestException as e:
+            return self._retry_later(entry, attempt, f"{type(e).__name__}: {e}")
+        if resp.status_code in (200, 201):  # WordPress.com may return 200 with JSON body
+            try:
+                body = resp.json()
+            except ValueError:
+                body = {}
+            self._count("updated" if target else "sent")
+            self.outbox.update(entry.key, state="sent", post_id=str(body.get("ID", "")),
+                               url=body.get("URL", "<no-url>"), error="")
+            return self.outbox.get(entry.key)
+        error = f"HTTP {resp.status_code}: {resp.text[:300]}"
+        if resp.status_code in RETRYABLE:
+            return self._retry_later(entry, attempt, error)
+        return self._fail(entry, error)
+
+    def _retry_later(self, entry: OutboxEntry, attempt: int, error: str) -> OutboxEntry:
+        if attempt >= OUTBOX_MAX_ATTEMPTS:
+            return self._fail(entry, f"{error} (gave up after {attempt} attempts)")
+        self._count("retries")
+        delay = min(OUTBOX_BACKOFF * 2 ** (attempt - 1), OUTBOX_BACKOFF_MAX)
+        log.warning(f"Outbox: {entry.key[:12]} attempt {attempt} failed ({error}); retrying in {delay:.0f}s")
+        self.outbox.update(entry.key, state="queued", attempts=attempt, error=error,
+                           next_attempt_at=time.time() + delay)
+        return self.outbox.get(entry.key)
+
+    def _fail(self, entry: OutboxEntry, error: str) -> OutboxEntry:
+        self._count("failed")
+        log.error(f"Outbox: {entry.key[:12]} failed: {error}; kept in the outbox (`publish_outbox.py retry`)")
+        self.outbox.update(entry.key, state="failed", error=error)
+        return self.outbox.get(entry.key)
+
+    # --- draining ------------------------------------------------------------
+    def drain_once(self, due_only: bool = True) -> int:
+        """Send every pending entry once; returns how many were attempted."""
+        with self._send_lock:
+            pending = self.outbox.pending(due_only)
+            for entry in pending:
+                self.send(entry)
+                with self._settled:
+                    self._settled.notify_all()
+        return len(pending)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.drain_once()
+            except Exception as e:  # keep the drainer alive; entries stay queued
+                log.warning(f"Outbox drainer: {e}")
+            due = self.outbox.next_due()
+            self._wake.wait(timeout=30 if due is None else min(30, max(0.0, due - time.time())))
+            self._wake.clear()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="outbox-drainer", daemon=True)
+                self._thread.start()
+
+    def submit(self, key: str, token_env: str = "", token: str = "") -> None:
+        if token:
+            self.tokens[token_env] = token
+        self.start()
+        self._wake.set()
+
+    def wait(self, key: str, timeout: float) -> OutboxEntry:
+        """The entry once it is sent or failed, or as it stands when `timeout` runs out."""
+        deadline = time.monotonic() + timeout
+        with self._settled:
+            while True:
+                entry = self.outbox.get(key)
+                left = deadline - time.monotonic()
+                if entry is None or entry.state in ("sent", "failed") or left <= 0:
+                    return entry
+                self._settled.wait(timeout=min(left, 1.0))
+
+
+def print_entries(entries: List[OutboxEntry]) -> None:
+    print(f"{'key':<12} {'state':<8} {'tries':>5} {'status':<7} {'site':<10} {'post':<8} title / url / error")
+    for e in entries:
+        detail = e.url if e.state == "sent" else e.error
+        print(f"{e.key[:12]:<12} {e.state:<8} {e.attempts:>5} {e.status:<7} {e.site_id[:10]:<10} {e.post_id[:8]:<8} "
+              f"{e.title[:60]}" + (f" | {detail[:80]}" if detail else ""))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    ap = argparse.ArgumentParser(description="Inspect and drain the WordPress publish outbox")
+    ap.add_argument("command", nargs="?", default="list", choices=["list", "drain", "retry"])
+    ap.add_argument("key", nargs="?", default="", help="entry key (or unique prefix) for retry")
+    ap.add_argument("--json", action="store_true", help="list as JSON (content left out)")
+    args = ap.parse_args()
+
+    box = Outbox()
+    if args.command == "retry":
+        entry = box.find(args.key) if args.key else None
+        if entry is None:
+            raise SystemExit(f"No single outbox entry matches {args.key!r}")
+        box.retry(entry.key)
+    if args.command in ("drain", "retry"):
+        sent = OutboxDrainer(box).drain_once(due_only=False)
+        print(f"Attempted {sent} entr{'y' if sent == 1 else 'ies'}")
+    entries = box.entries()
+    if args.json:
+        print(json.dumps([{k: v for k, v in vars(e).items() if k != "content"} for e in entries], indent=2))
+    else:
+        print_entries(entries)
+    print(box.counts())
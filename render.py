@@ -0,0 +1,207 @@
+# Template renderer for the article and its item lists
+# - Layouts live in TEMPLATE_DIR (default templates/<layout>.tmpl): named blocks ("=== name ===")
+#   with {{field}} placeholders. The filter decides the conversion per slot: {{field}} escapes the
+#   value as plain text for the layout, {{field|html}} takes it as an HTML fragment (kept as is in the
+#   HTML layouts, unescaped in text). The article's news/papers/references are rendered blocks and
+#   are inserted as they are
+# - Each block is compiled once into a str.format pattern (cached per layout), so rendering a list
+#   is one format call per item; the fields of an item are escaped once and reused for its list entry
+#   and its reference row
+# - Layouts: wordpress (the published post), email (inline-styled HTML), text (plain, for LinkedIn)
+
+import html
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Mapping, Tuple
+
+from items import Item
+
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
+ARTICLE_LAYOUT = os.getenv("ARTICLE_LAYOUT", "wordpress")
+LAYOUTS = ("wordpress", "email", "text")
+PAPER_SUMMARY_CHARS = 220  # abstract excerpt shown in the lists
+UTC = timezone.utc
+
+ITEM_FIELDS = ("title", "url", "src", "date", "excerpt", "kind")
+ARTICLE_FIELDS = ("topic", "intro", "summary", "news", "papers", "references")
+BLOCK_FIELDS = ("news", "papers", "references")  # already rendered by the layout; no filter
+
+_BLOCK = re.compile(r"^=== (\w+) ===\n", re.MULTILINE)
+_FIELD = re.compile(r"\{\{\s*(\w+)\s*(?:\|\s*(html)\s*)?\}\}")
+
+
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def fmt_rfc822(dt: datetime) -> str:
+    # Same as strftime("%a, %d %b %Y %H:%M:%S GMT") under the C locale, but locale-independent and faster
+    u = dt.astimezone(UTC)
+    return f"{_DAYS[u.weekday()]}, {u.day:02d} {_MONTHS[u.month - 1]} {u.year} {u.hour:02d}:{u.minute:02d}:{u.second:02d} GMT"
+
+
+Slot = Tuple[str, str]  # (field, filter); filter is "" or "html"
+
+
+class Template:
+    """One compiled block: literal text with (field, filter) slots, rendered by str.format."""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.slots: List[Slot] = []  # distinct slots, in first-use order
+        parts, pos = [], 0
+        for m in _FIELD.finditer(source):
+            slot = (m.group(1), m.group(2) or "")
+            if slot not in self.slots:
+                self.slots.append(slot)
+            parts += [source[pos:m.start()].replace("{", "{{").replace("}", "}}"),
+                      "{" + str(self.slots.index(slot)) + "}"]
+            pos = m.end()
+        self.fields = list(dict.fromkeys(f for f, _ in self.slots))  # distinct fields, in first-use order
+        self._pattern = "".join(parts) + source[pos:].replace("{", "{{").replace("}", "}}")
+
+    def render(self, values: Mapping[Slot, str]) -> str:
+        return self._pattern.format(*(values[s] for s in self.slots))
+
+    def render_rows(self, columns: Mapping[Slot, List[str]], rows: List[int]) -> str:
+        """One line per row index, the values taken from per-slot columns; joined by newlines."""
+        fmt = self._pattern.format
+        if not self.slots:
+            return "\n".join(fmt() for _ in rows)
+        table = list(zip(*(columns[s] for s in self.slots)))
+        return "\n".join(fmt(*table[i]) for i in rows)
+
+
+def _excerpt(summary: str) -> str:
+    return summary[:PAPER_SUMMARY_CHARS].rstrip() + "…" if len(summary) > PAPER_SUMMARY_CHARS + 20 else summary
+
+
+# Raw (plain text) value of each item field
+_ITEM_GETTERS: Dict[str, Callable[[Item], str]] = {
+    "title": lambda it: it.title,
+    "url": lambda it: it.url,
+    "src": lambda it: it.label,
+    "date": lambda it: fmt_rfc822(it.published),
+    "excerpt": lambda it: _excerpt(it.summary),
+    "kind": lambda it: it.kind,
+}
+
+
+class Layout:
+    def __init__(self, name: str, source: str, escape: Callable[[str], str], from_html: Callable[[str], str]):
+        self.name = name
+        self.escape = escape  # plain text -> layout-safe text
+        self.from_html = from_html  # already-escaped HTML fragment -> layout text
+        chunks = _BLOCK.split(source)[1:]
+        self.blocks: Dict[str, Template] = {
+            block: Template(block, body.rstrip("\n")) for block, body in zip(chunks[::2], chunks[1::2])
+        }
+        for tmpl in self.blocks.values():  # fail at load time, not halfway through a render
+            known = ARTICLE_FIELDS if tmpl.name == "article" else ITEM_FIELDS
+            unknown = sorted(set(tmpl.fields) - set(known))
+            if unknown:
+                raise ValueError(f"Layout {name!r} block {tmpl.name!r} uses unknown field(s): {', '.join(unknown)}")
+            filtered = sorted(f for f, filt in tmpl.slots if filt and tmpl.name == "article" and f in BLOCK_FIELDS)
+            if filtered:
+                raise ValueError(f"Layout {name!r} block {tmpl.name!r}: rendered block(s) {', '.join(filtered)} take no filter")
+
+    def block(self, name: str) -> Template:
+        try:
+            return self.blocks[name]
+        except KeyError:
+            raise KeyError(f"Layout {self.name!r} has no block {name!r}") from None
+
+    def convert(self, filt: str) -> Callable[[str], str]:
+        """Value -> layout text for a slot's filter: escape plain text, or take an HTML fragment."""
+        return self.from_html if filt == "html" else self.escape
+
+    # --- items ---------------------------------------------------------------
+    def convert_column(self, values: List[str], filt: str = "") -> List[str]:
+        """Convert a whole column with one call: join on NUL, convert, split back."""
+        convert = self.convert(filt)
+        joined = "\x00".join(values)
+        if joined.count("\x00") != max(len(values) - 1, 0):
+            return [convert(v) for v in values]  # some value contains NUL itself
+        return convert(joined).split("\x00") if values else []
+
+    def columns(self, items: List[Item], blocks: List[str]) -> Dict[Slot, List[str]]:
+        """Layout-ready values of every slot the given blocks use, one list per slot."""
+        slots = {s for b in blocks if b in self.blocks for s in self.blocks[b].slots}
+        raw = {f: [_ITEM_GETTERS[f](it) for it in items] for f in {f for f, _ in slots}}
+        return {(f, filt): self.convert_column(raw[f], filt) for f, filt in slots}
+
+    def _rows(self, block: str, rows: List[int], columns: Dict[Slot, List[str]], empty: str) -> str:
+        if not rows:
+            return self.block(empty).render({})
+        return self.block(block).render_rows(columns, rows)
+
+    def render_items(self, block: str, items: List[Item], empty: str) -> str:
+        """All items through one block, joined by newlines; the `empty` block when there are none."""
+        return self._rows(block, list(range(len(items))), self.columns(items, [block]), empty)
+
+    @staticmethod
+    def reference_items(items: List[Item]) -> List[Item]:
+        # Each picked item followed by its near-duplicate alternates, first occurrence of (title, url) wins
+        seen, uniq = set(), []
+        for x in (x for it in items for x in it.with_alternates()):
+            if (x.title, x.url) not in seen:
+                seen.add((x.title, x.url))
+                uniq.append(x)
+        return uniq
+
+    def references(self, items: List[Item]) -> str:
+        return self.render_items("reference_item", self.reference_items(items), empty="references_empty")
+
+    # --- article -------------------------------------------------------------
+    def article(self, topic: str, intro_html: str, news: List[Item], papers: List[Item], summary_html: str) -> str:
+        """topic/intro/summary are the HTML-escaped generated fragments (llm_text), placed with {{field|html}}."""
+        refs = self.reference_items(news + papers)
+        # One column set for every item shown anywhere, so each field is escaped once
+        pool, index = [], {}
+        for it in (*news, *papers, *refs):
+            if id(it) not in index:
+                index[id(it)] = len(pool)
+                pool.append(it)
+        cols = self.columns(pool, ["news_item", "paper_item", "reference_item"])
+        tmpl = self.block("article")
+        raw = {"topic": topic, "intro": intro_html, "summary": summary_html}
+        values = {(f, filt): self.convert(filt)(raw[f]) for f, filt in tmpl.slots if f in raw}
+        values.update({
+            ("news", ""): self._rows("news_item", [index[id(it)] for it in news], cols, "news_empty"),
+            ("papers", ""): self._rows("paper_item", [index[id(it)] for it in papers], cols, "papers_empty"),
+            ("references", ""): self._rows("reference_item", [index[id(it)] for it in refs], cols, "references_empty"),
+        })
+        return tmpl.render(values).strip()
+
+
+def _escape_html(text: str) -> str:
+    return html.escape(text, quote=True)
+
+
+def _keep(text: str) -> str:
+    return text
+
+
+_LAYOUT_RULES = {
+    "wordpress": (_escape_html, _keep),
+    "email": (_escape_html, _keep),
+    "text": (_keep, html.unescape),
+}
+_layouts: Dict[str, Layout] = {}
+_lock = threading.Lock()
+
+
+def get_layout(name: str = ARTICLE_LAYOUT) -> Layout:
+    """Compiled layout, loaded from TEMPLATE_DIR once per process."""
+    layout = _layouts.get(name)
+    if layout is None:
+        if name not in _LAYOUT_RULES:
+            raise ValueError(f"Unknown layout {name!r}; expected one of {', '.join(LAYOUTS)}")
+        with _lock:
+            layout = _layouts.get(name)
+            if layout is None:
+                with open(os.path.join(TEMPLATE_DIR, f"{name}.tmpl"), encoding="utf-8") as f:
+                    layout = _layouts[name] = Layout(name, f.read(), *_LAYOUT_RULES[name])
+    return layout
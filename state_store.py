@@ -0,0 +1,126 @@
+# Persistent collector state: per-source high-water marks, seen IDs and a rolling item pool
+# - A collector (collector.py, run daily/hourly) adds only items it has not seen before
+# - The weekly build reads the last 7 days from the pool instead of doing a cold fetch,
+#   so stories that rotated out of the feeds mid-week are still available
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from cache_store import CACHE_DIR
+
+STATE_PATH = os.getenv("STATE_PATH", os.path.join(CACHE_DIR, "state.sqlite"))
+UTC = timezone.utc
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _dt(s: str) -> datetime:
+    return datetime.strptime(s, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=UTC)
+
+
+class StateStore:
+    def __init__(self, path: str = STATE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                source TEXT PRIMARY KEY, high_water TEXT NOT NULL, updated_at TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS seen (
+                source TEXT NOT NULL, item_id TEXT NOT NULL, first_seen TEXT NOT NULL,
+                PRIMARY KEY (source, item_id));
+            CREATE TABLE IF NOT EXISTS pool (
+                source TEXT NOT NULL, item_id TEXT NOT NULL, kind TEXT NOT NULL,
+                title TEXT NOT NULL, url TEXT NOT NULL, src TEXT NOT NULL, summary TEXT NOT NULL,
+                published TEXT NOT NULL, collected_at TEXT NOT NULL,
+                PRIMARY KEY (source, item_id));
+            CREATE INDEX IF NOT EXISTS pool_kind_pub ON pool(kind, published);
+        """)
+
+    def high_water(self, source: str) -> Optional[datetime]:
+        with self._lock:
+            row = self._db.execute("SELECT high_water FROM watermarks WHERE source = ?", (source,)).fetchone()
+        return _dt(row[0]) if row else None
+
+    def unseen(self, source: str, item_ids: Iterable[str]) -> List[str]:
+        """Subset of item_ids not recorded for this source yet (order kept)."""
+        ids = list(item_ids)
+        with self._lock:
+            known = {
+                r[0] for r in self._db.execute(
+                    "SELECT item_id FROM seen WHERE source = ? AND item_id IN (SELECT value FROM json_each(?))",
+                    (source, json.dumps(ids)),
+                )
+            }
+        return [i for i in ids if i not in known]
+
+    def add_items(self, source: str, kind: str, items: List[Dict]) -> int:
+        """
+        Insert new items into the pool, mark them seen and advance the source's high-water mark.
+        Each item needs: id, title, url, src, published (datetime); summary is optional.
+        Returns the number of items that were actually new.
+        """
+        now = _iso(datetime.now(UTC))
+        added = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for it in items:
+                    cur = self._db.execute(
+                        "INSERT OR IGNORE INTO seen (source, item_id, first_seen) VALUES (?, ?, ?)",
+                        (source, it["id"], now),
+                    )
+                    if cur.rowcount != 1:
+                        continue
+                    added += 1
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO pool (source, item_id, kind, title, url, src, summary, published, collected_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (source, it["id"], kind, it["title"], it["url"], it["src"], it.get("summary", ""),
+                         _iso(it["published"]), now),
+                    )
+                if items:
+                    newest = _iso(max(it["published"] for it in items))
+                    self._db.execute(
+                        "INSERT INTO watermarks (source, high_water, updated_at) VALUES (?, ?, ?)"
+                        " ON CONFLICT(source) DO UPDATE SET high_water = max(high_water, excluded.high_water),"
+                        " updated_at = excluded.updated_at",
+                        (source, newest, now),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return added
+
+    def pool_items(self, kind: str, since: datetime) -> List[Dict]:
+        """Pool items of one kind published at/after `since`, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, item_id, title, url, src, summary, published FROM pool"
+                " WHERE kind = ? AND published >= ? ORDER BY published DESC",
+                (kind, _iso(since)),
+            ).fetchall()
+        return [
+            {"source": r[0], "id": r[1], "title": r[2], "url": r[3], "src": r[4], "summary": r[5], "published": _dt(r[6])}
+            for r in rows
+        ]
+
+    def prune(self, pool_before: datetime, seen_before: datetime) -> None:
+        """Drop pool items older than pool_before and seen IDs first seen before seen_before."""
+        with self._lock:
+            self._db.execute("DELETE FROM pool WHERE published < ?", (_iso(pool_before),))
+            self._db.execute("DELETE FROM seen WHERE first_seen < ?", (_iso(seen_before),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
@@ -38,3 +38,6 @@ CTA examples (pick one):
 - “Want the deep dive? Comment ‘link’ and I’ll share the paper list.”
 - “I’m building an agentic newsletter—DM if you want the template.”
 """
+
+# Shared head of every prompt: keep it first and unchanged, with the call-specific text after it
+PROMPT_PREFIX = STYLE_GUIDE + "\n\n"
@@ -0,0 +1,195 @@
+# Local theme extraction over the whole candidate pool (all fetched news titles and arXiv abstracts)
+# - Each item becomes a signed, hashed TF-IDF vector of its content words and word bigrams
+#   (THEME_DIM buckets, tokens hashed as in ranking.py); terms found in a single item are ignored
+# - Spherical mini-batch k-means (cosine, k-means++ seeding, fixed seed) groups the items; clusters
+#   are ranked by size x cohesion (mean similarity to the centroid) and labelled with their top terms
+# - Pure NumPy on the CPU, no model download: ~0.15 s for 2,000 items, ~0.4 s for 10,000, mostly
+#   tokenization (python -m benchmarks.bench_themes)
+# The ranked themes are stored in the issue artifact, give the topic prompt a few labelled lines
+# instead of item bullets, and populate LinkedInState.themes.
+
+import os
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from dedupe import PUBLISHER_SUFFIX
+from items import Item
+from ranking import RANK_SUMMARY_CHARS, token_stream
+
+THEMES = os.getenv("THEMES", "true").lower() == "true"
+THEME_COUNT = int(os.getenv("THEME_COUNT", "5"))  # themes kept, best first
+THEME_MEMBERS = int(os.getenv("THEME_MEMBERS", "5"))  # members kept per theme, closest to the centroid first
+THEME_MIN_SIZE = int(os.getenv("THEME_MIN_SIZE", "2"))
+THEME_DIM = 512  # hashed feature buckets
+THEME_ITERATIONS = 30
+THEME_BATCH = 512
+THEME_LABEL_TERMS = 3
+
+_BIGRAM = np.uint64(0x9E3779B97F4A7C15)
+_SIGN_BIT = np.uint64(63)
+
+
+@dataclass
+class Theme:
+    label: str
+    terms: List[str]  # top terms, best first
+    size: int  # items in the cluster
+    score: float  # size x cohesion
+    members: List[Item] = field(default_factory=list)
+
+    def prompt_line(self) -> str:
+        example = f"; e.g. {self.members[0].title}" if self.members else ""
+        return f"- {self.label} ({self.size} items{example})"
+
+
+def _terms(texts: List[str]):
+    """Content words and adjacent content-word bigrams: (hash, text index, start position, is bigram)."""
+    tokens, h, doc, content = token_stream(texts)
+    uni = np.flatnonzero(content)
+    bi = np.flatnonzero(content[:-1] & content[1:])
+    hashes = np.concatenate([h[uni], h[bi] * _BIGRAM + h[bi + 1]])
+    docs = np.concatenate([doc[uni], doc[bi]])
+    starts = np.concatenate([uni, bi])
+    bigram = np.concatenate([np.zeros(len(uni), bool), np.ones(len(bi), bool)])
+    return tokens, hashes, docs, starts, bigram
+
+
+def vectorize(texts: List[str], dim: int = THEME_DIM):
+    """
+    (X, pairs): X is the L2-normalized (n, dim) hashed TF-IDF matrix; pairs holds the (text, term,
+    weight) triples plus what is needed to spell terms out for labels.
+    """
+    n = len(texts)
+    tokens, hashes, docs, starts, bigram = _terms(texts)
+    vocab, first, inv = np.unique(hashes, return_index=True, return_inverse=True)
+    v = max(len(vocab), 1)
+    keys, tf = np.unique(docs.astype(np.int64) * v + inv.ravel(), return_counts=True)
+    pdoc, pterm = keys // v, keys % v
+    df = np.bincount(pterm, minlength=v)
+    idf = np.where(df >= 2, np.log((1.0 + n) / (1.0 + df)) + 1.0, 0.0)
+    weight = (1.0 + np.log(tf)) * idf[pterm]
+    sign = np.where((vocab >> _SIGN_BIT) & np.uint64(1), -1.0, 1.0)[pterm] if len(vocab) else np.zeros(0)
+    bucket = (vocab % np.uint64(dim)).astype(np.int64)[pterm] if len(vocab) else np.zeros(0, np.int64)
+    x = np.bincount(pdoc * dim + bucket, weights=weight * sign, minlength=n * dim).reshape(n, dim)
+    norms = np.sqrt((x * x).sum(axis=1))
+    x = np.divide(x, norms[:, None], out=np.zeros_like(x), where=norms[:, None] > 0).astype(np.float32)
+    return x, (pdoc, pterm, weight, v, tokens, starts[first], bigram[first])
+
+
+def _seed(x: np.ndarray, k: int, rng: np.random.RandomState) -> np.ndarray:
+    # k-means++ on cosine distance, over a sample so seeding stays cheap for big pools
+    sample = x[rng.choice(len(x), min(len(x), 2048), replace=False)]
+    centers = [sample[rng.randint(len(sample))]]
+    dist = 1.0 - sample @ centers[0]
+    for _ in range(1, k):
+        p = np.clip(dist, 0, None)
+        if p.sum() <= 0:
+            break
+        centers.append(sample[rng.choice(len(sample), p=p / p.sum())])
+        dist = np.minimum(dist, 1.0 - sample @ centers[-1])
+    return np.array(centers)
+
+
+def _cluster_sums(labels: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+    # One-hot matmul; much faster than np.add.at for a few clusters
+    onehot = np.zeros((k, len(labels)), dtype=rows.dtype)
+    onehot[labels, np.arange(len(labels))] = 1
+    return onehot @ rows
+
+
+def _normalize(c: np.ndarray) -> np.ndarray:
+    norms = np.sqrt((c * c).sum(axis=1, keepdims=True))
+    return np.divide(c, norms, out=c, where=norms > 0)
+
+
+def kmeans(x: np.ndarray, k: int, seed: int = 1234) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical mini-batch k-means over unit rows; returns (cluster per row, cosine to its centroid)."""
+    rng = np.random.RandomState(seed)
+    centers = _seed(x, k, rng)
+    k = len(centers)
+    counts = np.zeros(k)
+    full = len(x) <= THEME_BATCH
+    assign = np.full(len(x), -1)
+    for _ in range(THEME_ITERATIONS):
+        batch = np.arange(len(x)) if full else rng.choice(len(x), THEME_BATCH, replace=False)
+        labels = np.argmax(x[batch] @ centers.T, axis=1)
+        if full:
+            if np.array_equal(labels, assign):
+                break
+            assign = labels
+            sums = _cluster_sums(labels, x, k)
+            centers = np.where(np.bincount(labels, minlength=k)[:, None] > 0, sums, centers)
+        else:
+            # Per-center learning rate 1/count (Sculley 2010), applied to the batch at once
+            sums = _cluster_sums(labels, x[batch], k)
+            m = np.bincount(labels, minlength=k)
+            counts += m
+            step = np.divide(1.0, counts, out=np.zeros(k), where=counts > 0)[:, None]
+            centers = centers + step * (sums - m[:, None] * centers)
+        centers = _normalize(centers)
+    sims = x @ centers.T
+    assign = np.argmax(sims, axis=1)
+    return assign, sims[np.arange(len(x)), assign]
+
+
+def _spell(term: int, tokens: List[str], starts: np.ndarray, bigram: np.ndarray) -> str:
+    i = int(starts[term])
+    return f"{tokens[i]} {tokens[i + 1]}" if bigram[term] else tokens[i]
+
+
+def _label_terms(weights: np.ndarray, tokens, starts, bigram) -> List[str]:
+    # Highest-weight terms; a term whose words are already covered by a chosen term is skipped
+    chosen: List[str] = []
+    covered = set()
+    for term in np.argsort(-weights, kind="stable")[:8 * THEME_LABEL_TERMS]:
+        if weights[term] <= 0 or len(chosen) == THEME_LABEL_TERMS:
+            break
+        text = _spell(term, tokens, starts, bigram)
+        words = set(text.split())
+        if words & covered or not any(c.isalpha() for c in text):
+            continue
+        chosen.append(text)
+        covered |= words
+    return chosen
+
+
+def item_text(it: Item) -> str:
+    # Without the " - Publisher" suffix of feed titles, so outlets don't become themes
+    return f"{PUBLISHER_SUFFIX.sub('', it.title)}\n{it.summary[:RANK_SUMMARY_CHARS]}"
+
+
+def extract_themes(items: Sequence[Item], count: int = THEME_COUNT, members: int = THEME_MEMBERS) -> List[Theme]:
+    """Ranked themes (best first) of the items; [] when there is too little text to cluster."""
+    items = list(items)
+    if len(items) < 2 * THEME_MIN_SIZE or count <= 0:
+        return []
+    x, (pdoc, pterm, weight, v, tokens, starts, bigram) = vectorize([item_text(it) for it in items])
+    active = np.flatnonzero(x.any(axis=1))
+    if len(active) < 2 * THEME_MIN_SIZE:
+        return []
+    # Over-cluster, then keep the best: small incoherent clusters drop out instead of diluting big ones
+    k = max(1, min(2 * count, len(active) // THEME_MIN_SIZE))
+    assign, sims = kmeans(x[active], k)
+    cluster = np.full(len(items), -1)
+    cluster[active] = assign
+    sim = np.zeros(len(items))
+    sim[active] = sims
+
+    keep = cluster[pdoc] >= 0
+    term_weights = np.bincount(cluster[pdoc[keep]] * v + pterm[keep], weights=weight[keep],
+                               minlength=k * v).reshape(k, v)
+    themes: List[Theme] = []
+    for c in range(k):
+        idx = np.flatnonzero(cluster == c)
+        if len(idx) < THEME_MIN_SIZE:
+            continue
+        terms = _label_terms(term_weights[c], tokens, starts, bigram)
+        if not terms:
+            continue
+        order = idx[np.argsort(-sim[idx], kind="stable")]
+        themes.append(Theme(", ".join(terms), terms, len(idx), float(len(idx) * sim[idx].mean()),
+                            [items[i] for i in order[:members]]))
+    themes.sort(key=lambda t: -t.score)
+    return themes[:count]